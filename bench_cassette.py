@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cassette benchmark
+Records the upstream traffic of get_enhanced_steam_data and process_game_list once, then replays it
+without a network (at the recorded latencies, optionally time-scaled) so runs are reproducible.
+
+    python bench_cassette.py record run.cassette.gz                      # synthetic account on the stand-in
+    python bench_cassette.py record run.cassette.gz --api-key K --steam-id S   # real Steam, keys are stripped
+    python bench_cassette.py replay run.cassette.gz --time-scale 0       # local work only
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+STANDIN_STEAM_ID = '76561198000000001'
+
+
+def percentile(samples: list, q: float) -> float:
+    """Quantile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def exercise(proxy, api_key: str, steam_id: str) -> tuple:
+    """Run the two measured code paths, returning their durations in seconds"""
+    start = time.perf_counter()
+    steam_data = await proxy.get_enhanced_steam_data(api_key, steam_id)
+    steam_seconds = time.perf_counter() - start
+    if 'error' in steam_data:
+        raise RuntimeError(steam_data['error'])
+
+    games = list(steam_data['library'].top_games(10)) if steam_data.get('library') is not None else []
+    games += steam_data.get('recent', {}).get('response', {}).get('games', [])
+    start = time.perf_counter()
+    await proxy.process_game_list(games, 'bench')
+    return steam_seconds, time.perf_counter() - start
+
+def reset_caches(proxy):
+    """Forget everything fetched so each iteration replays the same upstream calls"""
+    conn = sqlite3.connect(proxy.game_data_manager.db_path)
+    with conn:
+        conn.execute("DELETE FROM games")
+        conn.execute("DELETE FROM achievement_schemas")
+    conn.close()
+    proxy.achievement_schemas.schemas.clear()
+    proxy.upstream.last_good.clear()
+
+def record(args):
+    """Run the code paths once against a live upstream, saving every exchange"""
+    from steam_standin import SteamStandIn, LatencyDistribution, start_standin, standin_environment
+
+    server = None
+    if not args.api_key:
+        server, base_url = start_standin(SteamStandIn(LatencyDistribution(median_ms=args.median_ms, seed=1),
+                                                      library_size=args.library_size))
+        os.environ.update(standin_environment(base_url))
+    api_key = args.api_key or 'A' * 32
+    steam_id = args.steam_id or STANDIN_STEAM_ID
+
+    path = Path(args.cassette).resolve()
+    path.unlink(missing_ok=True)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            from steam_proxy_server import EnhancedSteamAPIProxy
+            proxy = EnhancedSteamAPIProxy()
+            cassette = proxy.upstream.use_cassette('record', str(path))
+            cassette.record_meta(steam_id=steam_id)
+            steam_seconds, enrich_seconds = asyncio.run(exercise(proxy, api_key, steam_id))
+            cassette.close()
+        finally:
+            os.chdir(cwd)
+            if server:
+                server.shutdown()
+
+    print(f"📼 Recorded {cassette.stats['recorded']} exchanges to {path} ({path.stat().st_size / 1024:.1f} KB)")
+    print(f"Live run: steam data {steam_seconds * 1000:.0f} ms, enrichment {enrich_seconds * 1000:.0f} ms")
+
+def replay(args):
+    """Replay the cassette repeatedly and report latency percentiles"""
+    path = Path(args.cassette).resolve()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            from steam_proxy_server import EnhancedSteamAPIProxy
+            proxy = EnhancedSteamAPIProxy()
+            cassette = proxy.upstream.use_cassette('replay', str(path), args.time_scale)
+            steam_id = cassette.meta.get('steam_id', STANDIN_STEAM_ID)
+
+            steam_samples, enrich_samples = [], []
+            for _ in range(args.iterations):
+                reset_caches(proxy)
+                steam_seconds, enrich_seconds = asyncio.run(exercise(proxy, 'replayed', steam_id))
+                steam_samples.append(steam_seconds)
+                enrich_samples.append(enrich_seconds)
+        finally:
+            os.chdir(cwd)
+
+    print(f"📼 Replayed {path.name} x{args.iterations} at time scale {args.time_scale}")
+    print(f"{'code path':<26}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for name, samples in (('get_enhanced_steam_data', steam_samples), ('process_game_list', enrich_samples)):
+        print(f"{name:<26}{percentile(samples, 0.5) * 1000:>9.1f}{percentile(samples, 0.95) * 1000:>9.1f}"
+              f"{max(samples) * 1000:>9.1f}")
+    print(f"\nCassette hits: {cassette.stats['replayed']}  misses: {cassette.stats['misses']}")
+    if cassette.stats['misses']:
+        print("⚠️ Some calls were not in the cassette; re-record after changing the code paths")
+
+def main():
+    """Parse options and record or replay"""
+    parser = argparse.ArgumentParser(description='Record/replay benchmark for upstream-bound code paths')
+    parser.add_argument('mode', choices=('record', 'replay'))
+    parser.add_argument('cassette')
+    parser.add_argument('--api-key', help='record from real Steam with this key (stripped from the cassette)')
+    parser.add_argument('--steam-id', help='account to record')
+    parser.add_argument('--library-size', type=int, default=2000, help='stand-in library size when recording')
+    parser.add_argument('--median-ms', type=float, default=40.0, help='stand-in latency when recording')
+    parser.add_argument('--time-scale', type=float, default=1.0, help='replay delay multiplier; 0 for none')
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    print("🎮 Upstream Cassette Benchmark")
+    print("=" * 50)
+    record(args) if args.mode == 'record' else replay(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Request hedging benchmark
+Compares upstream latency percentiles with and without hedging against the local Steam stand-in
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from steam_proxy_server import UpstreamClient
+from steam_standin import SteamStandIn, LatencyDistribution, start_standin
+
+
+def percentile(samples: list, q: float) -> float:
+    """Quantile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run(hedging: bool, calls: int, concurrency: int) -> dict:
+    """Drive GetOwnedGames through an UpstreamClient and collect latencies"""
+    standin = SteamStandIn(LatencyDistribution(median_ms=20, tail_probability=0.05, tail_ms=400, seed=42))
+    server, base_url = start_standin(standin)
+
+    client = UpstreamClient('GamePedia-Bench/1.0')
+    client.hedging_enabled = hedging
+    client.breaker_settings['slow_call_seconds'] = 10.0  # Keep the breaker out of the measurement
+    url = f"{base_url}/IPlayerService/GetOwnedGames/v0001/"
+
+    def one_call(i):
+        start = time.perf_counter()
+        client.get_json('steam.owned_games', url, {'key': 'bench', 'steamid': str(i)}, hedge=True)
+        return time.perf_counter() - start
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one_call, range(calls)))
+    finally:
+        server.shutdown()
+
+    upstream_calls = sum(standin.request_counts.values())
+    return {
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'upstream_calls': upstream_calls,
+        'hedges': client.hedge_stats['hedged'],
+        'hedge_wins': client.hedge_stats['hedge_wins'],
+        'quota_used': client.quota.used,
+    }
+
+def main():
+    """Run the benchmark and print a comparison"""
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print("🎮 Request Hedging Benchmark")
+    print("=" * 50)
+    print(f"Calls: {calls}  Concurrency: {concurrency}")
+    print("Stand-in latency: lognormal 20ms median, 5% tail at ~400ms\n")
+
+    print(f"{'mode':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'upstream':>10}{'hedges':>8}{'wins':>6}")
+    for hedging in (False, True):
+        result = run(hedging, calls, concurrency)
+        mode = 'hedged' if hedging else 'baseline'
+        print(f"{mode:<10}{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}"
+              f"{result['upstream_calls']:>10}{result['hedges']:>8}{result['hedge_wins']:>6}")
+        assert result['quota_used'] == result['upstream_calls'], "Every upstream call must be charged"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Library scaling benchmark
+Times the stats and enrichment code paths on synthetic libraries from 10 to 100k games
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from synthetic_library import SyntheticLibrary
+from steam_standin import SteamStandIn, LatencyDistribution, start_standin, standin_environment
+
+SIZES = (10, 100, 1000, 10000, 100000)
+
+
+def timed(fn, repeat: int = 3) -> float:
+    """Best-of-N milliseconds for a call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    """Run every code path at every size and print a table"""
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+
+    print("🎮 Library Scaling Benchmark")
+    print("=" * 50)
+    print(f"{'games':>8}{'generate':>10}{'calc':>9}{'columns':>9}{'sync':>9}{'resync':>9}{'enhance':>10}   (ms)")
+
+    # Enrichment talks to the stand-in, with no injected latency so only local work is measured
+    server, base_url = start_standin(SteamStandIn(LatencyDistribution(median_ms=0, tail_probability=0)))
+    os.environ.update(standin_environment(base_url))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            from steam_status_bar import SteamStatsCalculator
+            from steam_proxy_server import EnhancedSteamAPIProxy, SteamLibrary
+            proxy = EnhancedSteamAPIProxy()
+
+            for size in sizes:
+                generate_ms = timed(lambda: SyntheticLibrary(size, seed=size), repeat=1)
+                account = SyntheticLibrary(size, seed=size)
+                games = account.games
+
+                calc_ms = timed(lambda: (SteamStatsCalculator.calculate_total_playtime(games),
+                                         SteamStatsCalculator.find_most_played_game(games)))
+                columns_ms = timed(lambda: SteamLibrary.from_games(games))
+                library = SteamLibrary.from_games(games)
+
+                user_key = f'bench-{size}'
+                start = time.perf_counter()
+                proxy.build_library_stats(library, user_key)
+                sync_ms = (time.perf_counter() - start) * 1000
+                resync_ms = timed(lambda: proxy.build_library_stats(library, user_key))
+
+                steam_data = {
+                    'player': account.player_summary_response(),
+                    'games': account.owned_games_response(),
+                    'recent': account.recent_games_response(),
+                    'achievements': {g['appid']: account.player_achievements(g['appid']) for g in library.top_games(3)},
+                    'library': library,
+                }
+                # First pass fills the game-details cache; the timed passes are the warm path
+                asyncio.run(proxy.enhance_with_game_data(steam_data, user_key))
+                enhance_ms = timed(lambda: asyncio.run(proxy.enhance_with_game_data(steam_data, user_key)))
+
+                print(f"{size:>8}{generate_ms:>10.1f}{calc_ms:>9.2f}{columns_ms:>9.2f}{sync_ms:>9.1f}"
+                      f"{resync_ms:>9.2f}{enhance_ms:>10.1f}")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark
+Runs the proxy in child processes against the local Steam stand-in, drives authenticate, validate,
+user-data and static traffic from concurrent simulated users, and reports throughput, latency
+percentiles and upstream calls per request. Results are saved as JSON for comparing versions.
+
+    python bench_load.py --users 32 --duration 30 --output results/main.json
+    python bench_load.py --users 32 --duration 30 --compare results/main.json
+    python bench_load.py --users 128 --workers 8 --compare results/one-worker.json   # multi-core scaling
+
+The simulated users share this process's GIL, so on many-core hosts check that the load generator
+isn't the bottleneck (its CPU should stay well below one core) before reading the worker scaling.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from steam_standin import SteamStandIn, LatencyDistribution, FaultProfile, start_standin, standin_environment
+
+PROJECT_DIR = Path(__file__).resolve().parent
+STATIC_PATHS = ['/index.html', '/style.css', '/script.js']
+DEFAULT_MIX = 'user-data=4,validate=3,static=3'
+
+
+def percentile(samples: list, q: float) -> float:
+    """Quantile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def serve(port: int):
+    """Child process: run one proxy worker on a fixed, shared port until killed"""
+    from steam_proxy_server import start_gamepedia_server
+
+    # SO_REUSEPORT so several of these can share the port, as in the server's --workers mode
+    httpd, deferred = start_gamepedia_server(('127.0.0.1', port), str(PROJECT_DIR / 'gamepedia'), reuse_port=True)
+    proxy = deferred.get()
+    # Every simulated user shares one client IP, so the per-IP limits would only measure the limiter
+    for limit in proxy.security_manager.rate_limits.values():
+        limit['max'] = 10 ** 9
+
+    print('ready', flush=True)
+    httpd.serve_forever()
+
+def free_port() -> int:
+    """An unused localhost port"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def parse_mix(mix: str) -> tuple:
+    """'user-data=4,validate=3' -> (actions, weights)"""
+    pairs = [part.split('=') for part in mix.split(',') if part]
+    actions = [name for name, _ in pairs]
+    unknown = set(actions) - {'user-data', 'validate', 'static'}
+    if unknown:
+        raise ValueError(f"Unknown actions in mix: {', '.join(sorted(unknown))}")
+    return actions, [float(weight) for _, weight in pairs]
+
+class SimulatedUser(threading.Thread):
+    """Authenticates once, then issues weighted random requests until the deadline"""
+
+    def __init__(self, index: int, base_url: str, actions: list, weights: list,
+                 start_at: float, measure_from: float, stop_at: float, think_time: float):
+        super().__init__(daemon=True)
+        self.index = index
+        self.base_url = base_url
+        self.actions = actions
+        self.weights = weights
+        self.start_at = start_at
+        self.measure_from = measure_from
+        self.stop_at = stop_at
+        self.think_time = think_time
+        self.random = random.Random(index)
+        self.session = requests.Session()
+        self.samples = []                   # (action, seconds, status)
+
+    def timed(self, action: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 'error'
+        elapsed = time.perf_counter() - start
+        if time.monotonic() >= self.measure_from:
+            self.samples.append((action, elapsed, status))
+        return response
+
+    def run(self):
+        time.sleep(max(0.0, self.start_at - time.monotonic()))
+        response = self.timed('authenticate', 'POST', '/api/steam/authenticate', json={
+            'api_key': f'{self.index:032X}', 'steam_id': str(76561198000000000 + self.index),
+        })
+        token = (response.json() if response is not None and response.ok else {}).get('session_token')
+        if not token:
+            return
+
+        while time.monotonic() < self.stop_at:
+            action = self.random.choices(self.actions, self.weights)[0]
+            if action == 'static':
+                self.timed('static', 'GET', self.random.choice(STATIC_PATHS))
+            elif action == 'validate':
+                self.timed('validate', 'POST', '/api/steam/validate', json={'session_token': token})
+            else:
+                self.timed('user-data', 'POST', '/api/steam/user-data', json={'session_token': token})
+            if self.think_time:
+                time.sleep(self.random.expovariate(1 / self.think_time))
+
+def summarize(samples: list, measured_seconds: float, upstream_calls: int) -> dict:
+    """Per-action and overall throughput and latency percentiles"""
+    by_action = {}
+    for action, seconds, status in samples:
+        by_action.setdefault(action, []).append((seconds, status))
+
+    def stats(entries):
+        latencies = [seconds for seconds, _ in entries]
+        return {
+            'requests': len(entries),
+            'errors': sum(1 for _, status in entries if status == 'error' or status >= 400),
+            'throughput_rps': len(entries) / measured_seconds,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+        }
+
+    api_requests = sum(len(entries) for action, entries in by_action.items() if action != 'static')
+    return {
+        'overall': stats([(seconds, status) for _, seconds, status in samples]),
+        'actions': {action: stats(entries) for action, entries in sorted(by_action.items())},
+        'upstream_calls': upstream_calls,
+        'upstream_calls_per_api_request': upstream_calls / api_requests if api_requests else 0.0,
+    }
+
+def git_revision() -> str:
+    """Current commit, so saved results say which version they measured"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run(args) -> dict:
+    """Start the stand-in and proxy, drive the load, and return the result document"""
+    actions, weights = parse_mix(args.mix)
+    standin = SteamStandIn(
+        LatencyDistribution(args.upstream_median_ms, tail_probability=args.upstream_tail_probability,
+                            tail_ms=args.upstream_tail_ms, seed=args.seed),
+        FaultProfile(args.upstream_error_rate, seed=args.seed),
+        library_size=args.library_size, seed=args.seed,
+    )
+    standin_server, standin_url = start_standin(standin)
+    port = free_port()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, **standin_environment(standin_url), 'PYTHONPATH': str(PROJECT_DIR),
+               'GAMEPEDIA_WORKERS': str(args.workers)}
+        # Access logs go to a file so they don't drown the report
+        log = open(os.path.join(tmp, 'proxy.log'), 'w')
+        workers = []
+        try:
+            # Workers start one at a time so the first creates the databases and key
+            for _ in range(args.workers):
+                worker = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), '--serve', str(port)],
+                                          cwd=tmp, env=env, stdout=subprocess.PIPE, stderr=log, text=True)
+                workers.append(worker)
+                if worker.stdout.readline().strip() != 'ready':
+                    log.flush()
+                    raise RuntimeError("Proxy failed to start:\n" + Path(log.name).read_text())
+
+            now = time.monotonic()
+            ramp = args.ramp_up / max(1, args.users)
+            measure_from = now + args.warmup
+            stop_at = measure_from + args.duration
+            users = [SimulatedUser(i, f'http://127.0.0.1:{port}', actions, weights, now + i * ramp,
+                                   measure_from, stop_at, args.think_time) for i in range(args.users)]
+            for user in users:
+                user.start()
+
+            time.sleep(max(0.0, measure_from - time.monotonic()))
+            upstream_before = sum(standin.request_counts.values())
+            for user in users:
+                user.join()
+            upstream_calls = sum(standin.request_counts.values()) - upstream_before
+        finally:
+            for worker in workers:
+                worker.terminate()
+                worker.wait(timeout=10)
+            log.close()
+            standin_server.shutdown()
+
+    samples = [sample for user in users for sample in user.samples]
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'config': {name: value for name, value in vars(args).items() if name not in ('output', 'compare', 'serve')},
+        'results': summarize(samples, args.duration, upstream_calls),
+    }
+
+def print_report(document: dict, baseline: dict = None):
+    """Table of per-action results, with changes against a baseline run when given"""
+    results = document['results']
+    print(f"{'action':<14}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(results['actions'].items()) + [('overall', results['overall'])]
+    for action, stats in rows:
+        print(f"{action:<14}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+    print(f"\nUpstream calls: {results['upstream_calls']} "
+          f"({results['upstream_calls_per_api_request']:.2f} per API request)")
+
+    if baseline:
+        print(f"\nChange vs {baseline.get('revision', '?')} ({baseline.get('timestamp', '?')}):")
+        base_rows = {**baseline['results']['actions'], 'overall': baseline['results']['overall']}
+        for action, stats in rows:
+            before = base_rows.get(action)
+            if not before:
+                continue
+            deltas = []
+            for key in ('throughput_rps', 'p50_ms', 'p99_ms'):
+                if before[key]:
+                    deltas.append(f"{key} {(stats[key] - before[key]) / before[key] * 100:+.1f}%")
+            print(f"  {action:<12}{'  '.join(deltas)}")
+
+def main():
+    """Parse options, run the benchmark and save the results"""
+    parser = argparse.ArgumentParser(description='End-to-end load benchmark for the GamePedia proxy')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--users', type=int, default=16, help='concurrent simulated users')
+    parser.add_argument('--workers', type=int, default=1, help='proxy worker processes sharing the port')
+    parser.add_argument('--duration', type=float, default=20.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=3.0, help='unmeasured seconds before measuring')
+    parser.add_argument('--ramp-up', type=float, default=1.0, help='seconds over which users start')
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean pause between a user\'s requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'weighted actions (default {DEFAULT_MIX})')
+    parser.add_argument('--library-size', type=int, default=200, help='games per simulated user')
+    parser.add_argument('--upstream-median-ms', type=float, default=30.0)
+    parser.add_argument('--upstream-tail-probability', type=float, default=0.02)
+    parser.add_argument('--upstream-tail-ms', type=float, default=300.0)
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    print("🎮 GamePedia End-to-End Load Benchmark")
+    print("=" * 50)
+    print(f"Workers: {args.workers}  Users: {args.users}  Duration: {args.duration:.0f}s (+{args.warmup:.0f}s warm-up)  Mix: {args.mix}")
+    print(f"Stand-in: {args.upstream_median_ms:.0f}ms median, {args.library_size} games per user\n")
+
+    document = run(args)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(document, baseline)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(document, indent=2))
+        print(f"\n💾 Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+GetOwnedGames parse benchmark
+Compares full json.loads against the streaming parser on a synthetic include_appinfo response
+"""
+
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def synthetic_response(game_count: int, seed: int = 7) -> bytes:
+    """GetOwnedGames body shaped like include_appinfo=1 output"""
+    rng = random.Random(seed)
+    games = []
+    for i in range(game_count):
+        playtime = int(rng.paretovariate(1.2)) - 1
+        games.append({
+            'appid': 10 + i * 10,
+            'name': f'Synthetic Game {i}',
+            'playtime_forever': playtime,
+            'img_icon_url': f'{rng.getrandbits(160):040x}',
+            'has_community_visible_stats': rng.random() < 0.6,
+            'playtime_windows_forever': playtime,
+            'playtime_mac_forever': 0,
+            'playtime_linux_forever': 0,
+            'playtime_deck_forever': 0,
+            'rtime_last_played': 1500000000 + rng.randrange(250000000) if playtime else 0,
+            'content_descriptorids': [2, 5] if rng.random() < 0.1 else [],
+            'playtime_disconnected': 0,
+        })
+    return json.dumps({'response': {'game_count': game_count, 'games': games}}).encode('utf-8')
+
+def measure(mode: str, path: str):
+    """Parse the body in this process and print elapsed time and peak RSS as JSON"""
+    from steam_proxy_server import SteamLibrary, parse_owned_games_stream
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    if mode == 'full':
+        # What response.json() does: whole body in memory, then one nested dict
+        with open(path, 'rb') as f:
+            body = f.read()
+        data = json.loads(body.decode('utf-8'))
+        library = SteamLibrary.from_games(data['response']['games'])
+    else:
+        def chunks():
+            with open(path, 'rb') as f:
+                while chunk := f.read(1 << 16):
+                    yield chunk
+        library = parse_owned_games_stream(chunks())['response']['games']
+
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'games': len(library), 'seconds': elapsed,
+                      'baseline_rss_mb': baseline_kb / 1024, 'peak_rss_mb': peak_kb / 1024}))
+
+def main():
+    """Run each mode in a fresh interpreter and print a comparison"""
+    if len(sys.argv) == 3 and sys.argv[1] in ('full', 'stream'):
+        measure(sys.argv[1], sys.argv[2])
+        return
+
+    game_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print("🎮 GetOwnedGames Parse Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'owned_games.json')
+        body = synthetic_response(game_count)
+        with open(path, 'wb') as f:
+            f.write(body)
+        print(f"Games: {game_count}  Body: {len(body) / 1024 / 1024:.1f} MB\n")
+
+        print(f"{'mode':<8}{'parse ms':>10}{'peak RSS MB':>14}{'after import MB':>18}")
+        for mode in ('full', 'stream'):
+            output = subprocess.run([sys.executable, __file__, mode, path], capture_output=True,
+                                    text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            result = json.loads(output.stdout)
+            assert result['games'] == game_count
+            print(f"{mode:<8}{result['seconds'] * 1000:>10.1f}{result['peak_rss_mb']:>14.1f}"
+                  f"{result['baseline_rss_mb']:>18.1f}")
+
+if __name__ == "__main__":
+    main()
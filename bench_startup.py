@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Measures what a fresh server process pays before it can answer: module import time from
+-X importtime (with the modules that dominate it), time until the port is bound, and time until
+the Steam proxy is ready on a cold start (new databases) and a warm start (schema already current).
+
+    python bench_startup.py
+    python bench_startup.py --runs 10 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+HEAVY_MODULES = ('numpy', 'requests', 'cryptography.fernet')
+
+
+def percentile(samples: list, q: float) -> float:
+    """Quantile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def parse_importtime(stderr: str) -> list:
+    """-X importtime lines -> [(module, self us, cumulative us, depth)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def import_profile(statement: str) -> list:
+    """Import timings for running a statement in a fresh interpreter"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+def module_total_ms(entries: list, module: str) -> float:
+    """Cumulative import time of a top-level import"""
+    return next((cumulative for name, _, cumulative, depth in entries if name == module and depth <= 1), 0) / 1000
+
+def direct_imports(entries: list, module: str) -> list:
+    """Entries imported directly by a top-level module; -X importtime lists children before their parent"""
+    children = []
+    for entry in entries:
+        if entry[3] == 0:
+            if entry[0] == module:
+                return children
+            children = []
+        elif entry[3] == 1:
+            children.append(entry)
+    return []
+
+def serve_once(directory: str):
+    """Child process: bind like main() does, reporting when bound and when the proxy is ready"""
+    from steam_proxy_server import start_gamepedia_server
+
+    print(f"imported {time.perf_counter()}", flush=True)
+    httpd, steam_proxy = start_gamepedia_server(('127.0.0.1', 0), directory)
+    print(f"bound {time.perf_counter()}", flush=True)
+    steam_proxy.get()
+    print(f"ready {time.perf_counter()}", flush=True)
+    httpd.server_close()
+    os._exit(0 if steam_proxy.proxy else 1)
+
+def time_startup(cwd: str) -> dict:
+    """Seconds from process launch to import, bind and ready"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), '--serve-once'], cwd=cwd,
+                               env={**os.environ, 'PYTHONPATH': str(PROJECT_DIR)},
+                               stdout=subprocess.PIPE, text=True)
+    # perf_counter is system-wide on Linux and macOS, so the child's stamps share our timeline
+    marks = {}
+    for line in process.stdout:
+        event, stamp = line.split()
+        marks[event] = float(stamp) - start
+    if process.wait() != 0:
+        raise RuntimeError("Server failed to start")
+    return marks
+
+def main():
+    """Run the measurements and print a report"""
+    parser = argparse.ArgumentParser(description='Startup-time benchmark for the GamePedia proxy')
+    parser.add_argument('--serve-once', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--runs', type=int, default=5, help='process launches per measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args()
+
+    if args.serve_once:
+        serve_once(str(PROJECT_DIR / 'gamepedia'))
+        return
+
+    print("🎮 Startup Benchmark")
+    print("=" * 50)
+
+    runs = [import_profile('import steam_proxy_server') for _ in range(args.runs)]
+    totals = [module_total_ms(entries, 'steam_proxy_server') for entries in runs]
+    print(f"import steam_proxy_server: p50 {percentile(totals, 0.5):.1f} ms  max {max(totals):.1f} ms")
+
+    deferred = import_profile('import ' + ', '.join(HEAVY_MODULES))
+    print("Deferred until the proxy is built:")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<24}{module_total_ms(deferred, module):>8.1f} ms")
+
+    print("\nSlowest imports under steam_proxy_server (cumulative):")
+    direct = direct_imports(runs[0], 'steam_proxy_server')
+    for name, _, cumulative, _ in sorted(direct, key=lambda entry: -entry[2])[:args.top]:
+        print(f"  {name:<24}{cumulative / 1000:>8.1f} ms")
+
+    print(f"\n{'launch':<8}{'imported':>10}{'bound':>9}{'ready':>9}   (ms since spawn, p50 of {args.runs})")
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = []
+        for _ in range(args.runs):
+            # A fresh directory each time: key generation and every migration run
+            run_dir = tempfile.mkdtemp(dir=tmp)
+            cold.append(time_startup(run_dir))
+        warm_dir = tempfile.mkdtemp(dir=tmp)
+        time_startup(warm_dir)
+        warm = [time_startup(warm_dir) for _ in range(args.runs)]
+
+    for label, marks in (('cold', cold), ('warm', warm)):
+        print(f"{label:<8}" + ''.join(f"{percentile([m[event] for m in marks], 0.5) * 1000:>{width}.1f}"
+                                      for event, width in (('imported', 10), ('bound', 9), ('ready', 9))))
+
+if __name__ == "__main__":
+    main()
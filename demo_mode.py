@@ -11,14 +11,27 @@ import threading
 import time
 from datetime import datetime, timedelta
 import random
+import sys
 from typing import Dict, List, Optional, Any
+from synthetic_library import SyntheticLibrary
 
 
 class MockSteamAPI:
     """Mock Steam API for demo purposes"""
     
-    def __init__(self):
-        self.mock_data = self._generate_mock_data()
+    def __init__(self, library_size: Optional[int] = None, seed: int = 0):
+        # Without a size, the ten hand-written games; with one, a seeded synthetic library
+        self.library = SyntheticLibrary(library_size, seed) if library_size else None
+        self.mock_data = self._generate_synthetic_data() if self.library else self._generate_mock_data()
+    
+    def _generate_synthetic_data(self):
+        """Mock data backed by a synthetic library"""
+        recent = self.library.recent_games()
+        return {
+            'player_summary': self.library.player_summary_response(),
+            'owned_games': self.library.owned_games_response(),
+            'recent_games': {'response': {'total_count': len(recent), 'games': recent}},
+        }
     
     def _generate_mock_data(self):
         """Generate realistic mock Steam data"""
@@ -83,6 +96,8 @@ class MockSteamAPI:
     
     def get_player_achievements(self, steam_id: str, app_id: str) -> Dict:
         """Mock achievements"""
+        if self.library:
+            return self.library.player_achievements(int(app_id))
         return {
             'playerstats': {
                 'steamID': steam_id,
@@ -101,11 +116,11 @@ class MockSteamAPI:
 class DemoSteamStatusBar:
     """Demo version of the Steam Status Bar"""
     
-    def __init__(self):
+    def __init__(self, library_size: Optional[int] = None):
         self.root = tk.Tk()
         self.setup_window()
         self.setup_ui()
-        self.steam_api = MockSteamAPI()
+        self.steam_api = MockSteamAPI(library_size)
         self.player_data = {}
         self.update_thread = None
         self.running = True
@@ -411,7 +426,9 @@ def main():
     print("This will show the application with mock Steam data")
     print("=" * 50)
     
-    app = DemoSteamStatusBar()
+    # Optional library size, e.g. `python demo_mode.py 5000` for a synthetic 5,000-game account
+    library_size = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    app = DemoSteamStatusBar(library_size)
     app.run()
 
 
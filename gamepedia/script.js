@@ -1433,7 +1433,8 @@ class SteamWidget {
         if (this.isDemo) return;
 
         try {
-            const response = await fetch(`${this.baseUrl}/api/steam/user-data`, {
+            // Sections arrive as NDJSON lines so the player card and stats render first
+            const response = await fetch(`${this.baseUrl}/api/steam/user-data/stream`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -1447,8 +1448,25 @@ class SteamWidget {
                 throw new Error('Failed to fetch Steam data');
             }
 
-            const steamData = await response.json();
-            this.displayComprehensiveData(steamData);
+            this.renderComprehensiveLayout();
+            const sections = {};
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+
+                buffered += decoder.decode(value, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                for (const line of lines) {
+                    if (line.trim()) {
+                        this.displaySection(JSON.parse(line), sections);
+                    }
+                }
+            }
 
         } catch (error) {
             console.error('Error updating Steam data:', error);
@@ -1456,9 +1474,44 @@ class SteamWidget {
         }
     }
 
+    displaySection({ section, data }, sections) {
+        sections[section] = data;
+
+        switch (section) {
+            case 'player':
+                this.displayPlayerInfo(data);
+                break;
+            case 'stats':
+                this.displayEnhancedStats(data);
+                break;
+            case 'recentGames':
+                this.displayRecentGames(data || sections.topGames);
+                break;
+            case 'achievements':
+                this.displayAchievements(data);
+                break;
+            case 'recommendations':
+                this.displayRecommendations(data);
+                break;
+            case 'error':
+                throw new Error(data.error);
+        }
+    }
+
     displayComprehensiveData(data) {
+        if (!this.renderComprehensiveLayout()) return;
+
+        // Display each section
+        this.displayPlayerInfo(data.player);
+        this.displayEnhancedStats(data.stats);
+        this.displayRecentGames(data.recentGames || data.topGames);
+        this.displayAchievements(data.achievements);
+        this.displayRecommendations(data.recommendations);
+    }
+
+    renderComprehensiveLayout() {
         const widget = document.getElementById('steamStatus');
-        if (!widget) return;
+        if (!widget) return false;
 
         // Create comprehensive layout
         widget.innerHTML = `
@@ -1470,13 +1523,7 @@ class SteamWidget {
                 <div id="recommendationsSection"></div>
             </div>
         `;
-
-        // Display each section
-        this.displayPlayerInfo(data.player);
-        this.displayEnhancedStats(data.stats);
-        this.displayRecentGames(data.recentGames || data.topGames);
-        this.displayAchievements(data.achievements);
-        this.displayRecommendations(data.recommendations);
+        return true;
     }
 
     displayPlayerInfo(player) {
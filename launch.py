@@ -4,7 +4,7 @@ Launch script for the GamePedia website with Steam integration
 """
 
 import sys
-import subprocess
+import webbrowser
 from pathlib import Path
 
 def main():
@@ -29,11 +29,22 @@ def main():
         print("✅ Live Steam Data Updates")
         print("✅ Demo Mode Available")
         print("✅ Full CORS Support")
-        print("\n" + "🌐 The browser will open automatically...")
-        print("❌ Press Ctrl+C in the server window to stop\n")
+        print("\n" + "🌐 The browser will open as soon as the server is ready...")
+        print("❌ Press Ctrl+C to stop\n")
         
-        # Run the steam proxy server
-        subprocess.run([sys.executable, str(steam_proxy_path)])
+        # Run the steam proxy server, restarting it if it crashes
+        from steam_proxy_server import ProcessSupervisor, get_free_port, wait_until_ready
+        port = get_free_port()
+        supervisor = ProcessSupervisor([sys.executable, str(steam_proxy_path), '--port', str(port), '--no-browser'])
+        supervisor.start()
+        try:
+            if not wait_until_ready(f"http://127.0.0.1:{port}", timeout=60, process=supervisor.processes[0]):
+                print("❌ Error: the server did not become ready")
+                sys.exit(1)
+            webbrowser.open(f"http://localhost:{port}")
+            supervisor.run()
+        finally:
+            supervisor.stop()
         
     except KeyboardInterrupt:
         print("\n🛑 Launcher stopped by user")
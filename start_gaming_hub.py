@@ -4,11 +4,12 @@ GamePedia Ultimate Gaming Hub - Startup Script
 Modern Gaming Platform with Steam Integration
 """
 
+import importlib.util
 import os
-import sys
+import socket
 import subprocess
+import sys
 import webbrowser
-import time
 from pathlib import Path
 
 def print_banner():
@@ -35,15 +36,14 @@ def check_requirements():
     required_packages = [
         'requests',
         'cryptography',
-        'bcrypt'
+        'numpy'
     ]
     
     missing_packages = []
     
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        # Locate without importing, so the check doesn't pay for loading each package
+        if importlib.util.find_spec(package) is None:
             missing_packages.append(package)
     
     if missing_packages:
@@ -72,66 +72,73 @@ def check_server_file():
     print("\033[92m[SUCCESS]\033[0m Steam proxy server found!")
     return True
 
+def choose_port(preferred: int) -> int:
+    """The preferred port if it is free, otherwise any free port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(('', preferred))
+            return preferred
+        except OSError:
+            pass
+    from steam_proxy_server import get_free_port
+    return get_free_port()
+
 def start_server():
-    """Start the enhanced gaming hub server"""
+    """Start the enhanced gaming hub server under supervision, opening the browser once it is ready"""
     print("\033[93m[INFO]\033[0m Starting GamePedia Ultimate Gaming Hub server...")
     
+    # Imported after the requirements check; the server module loads its heavy dependencies lazily
+    from steam_proxy_server import ProcessSupervisor, wait_until_ready
+    
+    # One port for the whole session, so a restarted server comes back at the same URL
+    port = choose_port(int(os.environ.get('GAMEPEDIA_PORT', 8080)))
+    url = f"http://localhost:{port}"
+    # The server writes straight to our terminal rather than through a pipe we relay
+    supervisor = ProcessSupervisor([sys.executable, 'steam_proxy_server.py', '--port', str(port), '--no-browser'])
+    
     try:
-        # Start the server process
-        process = subprocess.Popen([
-            sys.executable, 
-            'steam_proxy_server.py'
-        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-        
-        # Wait a moment for the server to start
-        time.sleep(2)
-        
-        # Check if the process is still running
-        if process.poll() is None:
-            print("\033[92m[SUCCESS]\033[0m Gaming Hub server started successfully!")
-            
-            # Try to open browser
-            try:
-                webbrowser.open('http://localhost:8080')
-                print("\033[92m[INFO]\033[0m Browser opened automatically")
-            except Exception as e:
-                print(f"\033[93m[WARNING]\033[0m Could not open browser automatically: {e}")
-                print("\033[93m[INFO]\033[0m Please manually navigate to: http://localhost:8080")
-            
-            print("\n\033[96m" + "="*60 + "\033[0m")
-            print("\033[96m🎮 GAMEPEDIA ULTIMATE GAMING HUB IS RUNNING! 🎮\033[0m")
-            print("\033[96m" + "="*60 + "\033[0m")
-            print("\033[92mServer URL:\033[0m http://localhost:8080")
-            print("\033[92mFeatures:\033[0m")
-            print("  • Modern Gaming UI with Dark Theme")
-            print("  • Enhanced Steam Integration") 
-            print("  • Military-Grade Security")
-            print("  • Smooth Animations & Effects")
-            print("  • Real-time Gaming Statistics")
-            print("\033[93mPress Ctrl+C to stop the server\033[0m")
-            print("\033[96m" + "="*60 + "\033[0m\n")
-            
-            # Wait for the server process and show output
-            try:
-                if process.stdout:
-                    for line in process.stdout:
-                        print(line.rstrip())
-                else:
-                    process.wait()
-            except KeyboardInterrupt:
-                print("\n\033[93m[INFO]\033[0m Shutting down Gaming Hub server...")
-                process.terminate()
-                process.wait()
-                print("\033[92m[SUCCESS]\033[0m Gaming Hub server stopped successfully!")
-        else:
+        supervisor.start()
+        if not wait_until_ready(f"http://127.0.0.1:{port}", timeout=60, process=supervisor.processes[0]):
             print("\033[91m[ERROR]\033[0m Failed to start the server")
+            supervisor.stop()
             return False
-            
+        
+        print("\033[92m[SUCCESS]\033[0m Gaming Hub server started successfully!")
+        
+        # Try to open browser
+        try:
+            webbrowser.open(url)
+            print("\033[92m[INFO]\033[0m Browser opened automatically")
+        except Exception as e:
+            print(f"\033[93m[WARNING]\033[0m Could not open browser automatically: {e}")
+            print(f"\033[93m[INFO]\033[0m Please manually navigate to: {url}")
+        
+        print("\n\033[96m" + "="*60 + "\033[0m")
+        print("\033[96m🎮 GAMEPEDIA ULTIMATE GAMING HUB IS RUNNING! 🎮\033[0m")
+        print("\033[96m" + "="*60 + "\033[0m")
+        print(f"\033[92mServer URL:\033[0m {url}")
+        print("\033[92mFeatures:\033[0m")
+        print("  • Modern Gaming UI with Dark Theme")
+        print("  • Enhanced Steam Integration") 
+        print("  • Military-Grade Security")
+        print("  • Smooth Animations & Effects")
+        print("  • Real-time Gaming Statistics")
+        print("\033[93mThe server is restarted automatically if it crashes\033[0m")
+        print("\033[93mPress Ctrl+C to stop the server\033[0m")
+        print("\033[96m" + "="*60 + "\033[0m\n")
+        
+        supervisor.run()
+        
+    except KeyboardInterrupt:
+        print("\n\033[93m[INFO]\033[0m Shutting down Gaming Hub server...")
+        supervisor.stop()
+        print("\033[92m[SUCCESS]\033[0m Gaming Hub server stopped successfully!")
     except FileNotFoundError:
         print("\033[91m[ERROR]\033[0m Python not found in PATH")
         return False
     except Exception as e:
         print(f"\033[91m[ERROR]\033[0m Unexpected error: {e}")
+        supervisor.stop()
         return False
     
     return True
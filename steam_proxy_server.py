@@ -4,29 +4,1205 @@ GamePedia - Ultimate Gaming Platform
 Military-grade secure Steam API proxy with comprehensive gaming features
 """
 
+import ast
 import asyncio
+import functools
+import importlib
+import atexit
+import codecs
+import cProfile
+import io
+import linecache
+import pstats
+import tracemalloc
+import contextvars
 import json
+import re
 import os
 import sys
 import time
 import webbrowser
 import threading
 import secrets
+import selectors
+import signal
+import socket
 import hashlib
+import gzip
 import hmac
+import math
 import base64
+import bisect
 import sqlite3
+import socketserver
+import stat
+import subprocess
 import ipaddress
+import random
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
-from collections import defaultdict
-import requests
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import bcrypt
+from array import array
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+class LazyModule:
+    """Module imported on first attribute access, keeping heavy imports off the startup path"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            # The import system's own locks make a racing first access safe
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+np = LazyModule('numpy')
+requests = LazyModule('requests')
+
+class MetricsRegistry:
+    """Counters and histograms in Prometheus text format, recorded into per-thread shards"""
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.definitions = {}           # name -> (type, help, label names, buckets)
+        self.shards = []                # (owning thread, (counters, histograms))
+        self.retired = ({}, {})         # Folded shards of threads that have exited
+        self.shards_lock = threading.Lock()
+        self.local = threading.local()
+        self.collectors = {}            # key -> callable returning [(name, label values, value)]
+
+    def describe(self, name: str, metric_type: str, help_text: str, labels: tuple = (),
+                 buckets: tuple = None):
+        """Declare a counter, gauge or histogram"""
+        self.definitions[name] = (metric_type, help_text, labels, buckets or self.DEFAULT_BUCKETS)
+
+    def shard(self) -> tuple:
+        """This thread's (counters, histograms); the lock is only taken once per thread"""
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = ({}, {})
+            self.local.shard = shard
+            with self.shards_lock:
+                self.retire_finished()
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def retire_finished(self):
+        """Fold shards of exited threads into one, so per-request threads don't grow the list (lock held)"""
+        live = []
+        for thread, shard in self.shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self.merge(self.retired, shard)
+        self.shards = live
+
+    @staticmethod
+    def merge(into: tuple, shard: tuple):
+        """Add one shard's counters and histograms into another"""
+        counters, histograms = into
+        for key, value in list(shard[0].items()):
+            counters[key] = counters.get(key, 0) + value
+        for key, (buckets, total) in list(shard[1].items()):
+            merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        """Add to a counter"""
+        counters = self.shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: tuple, seconds: float):
+        """Record a histogram sample"""
+        histograms = self.shard()[1]
+        key = (name, labels)
+        state = histograms.get(key)
+        if state is None:
+            state = histograms[key] = [[0] * (len(self.definitions[name][3]) + 1), 0.0]
+        state[0][bisect.bisect_left(self.definitions[name][3], seconds)] += 1
+        state[1] += seconds
+
+    def register_collector(self, key: str, collect):
+        """Add (or replace) a callback sampled at scrape time, for gauges and existing stats"""
+        self.collectors[key] = collect
+
+    @staticmethod
+    def format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+        """Prometheus label set"""
+        pairs = []
+        for label, value in zip(names, values):
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{label}="{value}"')
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    @staticmethod
+    def format_value(value) -> str:
+        """Sample value at full precision; ints stay exact however large they get"""
+        if isinstance(value, int):
+            return str(int(value))
+        value = float(value)
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+
+    def render(self) -> str:
+        """Merge the shards and render every metric"""
+        totals = ({}, {})
+        with self.shards_lock:
+            self.retire_finished()
+            self.merge(totals, self.retired)
+            shards = [shard for _, shard in self.shards]
+        for shard in shards:
+            self.merge(totals, shard)
+
+        counters, histograms = totals
+        for collect in list(self.collectors.values()):
+            for name, labels, value in collect():
+                counters[(name, labels)] = value
+
+        lines = []
+        for name, (metric_type, help_text, label_names, bounds) in self.definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == 'histogram':
+                for (metric, labels), (buckets, total) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(bounds + (float('inf'),), buckets):
+                        cumulative += count
+                        le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                        lines.append(f"{name}_bucket{self.format_labels(label_names, labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{self.format_labels(label_names, labels)} {self.format_value(total)}")
+                    lines.append(f"{name}_count{self.format_labels(label_names, labels)} {cumulative}")
+            else:
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self.format_labels(label_names, labels)} {self.format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+METRICS = MetricsRegistry()
+METRICS.describe('gamepedia_http_requests_total', 'counter', 'HTTP requests handled', ('route', 'method', 'status'))
+METRICS.describe('gamepedia_http_request_duration_seconds', 'histogram', 'HTTP request latency', ('route',))
+METRICS.describe('gamepedia_upstream_requests_total', 'counter', 'Upstream calls by outcome', ('endpoint', 'status'))
+METRICS.describe('gamepedia_upstream_request_duration_seconds', 'histogram', 'Upstream call latency', ('endpoint',))
+METRICS.describe('gamepedia_cache_requests_total', 'counter', 'Cache lookups', ('cache', 'result'))
+METRICS.describe('gamepedia_sqlite_query_duration_seconds', 'histogram', 'SQLite statement latency',
+                 ('database', 'statement'), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0))
+METRICS.describe('gamepedia_rate_limit_rejections_total', 'counter', 'Requests refused by the rate limiter', ('action', 'reason'))
+METRICS.describe('gamepedia_admission_total', 'counter', 'Admission decisions per route', ('route', 'outcome'))
+METRICS.describe('gamepedia_admission_in_flight', 'gauge', 'Admitted requests in progress', ('route',))
+METRICS.describe('gamepedia_circuit_breaker_open', 'gauge', 'Whether an upstream circuit is open', ('endpoint',))
+METRICS.describe('gamepedia_upstream_quota_remaining', 'gauge', 'Upstream calls left in the daily budget')
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records statement latency"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.record(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.record(sql, time.perf_counter() - start)
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements are timed into gamepedia_sqlite_query_duration_seconds"""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.database_name = os.path.basename(str(database))
+
+    def record(self, sql: str, seconds: float):
+        """Record a statement under its leading keyword"""
+        statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else 'EMPTY'
+        METRICS.observe('gamepedia_sqlite_query_duration_seconds', (self.database_name, statement), seconds)
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+DB_BUSY_TIMEOUT = 10.0     # Seconds a connection waits for another worker's write lock before failing
+
+def connect_db(database: str, **kwargs) -> sqlite3.Connection:
+    """Open a SQLite connection with statement timing"""
+    kwargs.setdefault('timeout', DB_BUSY_TIMEOUT)
+    conn = sqlite3.connect(database, factory=TimedConnection, **kwargs)
+    # Safe with WAL (set by migrate_database): commits skip the fsync, checkpoints still sync
+    conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+def migrate_database(database: str, migrations: list) -> int:
+    """Apply the migrations newer than the database's PRAGMA user_version, returning how many ran"""
+    conn = connect_db(database, isolation_level=None)
+    try:
+        # Persistent per database: readers never block the worker that is writing
+        conn.execute('PRAGMA journal_mode = WAL')
+        # Cheap check first, so an up-to-date database costs one read at startup
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= len(migrations):
+            return 0
+        # Re-read under the write lock so concurrent processes apply each migration once
+        conn.execute('BEGIN IMMEDIATE')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        try:
+            cursor = conn.cursor()
+            for migration in migrations[version:]:
+                migration(cursor)
+            conn.execute(f'PRAGMA user_version = {len(migrations)}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return max(0, len(migrations) - version)
+    finally:
+        conn.close()
+
+class Trace:
+    """Spans recorded while serving one request"""
+
+    def __init__(self, name: str, clock=time.perf_counter):
+        self.name = name
+        self.clock = clock
+        self.trace_id = secrets.token_hex(8)
+        self.wall_start = time.time()
+        self.start = clock()
+        self.spans = []                 # (name, lane, start offset, duration)
+
+    def record(self, name: str, start: float, duration: float):
+        """Add a finished span; concurrent tasks get their own lane so spans nest per lane"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        lane = id(task) if task is not None else threading.get_ident()
+        self.spans.append((name, lane, start - self.start, duration))
+
+    def elapsed(self) -> float:
+        """Seconds since the trace started"""
+        return self.clock() - self.start
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: milliseconds per span name, summed, plus the total so far"""
+        totals = {}
+        for name, _, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        metrics = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        metrics.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ', '.join(metrics)
+
+    def chrome_events(self) -> list:
+        """Spans as Chrome trace 'complete' events (microseconds), loadable in Perfetto or chrome://tracing"""
+        lanes = {}
+        events = [{'name': self.name, 'ph': 'X', 'pid': 1, 'tid': 0, 'ts': 0,
+                   'dur': round(self.elapsed() * 1e6)}]
+        for name, lane, offset, duration in self.spans:
+            events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': lanes.setdefault(lane, len(lanes)),
+                           'ts': round(offset * 1e6), 'dur': round(duration * 1e6)})
+        return events
+
+CURRENT_TRACE = contextvars.ContextVar('gamepedia_trace', default=None)
+
+@contextmanager
+def span(name: str):
+    """Time a block into the current request's trace; a no-op outside one"""
+    trace = CURRENT_TRACE.get()
+    if trace is None:
+        yield
+        return
+    start = trace.clock()
+    try:
+        yield
+    finally:
+        trace.record(name, start, trace.clock() - start)
+
+class TraceRecorder:
+    """Appends a sampled share of finished traces to a JSONL file, one Chrome trace per line"""
+
+    def __init__(self, path: str, sample_rate: float = 0.0, rng: random.Random = None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.random = rng or random.Random()
+        self.lock = threading.Lock()
+
+    def maybe_record(self, trace: Trace, status: int = None) -> bool:
+        """Write the trace if it is sampled"""
+        if self.sample_rate <= 0 or self.random.random() >= self.sample_rate:
+            return False
+        line = json.dumps({
+            'traceEvents': trace.chrome_events(),
+            'displayTimeUnit': 'ms',
+            'metadata': {'trace_id': trace.trace_id, 'route': trace.name, 'status': status,
+                         'started_at': datetime.fromtimestamp(trace.wall_start).isoformat()},
+        }, separators=(',', ':'))
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+        return True
+
+class ProfilerService:
+    """On-demand CPU profiles, stack sampling and allocation diffs for a running server"""
+
+    MAX_SECONDS = 60
+    # Leaf frames of threads parked on a lock, selector or socket
+    IDLE_LEAVES = {('threading.py', 'wait'), ('selectors.py', 'select'), ('socket.py', 'readinto'),
+                   ('socket.py', 'accept'), ('queue.py', 'get'), ('threading.py', '_wait_for_tstate_lock')}
+
+    # Since 3.12 cProfile follows every thread and only one profiler may be active per process
+    PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+    def __init__(self):
+        self.session_lock = threading.Lock()    # One CPU session at a time
+        self.collect_lock = threading.Lock()
+        self.cprofile_active = False
+        self.collected = []
+        self.session_requests = 0
+        self.memory_baseline = None
+        self.scopes = {}
+
+    @contextmanager
+    def profile_request(self):
+        """Count the enclosed request into a running cProfile session, profiling its thread before 3.12"""
+        if not self.cprofile_active:
+            yield
+            return
+        profile = None
+        if not self.PROCESS_WIDE_PROFILER:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool owns the hook; serve the request unprofiled rather than drop it
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self.collect_lock:
+                if self.cprofile_active:
+                    self.session_requests += 1
+                    if profile is not None:
+                        self.collected.append(profile)
+
+    def run_cprofile(self, seconds: float, sort: str = 'cumulative', limit: int = 40) -> dict:
+        """Profile every request handled in the next N seconds and return pstats text"""
+        if not self.session_lock.acquire(blocking=False):
+            return {"error": "A profiling session is already running"}
+        try:
+            session_profile = None
+            if self.PROCESS_WIDE_PROFILER:
+                session_profile = cProfile.Profile()
+                try:
+                    session_profile.enable()
+                except ValueError:
+                    return {"error": "Another profiling tool is already active"}
+            with self.collect_lock:
+                self.collected = []
+                self.session_requests = 0
+                self.cprofile_active = True
+            try:
+                time.sleep(seconds)
+            finally:
+                if session_profile is not None:
+                    session_profile.disable()
+                with self.collect_lock:
+                    self.cprofile_active = False
+                    profiles, self.collected = self.collected, []
+                    handled = self.session_requests
+            if session_profile is not None:
+                profiles = [session_profile]
+            
+            if not handled or not profiles:
+                return {'requests': handled, 'output': 'No requests were profiled while the session ran\n'}
+            output = io.StringIO()
+            stats = pstats.Stats(*profiles, stream=output)
+            stats.sort_stats(sort).print_stats(limit)
+            return {'requests': handled, 'output': output.getvalue()}
+        finally:
+            self.session_lock.release()
+
+    @staticmethod
+    def frame_label(frame) -> str:
+        """function (file:line) for a collapsed stack"""
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+    def run_sampler(self, seconds: float, interval: float = 0.005, include_idle: bool = False) -> dict:
+        """Sample every thread's stack for N seconds, returning collapsed stacks for flamegraph.pl"""
+        if not self.session_lock.acquire(blocking=False):
+            return {"error": "A profiling session is already running"}
+        try:
+            me = threading.get_ident()
+            names = {}
+            counts = defaultdict(int)
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    code = frame.f_code
+                    if not include_idle and (os.path.basename(code.co_filename), code.co_name) in self.IDLE_LEAVES:
+                        continue
+                    if ident not in names:
+                        names.update({t.ident: re.sub(r'-\d+', '', t.name).replace(';', ':')
+                                      for t in threading.enumerate()})
+                    stack = []
+                    while frame is not None:
+                        stack.append(self.frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, 'thread'))
+                    counts[';'.join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(interval)
+            
+            lines = [f"{stack} {count}" for stack, count in sorted(counts.items(), key=lambda item: -item[1])]
+            return {'samples': samples, 'output': '\n'.join(lines) + '\n' if lines else ''}
+        finally:
+            self.session_lock.release()
+
+    def take_memory_baseline(self, frames: int = 1) -> dict:
+        """Start tracemalloc if needed and remember a snapshot to diff against"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.memory_baseline = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        return {'tracing': True, 'traced_bytes': current, 'peak_bytes': peak}
+
+    def scope_of(self, filename: str, lineno: int) -> str:
+        """Innermost class/function enclosing a source line, e.g. GameDataManager.get_game_details"""
+        if filename not in self.scopes:
+            index = []
+            try:
+                tree = ast.parse(Path(filename).read_text(encoding='utf-8'))
+            except (OSError, SyntaxError, ValueError):
+                tree = None
+
+            def visit(node, prefix):
+                for child in ast.iter_child_nodes(node):
+                    if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                        name = f"{prefix}{child.name}"
+                        index.append((child.lineno, child.end_lineno, name))
+                        visit(child, name + '.')
+
+            if tree is not None:
+                visit(tree, '')
+            self.scopes[filename] = index
+        
+        enclosing = [(end - start, name) for start, end, name in self.scopes[filename] if start <= lineno <= end]
+        return min(enclosing)[1] if enclosing else '<module>'
+
+    def memory_diff(self, limit: int = 25, scope: str = 'proxy') -> dict:
+        """Allocation sites that grew since the baseline, largest first"""
+        if self.memory_baseline is None or not tracemalloc.is_tracing():
+            return {"error": "Take a baseline first"}
+        
+        snapshot = tracemalloc.take_snapshot()
+        if scope == 'proxy':
+            filters = [tracemalloc.Filter(True, __file__)]
+        else:
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = snapshot.filter_traces(filters).compare_to(self.memory_baseline.filter_traces(filters), 'lineno')
+        
+        growing = [stat for stat in differences if stat.size_diff > 0]
+        sites = []
+        for stat in growing[:limit]:
+            frame = stat.traceback[0]
+            sites.append({
+                'site': f"{frame.filename}:{frame.lineno}",
+                'scope': self.scope_of(frame.filename, frame.lineno),
+                'source': linecache.getline(frame.filename, frame.lineno).strip(),
+                'size_diff': stat.size_diff,
+                'size': stat.size,
+                'count_diff': stat.count_diff,
+            })
+        return {'growth_bytes': sum(stat.size_diff for stat in growing), 'sites': sites}
+
+    def stop_memory_tracing(self) -> dict:
+        """Stop tracemalloc and drop the baseline"""
+        tracemalloc.stop()
+        self.memory_baseline = None
+        return {'tracing': False}
+
+def upstream_base(name: str, default: str) -> str:
+    """Base URL for an upstream API, overridable with GAMEPEDIA_<NAME>_BASE (e.g. to use steam_standin.py)"""
+    return os.environ.get(f'GAMEPEDIA_{name}_BASE', default).rstrip('/')
+
+class CircuitOpenError(Exception):
+    """Raised when an open circuit breaker rejects an upstream call"""
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker tripping on failure rate or slow-call rate"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window_size: int = 20, minimum_calls: int = 5,
+                 failure_rate_threshold: float = 0.5, slow_call_seconds: float = 3.0,
+                 slow_call_rate_threshold: float = 0.5, open_seconds: float = 30.0,
+                 half_open_max_calls: int = 1, clock=time.monotonic):
+        self.name = name
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self.opened_at = 0.0
+        self.half_open_in_flight = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go upstream right now"""
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.open_seconds:
+                    return False
+                # Cool-down elapsed, let probes through
+                self.state = self.HALF_OPEN
+                self.half_open_in_flight = 0
+
+            if self.state == self.HALF_OPEN:
+                if self.half_open_in_flight >= self.half_open_max_calls:
+                    return False
+                self.half_open_in_flight += 1
+
+            return True
+
+    def record_success(self, latency: float):
+        """Record a completed call"""
+        self.record(False, latency)
+
+    def record_failure(self, latency: float):
+        """Record a failed call (timeout, connection error, 5xx, 429)"""
+        self.record(True, latency)
+
+    def record(self, failed: bool, latency: float):
+        """Record a call outcome and update breaker state"""
+        slow = latency >= self.slow_call_seconds
+
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.half_open_in_flight = max(0, self.half_open_in_flight - 1)
+                if failed or slow:
+                    self.trip()
+                else:
+                    # Probe succeeded, start over with a clean window
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                return
+
+            if self.state == self.OPEN:
+                # Late result from a call started before the breaker tripped
+                return
+
+            self.outcomes.append((failed, slow))
+            if len(self.outcomes) < self.minimum_calls:
+                return
+
+            total = len(self.outcomes)
+            failure_rate = sum(1 for f, _ in self.outcomes if f) / total
+            slow_rate = sum(1 for _, s in self.outcomes if s) / total
+
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self.trip()
+
+    def trip(self):
+        """Open the breaker (caller holds the lock)"""
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+        self.outcomes.clear()
+        self.half_open_in_flight = 0
+
+    def snapshot(self) -> dict:
+        """Current breaker state for diagnostics"""
+        with self.lock:
+            return {
+                'name': self.name,
+                'state': self.state,
+                'recent_calls': len(self.outcomes),
+                'recent_failures': sum(1 for f, _ in self.outcomes if f),
+            }
+
+class LatencyTracker:
+    """Rolling window of observed latencies for one upstream endpoint"""
+
+    def __init__(self, window_size: int = 200):
+        self.samples = deque(maxlen=window_size)
+        self.lock = threading.Lock()
+
+    def record(self, latency: float):
+        """Record a successful call latency in seconds"""
+        with self.lock:
+            self.samples.append(latency)
+
+    def percentile(self, q: float) -> float | None:
+        """Latency at quantile q (0-1) over the window, None without samples"""
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def __len__(self):
+        return len(self.samples)
+
+class UpstreamQuota:
+    """Daily upstream call budget shared by primary requests and hedges"""
+
+    STEAM_DAILY_LIMIT = 100000      # Steam Web API allows 100,000 calls per day
+
+    def __init__(self, daily_limit: int = STEAM_DAILY_LIMIT, clock=time.time):
+        self.daily_limit = daily_limit
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.day = int(self.clock() // 86400)
+        self.used = 0
+
+    def roll_window(self):
+        """Reset the counter at the start of a new (UTC) day; caller holds the lock"""
+        day = int(self.clock() // 86400)
+        if day != self.day:
+            self.day = day
+            self.used = 0
+
+    def charge(self, calls: int = 1):
+        """Charge calls that are going upstream regardless of budget"""
+        with self.lock:
+            self.roll_window()
+            self.used += calls
+
+    def try_charge(self, calls: int = 1, reserve: int = 0) -> bool:
+        """Charge optional calls only if they fit in the budget minus a reserve"""
+        with self.lock:
+            self.roll_window()
+            if self.used + calls > self.daily_limit - reserve:
+                return False
+            self.used += calls
+            return True
+
+    def remaining(self) -> int:
+        """Calls left in today's budget"""
+        with self.lock:
+            self.roll_window()
+            return max(0, self.daily_limit - self.used)
+
+class CassetteResponse:
+    """Recorded upstream response, shaped like the parts of requests.Response the client uses"""
+
+    def __init__(self, status_code: int, content: bytes, url: str = ''):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1 << 16):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+class UpstreamCassette:
+    """Gzipped JSONL of sanitized upstream exchanges: recorded once, replayed without a network"""
+
+    SECRET_PARAMS = frozenset({'key', 'access_token'})
+
+    def __init__(self, path: str, time_scale: float = 1.0):
+        self.path = path
+        self.time_scale = time_scale    # Replay delay = recorded latency x scale; 0 replays instantly
+        self.entries = defaultdict(list)
+        self.cursors = defaultdict(int)
+        self.meta = {}
+        self.lock = threading.Lock()
+        self.writer = None
+        self.truncated = False          # The first write of a recording replaces any older cassette
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0}
+
+    @classmethod
+    def match_key(cls, url: str, params: dict) -> str:
+        """Host-independent key for a call, with credentials removed"""
+        clean = {k: str(v) for k, v in (params or {}).items() if k not in cls.SECRET_PARAMS}
+        return f"{urlparse(url).path}?{json.dumps(clean, sort_keys=True)}"
+
+    def load(self) -> 'UpstreamCassette':
+        """Read every recorded exchange"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if 'meta' in entry:
+                    self.meta.update(entry['meta'])
+                else:
+                    self.entries[entry['match']].append(entry)
+        return self
+
+    def write(self, entry: dict):
+        """Append one line, flushed so a killed process keeps what it recorded"""
+        with self.lock:
+            if self.writer is None:
+                self.writer = gzip.open(self.path, 'at' if self.truncated else 'wt', encoding='utf-8')
+                self.truncated = True
+                atexit.register(self.close)
+            self.writer.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self.writer.flush()
+
+    def record(self, url: str, params: dict, status: int, content: bytes, latency: float):
+        """Save one exchange"""
+        self.write({'match': self.match_key(url, params), 'status': status,
+                    'latency': round(latency, 4), 'body': content.decode('utf-8', errors='replace')})
+        with self.lock:
+            self.stats['recorded'] += 1
+
+    def record_meta(self, **meta):
+        """Save free-form context, e.g. which account a benchmark recorded"""
+        self.meta.update(meta)
+        self.write({'meta': meta})
+
+    def replay(self, url: str, params: dict) -> tuple:
+        """(response, delay) for a call; repeated calls cycle through their recordings"""
+        key = self.match_key(url, params)
+        with self.lock:
+            recordings = self.entries.get(key)
+            if not recordings:
+                self.stats['misses'] += 1
+                raise requests.ConnectionError(f"No cassette entry for {key}")
+            entry = recordings[self.cursors[key] % len(recordings)]
+            self.cursors[key] += 1
+            self.stats['replayed'] += 1
+        return CassetteResponse(entry['status'], entry['body'].encode('utf-8'), url), entry['latency'] * self.time_scale
+
+    def close(self):
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+class RecordingSession:
+    """Wraps a requests session and saves every response to a cassette"""
+
+    def __init__(self, session, cassette: UpstreamCassette):
+        self.session = session
+        self.cassette = cassette
+        self.headers = session.headers
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        # Read the whole body so it can be saved; streaming parses then run over the recorded bytes
+        start = time.monotonic()
+        response = self.session.get(url, params=params, timeout=timeout)
+        content = response.content
+        self.cassette.record(url, params, response.status_code, content, time.monotonic() - start)
+        return CassetteResponse(response.status_code, content, url)
+
+class ReplaySession:
+    """Serves a cassette in place of the network, sleeping for the scaled recorded latency"""
+
+    def __init__(self, cassette: UpstreamCassette):
+        self.cassette = cassette
+        self.headers = {}
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        response, delay = self.cassette.replay(url, params)
+        if timeout and delay > timeout:
+            # The recorded call would not have finished in time; fail the way requests does
+            time.sleep(timeout)
+            raise requests.Timeout(f"Replayed call took {delay:.3f}s, longer than the {timeout}s timeout")
+        if delay > 0:
+            time.sleep(delay)
+        return response
+
+class UpstreamClient:
+    """Shared HTTP client for Steam/RAWG calls with circuit breakers and stale fallback"""
+
+    def __init__(self, user_agent: str = 'GamePedia-Ultimate/3.0-Secure'):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent
+        })
+        # Worker processes each get an equal share of the key's daily budget
+        workers = max(1, int(os.environ.get('GAMEPEDIA_WORKERS', '1')))
+        self.quota = UpstreamQuota(UpstreamQuota.STEAM_DAILY_LIMIT // workers)
+        self.setup_circuit_breakers()
+        self.setup_stale_cache()
+        self.setup_hedging()
+        self.setup_cassette()
+
+    def setup_circuit_breakers(self):
+        """Configure per-endpoint circuit breakers"""
+        self.breaker_settings = {
+            'window_size': 20,
+            'minimum_calls': 5,
+            'failure_rate_threshold': 0.5,
+            'slow_call_seconds': 3.0,       # Calls slower than this count against the endpoint
+            'slow_call_rate_threshold': 0.5,
+            'open_seconds': 30.0,           # Fail fast for 30 seconds before probing again
+            'half_open_max_calls': 1,
+        }
+        self.circuit_breakers = {}
+        self.breakers_lock = threading.Lock()
+
+    def setup_stale_cache(self):
+        """Configure last-known-good response cache"""
+        self.stale_cache_size = 2048
+        self.last_good = OrderedDict()
+        self.stale_lock = threading.Lock()
+
+    def setup_hedging(self):
+        """Configure request hedging for idempotent GETs (off unless enabled)"""
+        self.hedging_enabled = os.environ.get('GAMEPEDIA_HEDGE_REQUESTS') == '1'
+        self.hedge_percentile = 0.95    # Fire a duplicate once a call outlives the observed p95
+        self.hedge_min_samples = 20     # Need this many samples before trusting the p95
+        self.hedge_min_delay = 0.05
+        self.hedge_max_ratio = 0.05     # At most ~5% extra upstream calls
+        self.hedge_burst = 5.0
+        self.hedge_quota_reserve = 1000 # Leave quota headroom for primary calls
+        self.hedge_tokens = self.hedge_burst
+        self.hedge_lock = threading.Lock()
+        self.hedge_executor = None
+        self.hedge_stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+        self.latency_trackers = defaultdict(LatencyTracker)
+
+    def setup_cassette(self):
+        """Record upstream traffic to, or replay it from, a cassette (GAMEPEDIA_CASSETTE_MODE=record|replay)"""
+        self.cassette = None
+        mode = os.environ.get('GAMEPEDIA_CASSETTE_MODE')
+        if mode in ('record', 'replay'):
+            self.use_cassette(mode, os.environ.get('GAMEPEDIA_CASSETTE_PATH', 'gamepedia_upstream.cassette.gz'),
+                              float(os.environ.get('GAMEPEDIA_CASSETTE_TIME_SCALE', '1.0')))
+
+    def use_cassette(self, mode: str, path: str, time_scale: float = 1.0) -> UpstreamCassette:
+        """Switch this client to recording into or replaying from a cassette file"""
+        self.cassette = UpstreamCassette(path, time_scale)
+        if mode == 'record':
+            self.session = RecordingSession(self.session, self.cassette)
+        else:
+            self.session = ReplaySession(self.cassette.load())
+        return self.cassette
+
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get (or lazily create) the breaker for an endpoint"""
+        with self.breakers_lock:
+            breaker = self.circuit_breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint, **self.breaker_settings)
+                self.circuit_breakers[endpoint] = breaker
+            return breaker
+
+    def stale_key(self, endpoint: str, params: dict) -> str:
+        """Cache key for a call; credentials are hashed, never stored"""
+        canonical = json.dumps(params or {}, sort_keys=True, default=str)
+        return f"{endpoint}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    def remember(self, key: str, data: dict):
+        """Store the last good response for a call"""
+        with self.stale_lock:
+            self.last_good[key] = data
+            self.last_good.move_to_end(key)
+            while len(self.last_good) > self.stale_cache_size:
+                self.last_good.popitem(last=False)
+
+    def recall_stale(self, key: str) -> dict | None:
+        """Return the last good response flagged as stale, if any"""
+        with self.stale_lock:
+            data = self.last_good.get(key)
+        if data is None:
+            return None
+        return {**data, 'stale': True}
+
+    @staticmethod
+    def is_upstream_failure(error: Exception) -> bool:
+        """Whether an error indicates upstream trouble rather than a bad request"""
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status >= 500 or status == 429
+        return True
+
+    def fetch(self, endpoint: str, url: str, params: dict, timeout: float, parse=None) -> dict:
+        """Perform a single upstream GET and decode the JSON body (or stream it through parse)"""
+        start = time.monotonic()
+        status = 'error'
+        try:
+            if parse is None:
+                response = self.session.get(url, params=params, timeout=timeout)
+                status = str(response.status_code)
+                response.raise_for_status()
+                data = response.json()
+            else:
+                with self.session.get(url, params=params, timeout=timeout, stream=True) as response:
+                    status = str(response.status_code)
+                    response.raise_for_status()
+                    data = parse(response.iter_content(chunk_size=1 << 16))
+        finally:
+            elapsed = time.monotonic() - start
+            METRICS.inc('gamepedia_upstream_requests_total', (endpoint, status))
+            METRICS.observe('gamepedia_upstream_request_duration_seconds', (endpoint,), elapsed)
+        self.latency_trackers[endpoint].record(elapsed)
+        return data
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """How long to wait before hedging a call, None if not enough samples yet"""
+        tracker = self.latency_trackers[endpoint]
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile))
+
+    def try_spend_hedge(self) -> bool:
+        """Take a hedge token and charge the hedge against the upstream quota"""
+        with self.hedge_lock:
+            if self.hedge_tokens < 1:
+                return False
+            if not self.quota.try_charge(1, reserve=self.hedge_quota_reserve):
+                return False
+            self.hedge_tokens -= 1
+            self.hedge_stats['hedged'] += 1
+            return True
+
+    def get_hedge_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool used for hedged calls"""
+        with self.hedge_lock:
+            if self.hedge_executor is None:
+                self.hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='upstream-hedge')
+            return self.hedge_executor
+
+    def fetch_hedged(self, endpoint: str, url: str, params: dict, timeout: float, parse=None) -> dict:
+        """Fetch, firing a duplicate request if the first outlives the endpoint's p95"""
+        with self.hedge_lock:
+            self.hedge_stats['requests'] += 1
+            # Every primary call earns a fraction of a hedge, capping the hedge rate
+            self.hedge_tokens = min(self.hedge_burst, self.hedge_tokens + self.hedge_max_ratio)
+
+        delay = self.hedge_delay(endpoint)
+        if delay is None:
+            return self.fetch(endpoint, url, params, timeout, parse)
+
+        executor = self.get_hedge_executor()
+        primary = executor.submit(self.fetch, endpoint, url, params, timeout, parse)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.try_spend_hedge():
+            return primary.result()
+
+        hedge = executor.submit(self.fetch, endpoint, url, params, timeout, parse)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self.hedge_lock:
+                            self.hedge_stats['hedge_wins'] += 1
+                    # The slower duplicate finishes in the background and is discarded
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def get_json(self, endpoint: str, url: str, params: dict, timeout: float = 10,
+                 serve_stale: bool = True, hedge: bool = False, parse=None) -> dict:
+        """GET a JSON document through the endpoint's circuit breaker"""
+        breaker = self.get_breaker(endpoint)
+        key = self.stale_key(endpoint, params)
+
+        if not breaker.allow_request():
+            METRICS.inc('gamepedia_upstream_requests_total', (endpoint, 'circuit_open'))
+            stale = self.recall_stale(key) if serve_stale else None
+            if stale is not None:
+                METRICS.inc('gamepedia_upstream_requests_total', (endpoint, 'served_stale'))
+                return stale
+            raise CircuitOpenError(f"{endpoint} is temporarily unavailable (circuit open)")
+
+        start = time.monotonic()
+        self.quota.charge()
+        try:
+            if hedge and self.hedging_enabled:
+                data = self.fetch_hedged(endpoint, url, params, timeout, parse)
+            else:
+                data = self.fetch(endpoint, url, params, timeout, parse)
+        except Exception as e:
+            latency = time.monotonic() - start
+            if self.is_upstream_failure(e):
+                breaker.record_failure(latency)
+                stale = self.recall_stale(key) if serve_stale else None
+                if stale is not None:
+                    METRICS.inc('gamepedia_upstream_requests_total', (endpoint, 'served_stale'))
+                    return stale
+            else:
+                # Upstream answered; the request itself was bad (e.g. invalid API key)
+                breaker.record_success(latency)
+            raise
+
+        latency = time.monotonic() - start
+        breaker.record_success(latency)
+        self.remember(key, data)
+        return data
+
+    def breaker_states(self) -> dict:
+        """Snapshot of all breaker states"""
+        with self.breakers_lock:
+            breakers = list(self.circuit_breakers.values())
+        return {b.name: b.snapshot() for b in breakers}
+
+class PlayerSummaryBatcher:
+    """Collects GetPlayerSummaries lookups for a few milliseconds and sends up to 100 IDs per call.
+    Calls never mix API keys, so lookups from different sessions only share a batch when a
+    server-side key (GAMEPEDIA_STEAM_API_KEY) is configured; summaries are public profile data"""
+
+    def __init__(self, upstream: UpstreamClient, max_batch: int = 100, max_wait: float = 0.005,
+                 shared_key: str = None):
+        self.upstream = upstream
+        self.shared_key = shared_key or os.environ.get('GAMEPEDIA_STEAM_API_KEY') or None
+        self.url = upstream_base('STEAM_API', 'https://api.steampowered.com') + '/ISteamUser/GetPlayerSummaries/v0002/'
+        self.max_batch = max_batch          # Steam accepts at most 100 steamids per call
+        self.max_wait = max_wait
+        self.pending = OrderedDict()        # api_key -> {steam_id: [Future, ...]}
+        self.pending_count = 0
+        self.first_pending_at = None
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='summary-batch')
+        self.stats = {'lookups': 0, 'upstream_calls': 0}
+        self.worker = None
+
+    def submit(self, api_key: str, steam_id: str) -> Future:
+        """Queue a lookup; the future resolves to the get_player_summaries response shape"""
+        api_key = self.shared_key or api_key
+        future = Future()
+        with self.condition:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name='summary-batcher', daemon=True)
+                self.worker.start()
+            waiters = self.pending.setdefault(api_key, {})
+            if steam_id not in waiters:
+                self.pending_count += 1
+            waiters.setdefault(steam_id, []).append(future)
+            self.stats['lookups'] += 1
+            if self.first_pending_at is None:
+                self.first_pending_at = time.monotonic()
+            self.condition.notify()
+        return future
+
+    def run(self):
+        """Worker loop: wait for a full batch or the collection window, then dispatch"""
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                deadline = self.first_pending_at + self.max_wait
+                while self.pending_count < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                pending = self.take_full_batches() if time.monotonic() < deadline else None
+                if not pending:
+                    pending, self.pending = self.pending, OrderedDict()
+                    self.pending_count = 0
+                    self.first_pending_at = None
+
+            for api_key, waiters in pending.items():
+                steam_ids = list(waiters)
+                for start in range(0, len(steam_ids), self.max_batch):
+                    chunk = {sid: waiters[sid] for sid in steam_ids[start:start + self.max_batch]}
+                    self.executor.submit(self.dispatch, api_key, chunk)
+
+    def take_full_batches(self) -> OrderedDict:
+        """Remove whole max_batch chunks from the queue, leaving the remainder to its window (lock held)"""
+        taken = OrderedDict()
+        for api_key, waiters in list(self.pending.items()):
+            full = len(waiters) - len(waiters) % self.max_batch
+            if not full:
+                continue
+            steam_ids = list(waiters)[:full]
+            taken[api_key] = {steam_id: waiters.pop(steam_id) for steam_id in steam_ids}
+            self.pending_count -= full
+            if not waiters:
+                del self.pending[api_key]
+        if not self.pending:
+            self.first_pending_at = None
+        return taken
+
+    @staticmethod
+    def single_params(api_key: str, steam_id: str) -> dict:
+        """Params of the equivalent one-ID call, used as the per-player stale cache key"""
+        return {'key': api_key, 'steamids': steam_id, 'format': 'json'}
+
+    @staticmethod
+    def resolve(futures: list, result: dict):
+        """Hand a result to every waiter that has not given up on it"""
+        for future in futures:
+            if not future.done() and future.set_running_or_notify_cancel():
+                future.set_result(result)
+
+    def dispatch(self, api_key: str, waiters: dict):
+        """Make one upstream call for a chunk of IDs and resolve every waiting future"""
+        endpoint = 'steam.player_summaries'
+        params = {'key': api_key, 'steamids': ','.join(waiters), 'format': 'json'}
+        with self.condition:
+            self.stats['upstream_calls'] += 1
+
+        try:
+            try:
+                data = self.upstream.get_json(endpoint, self.url, params, timeout=10,
+                                              serve_stale=False, hedge=True)
+            except Exception as e:
+                for steam_id, futures in waiters.items():
+                    stale = self.upstream.recall_stale(
+                        self.upstream.stale_key(endpoint, self.single_params(api_key, steam_id))
+                    )
+                    self.resolve(futures, stale if stale is not None else
+                                 {"error": f"Failed to get player summaries: {str(e)}"})
+                return
+
+            players = {p.get('steamid'): p for p in data.get('response', {}).get('players', [])}
+            for steam_id, futures in waiters.items():
+                player = players.get(steam_id)
+                result = {'response': {'players': [player] if player else []}}
+                if player:
+                    self.upstream.remember(
+                        self.upstream.stale_key(endpoint, self.single_params(api_key, steam_id)), result
+                    )
+                self.resolve(futures, result)
+        finally:
+            # Whatever went wrong above, no caller is left waiting forever
+            for futures in waiters.values():
+                self.resolve(futures, {"error": "Failed to get player summaries: batch dispatch failed"})
 
 class SecurityManager:
     """Advanced security management with multiple layers of protection"""
@@ -42,26 +1218,28 @@ class SecurityManager:
         """Initialize military-grade encryption"""
         # Generate or load encryption key
         key_file = '.security_key'
-        if os.path.exists(key_file):
-            with open(key_file, 'rb') as f:
-                self.encryption_key = f.read()
-        else:
-            # Generate new key
-            password = secrets.token_bytes(32)
-            salt = secrets.token_bytes(16)
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-            )
-            self.encryption_key = base64.urlsafe_b64encode(kdf.derive(password))
+        if not os.path.exists(key_file):
+            # A fresh random key; stretching random bytes through a KDF adds no strength
+            key = base64.urlsafe_b64encode(secrets.token_bytes(32))
             
-            # Save key securely
-            with open(key_file, 'wb') as f:
-                f.write(self.encryption_key)
-            os.chmod(key_file, 0o600)  # Read-only for owner
+            # Save key securely, written aside and linked into place so workers starting together
+            # all end up with the first key rather than each overwriting it with their own
+            temp_file = f"{key_file}.{os.getpid()}.{threading.get_ident()}"
+            fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)  # Read-only for owner
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(key)
+                os.link(temp_file, key_file)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temp_file)
+        
+        with open(key_file, 'rb') as f:
+            self.encryption_key = f.read()
             
+        # Imported here so cryptography loads with the proxy rather than with the module
+        from cryptography.fernet import Fernet
         self.cipher = Fernet(self.encryption_key)
         
     def setup_database(self):
@@ -70,10 +1248,11 @@ class SecurityManager:
         self.init_database()
         
     def init_database(self):
-        """Create secure database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Bring the secure database up to the current schema version"""
+        migrate_database(self.db_path, [self.create_security_schema])
         
+    def create_security_schema(self, cursor):
+        """Schema version 1; idempotent so databases from before versioning upgrade in place"""
         # Sessions table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sessions (
@@ -126,9 +1305,6 @@ class SecurityManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-        
     def setup_rate_limiting(self):
         """Configure rate limiting"""
         self.rate_limits = {
@@ -168,63 +1344,70 @@ class SecurityManager:
         if action not in self.rate_limits:
             return True
             
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # One write transaction from read to update, so workers sharing the database count every request
+        conn = connect_db(self.db_path, isolation_level=None)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = conn.cursor()
         
-        limit_config = self.rate_limits[action]
-        window_start = datetime.now() - timedelta(seconds=limit_config['window'])
+            limit_config = self.rate_limits[action]
+            window_start = datetime.now() - timedelta(seconds=limit_config['window'])
         
-        cursor.execute('''
-            SELECT request_count, window_start, blocked_until FROM rate_limits 
-            WHERE ip_address = ?
-        ''', (ip_address,))
+            cursor.execute('''
+                SELECT request_count, window_start, blocked_until FROM rate_limits 
+                WHERE ip_address = ?
+            ''', (ip_address,))
         
-        result = cursor.fetchone()
+            result = cursor.fetchone()
         
-        if result:
-            count, start, blocked_until = result
+            if result:
+                count, start, blocked_until = result
             
-            # Check if currently blocked
-            if blocked_until and datetime.fromisoformat(str(blocked_until)) > datetime.now():
-                conn.close()
-                return False
+                # Check if currently blocked
+                if blocked_until and datetime.fromisoformat(str(blocked_until)) > datetime.now():
+                    METRICS.inc('gamepedia_rate_limit_rejections_total', (action, 'blocked'))
+                    return False
                 
-            # Check if within current window
-            if datetime.fromisoformat(start) > window_start:
-                if count >= limit_config['max']:
-                    # Block IP for 1 hour
+                # Check if within current window
+                if datetime.fromisoformat(start) > window_start:
+                    if count >= limit_config['max']:
+                        # Block IP for 1 hour
+                        cursor.execute('''
+                            UPDATE rate_limits 
+                            SET blocked_until = ? 
+                            WHERE ip_address = ?
+                        ''', (datetime.now() + timedelta(hours=1), ip_address))
+                        conn.commit()
+                        METRICS.inc('gamepedia_rate_limit_rejections_total', (action, 'limit_exceeded'))
+                        return False
+                    
+                    # Increment counter
                     cursor.execute('''
                         UPDATE rate_limits 
-                        SET blocked_until = ? 
+                        SET request_count = request_count + 1 
                         WHERE ip_address = ?
-                    ''', (datetime.now() + timedelta(hours=1), ip_address))
-                    conn.commit()
-                    conn.close()
-                    return False
-                    
-                # Increment counter
-                cursor.execute('''
-                    UPDATE rate_limits 
-                    SET request_count = request_count + 1 
-                    WHERE ip_address = ?
-                ''', (ip_address,))
+                    ''', (ip_address,))
+                else:
+                    # Reset window
+                    cursor.execute('''
+                        UPDATE rate_limits 
+                        SET request_count = 1, window_start = ? 
+                        WHERE ip_address = ?
+                    ''', (datetime.now(), ip_address))
             else:
-                # Reset window
+                # First request from this IP
                 cursor.execute('''
-                    UPDATE rate_limits 
-                    SET request_count = 1, window_start = ? 
-                    WHERE ip_address = ?
-                ''', (datetime.now(), ip_address))
-        else:
-            # First request from this IP
-            cursor.execute('''
-                INSERT INTO rate_limits (ip_address, request_count) 
-                VALUES (?, 1)
-            ''', (ip_address,))
+                    INSERT INTO rate_limits (ip_address, request_count) 
+                    VALUES (?, 1)
+                ''', (ip_address,))
             
-        conn.commit()
-        conn.close()
-        return True
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
         
     def log_audit(self, user_id: str | None, action: str, ip_address: str, 
                   user_agent: str, details: str = None, success: bool = True):
@@ -232,7 +1415,7 @@ class SecurityManager:
         if not self.audit_enabled:
             return
             
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_db(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -249,7 +1432,7 @@ class SecurityManager:
         
     def validate_session_security(self, token: str, ip_address: str, user_agent: str) -> bool:
         """Validate session with additional security checks"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_db(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -296,15 +1479,21 @@ class SecurityManager:
 class GameDataManager:
     """Comprehensive game data management system"""
     
-    def __init__(self):
+    def __init__(self, upstream: UpstreamClient = None, db_path: str = 'gamepedia_games.db'):
+        self.upstream = upstream or UpstreamClient()
+        self.db_path = db_path
         self.setup_game_database()
         self.setup_external_apis()
+        self.setup_bulk_fetch()
         
     def setup_game_database(self):
-        """Initialize comprehensive game database"""
-        conn = sqlite3.connect('gamepedia_games.db')
-        cursor = conn.cursor()
-        
+        """Bring the game database up to the current schema version"""
+        migrate_database(self.db_path, [self.create_game_schema, self.add_game_change_counter,
+                                        self.backfill_user_game_names, self.create_job_leases,
+                                        self.add_library_sync_version])
+
+    def create_game_schema(self, cursor):
+        """Schema version 1; idempotent so databases from before versioning upgrade in place"""
         # Games table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS games (
@@ -332,6 +1521,7 @@ class GameDataManager:
                 supported_languages TEXT,
                 reviews_positive INTEGER DEFAULT 0,
                 reviews_negative INTEGER DEFAULT 0,
+                rawg_tags TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -351,6 +1541,8 @@ class GameDataManager:
                 wishlist BOOLEAN DEFAULT 0,
                 favorite BOOLEAN DEFAULT 0,
                 custom_tags TEXT,
+                name TEXT,
+                img_icon_url TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 PRIMARY KEY (user_id, game_id)
@@ -398,31 +1590,144 @@ class GameDataManager:
                 recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
-        conn.commit()
-        conn.close()
-        
-    def setup_external_apis(self):
-        """Configure external gaming APIs"""
-        self.steam_api_base = "https://api.steampowered.com"
-        self.steam_store_base = "https://store.steampowered.com/api"
-        self.rawg_api_base = "https://api.rawg.io/api"
-        self.igdb_api_base = "https://api.igdb.com/v4"
-        
-    async def get_game_details(self, app_id: int) -> dict:
-        """Get comprehensive game details"""
-        try:
-            # Get Steam store data
-            steam_response = await self.get_steam_store_data(app_id)
-            
-            # Get additional data from RAWG
-            rawg_response = await self.get_rawg_data(steam_response.get('name', ''))
-            
+
+        # Price refresh bookkeeping (game_id is the Steam app ID)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS price_refresh_state (
+                game_id INTEGER PRIMARY KEY,
+                last_refreshed_at TIMESTAMP,
+                last_price REAL,
+                last_discount_percent INTEGER
+            )
+        ''')
+
+        # Daily price rollups for history older than the raw sample window
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS price_history_daily (
+                game_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                price_min REAL,
+                price_max REAL,
+                price_close REAL,
+                discount_max INTEGER,
+                samples INTEGER DEFAULT 0,
+                PRIMARY KEY (game_id, day)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_price_history_game_time
+            ON price_history (game_id, recorded_at)
+        ''')
+
+        # Aggregates maintained incrementally from user_games deltas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_library_stats (
+                user_id TEXT PRIMARY KEY,
+                total_games INTEGER DEFAULT 0,
+                total_playtime INTEGER DEFAULT 0,
+                games_never_played INTEGER DEFAULT 0,
+                games_played_recently INTEGER DEFAULT 0,
+                most_played_appid INTEGER,
+                most_played_minutes INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # App-level achievement metadata shared by all users
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS achievement_schemas (
+                app_id INTEGER PRIMARY KEY,
+                schema TEXT,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Columns added after the first release
+        existing_columns = {row[1] for row in cursor.execute('PRAGMA table_info(games)')}
+        if 'rawg_tags' not in existing_columns:
+            cursor.execute('ALTER TABLE games ADD COLUMN rawg_tags TEXT')
+
+        existing_columns = {row[1] for row in cursor.execute('PRAGMA table_info(user_games)')}
+        for column in ('name', 'img_icon_url'):
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE user_games ADD COLUMN {column} TEXT')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_games_updated_at ON games (updated_at)
+        ''')
+
+    def add_game_change_counter(self, cursor):
+        """Schema version 2: stamp every games insert and update with a strictly increasing change_seq"""
+        # Timestamps can be written out of order (clock steps, slow transactions), so incremental
+        # readers follow this counter instead; it lives in its own row so deletes never lower it
+        cursor.execute('ALTER TABLE games ADD COLUMN change_seq INTEGER')
+        cursor.execute('CREATE TABLE game_change_counter (seq INTEGER NOT NULL)')
+        cursor.execute('UPDATE games SET change_seq = id')
+        cursor.execute('INSERT INTO game_change_counter (seq) SELECT COALESCE(MAX(id), 0) FROM games')
+        cursor.execute('CREATE INDEX idx_games_change_seq ON games (change_seq)')
+        for event, condition in (('INSERT', ''), ('UPDATE', 'WHEN NEW.change_seq IS OLD.change_seq')):
+            cursor.execute(f'''
+                CREATE TRIGGER games_change_seq_{event.lower()} AFTER {event} ON games {condition}
+                BEGIN
+                    UPDATE game_change_counter SET seq = seq + 1;
+                    UPDATE games SET change_seq = (SELECT seq FROM game_change_counter) WHERE id = NEW.id;
+                END
+            ''')
+
+    def backfill_user_game_names(self, cursor):
+        """Schema version 3: fill user_games names that predate the column from the games catalog"""
+        # Icon hashes only come from GetOwnedGames; UserLibraryStore.sync fills those on the next fetch
+        cursor.execute('''
+            UPDATE user_games
+            SET name = (SELECT g.name FROM games g WHERE g.steam_id = user_games.game_id)
+            WHERE name IS NULL AND game_id IN (SELECT steam_id FROM games)
+        ''')
+
+    def create_job_leases(self, cursor):
+        """Schema version 4: leases electing the one process that runs each background job"""
+        cursor.execute('''
+            CREATE TABLE job_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+
+    def add_library_sync_version(self, cursor):
+        """Schema version 5: count committed library syncs per user so workers can spot stale snapshots"""
+        cursor.execute('ALTER TABLE user_library_stats ADD COLUMN sync_version INTEGER NOT NULL DEFAULT 0')
+        
+    def setup_external_apis(self):
+        """Configure external gaming APIs"""
+        self.steam_api_base = upstream_base('STEAM_API', "https://api.steampowered.com")
+        self.steam_store_base = upstream_base('STEAM_STORE', "https://store.steampowered.com/api")
+        self.rawg_api_base = upstream_base('RAWG_API', "https://api.rawg.io/api")
+        self.igdb_api_base = upstream_base('IGDB_API', "https://api.igdb.com/v4")
+
+    def setup_bulk_fetch(self):
+        """Configure concurrent fetching of cache misses for bulk detail requests"""
+        self.bulk_fetch_workers = 8
+        self.bulk_max_misses = 25           # Misses fetched per request; the rest are deferred
+        self.bulk_quota_reserve = 5000      # Leave quota for user-facing Steam calls
+        self.details_executor = None
+        self.details_lock = threading.Lock()
+        
+    async def get_game_details(self, app_id: int) -> dict:
+        """Get comprehensive game details"""
+        try:
+            # Get Steam store data
+            steam_response = await self.get_steam_store_data(app_id)
+            
+            # Get additional data from RAWG
+            rawg_response = await self.get_rawg_data(steam_response.get('name', ''))
+            
             # Combine and structure data
             game_data = self.combine_game_data(steam_response, rawg_response)
             
-            # Save to database
-            self.save_game_data(game_data)
+            # Save to database (unknown or delisted apps have no store data to keep)
+            if game_data.get('steam_id'):
+                self.save_game_data(game_data)
             
             return game_data
             
@@ -436,11 +1741,10 @@ class GameDataManager:
             url = f"{self.steam_store_base}/appdetails"
             params = {'appids': app_id, 'format': 'json'}
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.upstream.get_json('steam.store_appdetails', url, params, timeout=10)
             if str(app_id) in data and data[str(app_id)]['success']:
+                if data.get('stale'):
+                    return {**data[str(app_id)]['data'], 'stale': True}
                 return data[str(app_id)]['data']
             return {}
             
@@ -448,16 +1752,306 @@ class GameDataManager:
             print(f"Error getting Steam store data: {e}")
             return {}
             
+    def get_cached_game_details(self, app_ids: list, max_age: timedelta = timedelta(days=7)) -> dict:
+        """Game details already in the games table and younger than max_age, keyed by app ID"""
+        if not app_ids:
+            return {}
+
+        conn = connect_db(self.db_path)
+        conn.row_factory = sqlite3.Row
+        placeholders = ','.join('?' * len(app_ids))
+        rows = conn.execute(f'''
+            SELECT * FROM games
+            WHERE steam_id IN ({placeholders}) AND updated_at >= ?
+        ''', [*app_ids, datetime.now() - max_age]).fetchall()
+        conn.close()
+
+        METRICS.inc('gamepedia_cache_requests_total', ('game_details', 'hit'), len(rows))
+        METRICS.inc('gamepedia_cache_requests_total', ('game_details', 'miss'), len(app_ids) - len(rows))
+        return {row['steam_id']: dict(row) for row in rows}
+
+    def get_details_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool used to fetch cache misses"""
+        with self.details_lock:
+            if self.details_executor is None:
+                self.details_executor = ThreadPoolExecutor(max_workers=self.bulk_fetch_workers,
+                                                           thread_name_prefix='game-details')
+            return self.details_executor
+
+    def fetch_game_details(self, app_id: int) -> dict:
+        """Blocking wrapper so misses can be fetched on worker threads"""
+        return asyncio.run(self.get_game_details(app_id))
+
+    def iter_game_details(self, app_ids: list):
+        """Yield (app_id, details or None, status) with cached hits first and misses as they resolve"""
+        cached = self.get_cached_game_details(app_ids)
+        misses = []
+        for app_id in app_ids:
+            if app_id in cached:
+                yield app_id, cached[app_id], 'cached'
+            else:
+                misses.append(app_id)
+
+        # Each miss costs a store call and a RAWG call
+        budget = min(self.bulk_max_misses,
+                     max(0, self.upstream.quota.remaining() - self.bulk_quota_reserve) // 2)
+        for app_id in misses[budget:]:
+            yield app_id, None, 'deferred'
+
+        executor = self.get_details_executor()
+        futures = {executor.submit(self.fetch_game_details, app_id): app_id for app_id in misses[:budget]}
+        for future in as_completed(futures):
+            details = future.result()
+            if details.get('steam_id'):
+                yield futures[future], details, 'fetched'
+            else:
+                yield futures[future], None, 'missing'
+
+    @staticmethod
+    def public_game_details(details: dict) -> dict:
+        """Game details with JSON columns decoded for API responses"""
+        game = dict(details)
+        for column, empty in (('platforms', {}), ('screenshots', []), ('movies', []), ('system_requirements', {})):
+            game[column] = json.loads(game[column]) if game.get(column) else empty
+        game.pop('id', None)
+        return game
+
+    async def get_price_overviews(self, app_ids: list) -> dict | None:
+        """Get price-only store data for many apps in one upstream call; None if upstream failed"""
+        try:
+            url = f"{self.steam_store_base}/appdetails"
+            params = {
+                'appids': ','.join(str(app_id) for app_id in app_ids),
+                'filters': 'price_overview',
+                'format': 'json'
+            }
+
+            data = self.upstream.get_json('steam.store_price_overview', url, params, timeout=15,
+                                          serve_stale=False)
+
+            prices = {}
+            for app_id in app_ids:
+                entry = data.get(str(app_id))
+                if entry is None:
+                    continue
+                if not entry.get('success'):
+                    # Delisted or region-locked: answered, but there is no price to record
+                    prices[app_id] = None
+                    continue
+                # Free and unreleased games come back with an empty list instead of a dict
+                overview = entry.get('data') or {}
+                prices[app_id] = overview.get('price_overview') if isinstance(overview, dict) else None
+            return prices
+
+        except Exception as e:
+            print(f"Error getting Steam price data: {e}")
+            return None
+
+    def store_price_overviews(self, prices: dict):
+        """Record a batch of price samples and update current prices in one transaction"""
+        if not prices:
+            return
+
+        now = datetime.now()
+        history_rows = []
+        game_rows = []
+        state_rows = []
+
+        conn = connect_db(self.db_path)
+        try:
+            # Only price changes are stored (run-length), so look up the last known prices
+            placeholders = ','.join('?' * len(prices))
+            previous = {
+                row[0]: (row[1], row[2]) for row in conn.execute(f'''
+                    SELECT game_id, last_price, last_discount_percent
+                    FROM price_refresh_state WHERE game_id IN ({placeholders})
+                ''', list(prices))
+            }
+
+            for app_id, overview in prices.items():
+                if overview:
+                    price = overview.get('final', 0) / 100
+                    original = overview.get('initial', 0) / 100
+                    discount = overview.get('discount_percent', 0)
+                    if previous.get(app_id) != (price, discount):
+                        history_rows.append((app_id, 'steam', price, discount, now))
+                    game_rows.append((price, original, discount, app_id))
+                    state_rows.append((app_id, now, price, discount))
+                else:
+                    state_rows.append((app_id, now, None, None))
+
+            with conn:
+                conn.executemany('''
+                    INSERT INTO price_history (game_id, platform, price, discount_percent, recorded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', history_rows)
+                conn.executemany('''
+                    UPDATE games
+                    SET price_current = ?, price_original = ?, price_discount_percent = ?
+                    WHERE steam_id = ?
+                ''', game_rows)
+                conn.executemany('''
+                    INSERT OR REPLACE INTO price_refresh_state (
+                        game_id, last_refreshed_at, last_price, last_discount_percent
+                    ) VALUES (?, ?, ?, ?)
+                ''', state_rows)
+        finally:
+            conn.close()
+
+    def acquire_lease(self, name: str, holder: str, seconds: float) -> bool:
+        """Take or renew a job lease; False while another live holder has it"""
+        now = time.time()       # Wall clock: compared across processes
+        conn = connect_db(self.db_path, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT holder, expires_at FROM job_leases WHERE name = ?', (name,)).fetchone()
+            acquired = row is None or row[0] == holder or row[1] < now
+            if acquired:
+                conn.execute('INSERT OR REPLACE INTO job_leases (name, holder, expires_at) VALUES (?, ?, ?)',
+                             (name, holder, now + seconds))
+            conn.execute('COMMIT')
+            return acquired
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def select_price_refresh_candidates(self, limit: int, refreshed_before: datetime) -> list:
+        """Pick app IDs due for a price refresh, games in user libraries first"""
+        conn = connect_db(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            WITH candidates AS (
+                SELECT game_id AS app_id, COUNT(*) AS owners FROM user_games GROUP BY game_id
+                UNION ALL
+                SELECT steam_id AS app_id, 0 AS owners FROM games WHERE steam_id IS NOT NULL
+            )
+            SELECT c.app_id, MAX(c.owners) AS owners, s.last_refreshed_at
+            FROM candidates c
+            LEFT JOIN price_refresh_state s ON s.game_id = c.app_id
+            WHERE s.last_refreshed_at IS NULL OR s.last_refreshed_at < ?
+            GROUP BY c.app_id
+            ORDER BY owners > 0 DESC, s.last_refreshed_at IS NOT NULL, s.last_refreshed_at, owners DESC
+            LIMIT ?
+        ''', (refreshed_before, limit))
+
+        app_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return app_ids
+
+    def rollup_price_history(self, raw_retention_days: int = 14, daily_retention_days: int = 730) -> dict:
+        """Downsample raw price changes older than the raw window into daily rows"""
+        # Cut at a day boundary so every rolled-up day is complete
+        cutoff = (datetime.now() - timedelta(days=raw_retention_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        daily_cutoff = (cutoff - timedelta(days=daily_retention_days)).date().isoformat()
+
+        conn = connect_db(self.db_path)
+        try:
+            with conn:
+                cursor = conn.execute('''
+                    INSERT INTO price_history_daily (
+                        game_id, day, price_min, price_max, price_close, discount_max, samples
+                    )
+                    SELECT game_id, day, MIN(price), MAX(price), MAX(close), MAX(discount_percent), COUNT(*)
+                    FROM (
+                        SELECT game_id, date(recorded_at) AS day, price, discount_percent,
+                               LAST_VALUE(price) OVER (
+                                   PARTITION BY game_id, date(recorded_at) ORDER BY recorded_at
+                                   ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                               ) AS close
+                        FROM price_history
+                        WHERE recorded_at < ?
+                    )
+                    GROUP BY game_id, day
+                    ON CONFLICT (game_id, day) DO UPDATE SET
+                        price_min = MIN(price_min, excluded.price_min),
+                        price_max = MAX(price_max, excluded.price_max),
+                        price_close = excluded.price_close,
+                        discount_max = MAX(discount_max, excluded.discount_max),
+                        samples = samples + excluded.samples
+                ''', (cutoff,))
+                rolled_up_days = cursor.rowcount
+
+                cursor = conn.execute('DELETE FROM price_history WHERE recorded_at < ?', (cutoff,))
+                raw_deleted = cursor.rowcount
+
+                cursor = conn.execute('DELETE FROM price_history_daily WHERE day < ?', (daily_cutoff,))
+                daily_deleted = cursor.rowcount
+        finally:
+            conn.close()
+
+        return {'rolled_up_days': rolled_up_days, 'raw_deleted': raw_deleted, 'daily_deleted': daily_deleted}
+
+    def get_price_range(self, app_id: int, start: datetime, end: datetime = None) -> dict:
+        """Min/max price for a game over a time range, read from rollups and recent raw samples"""
+        end = end or datetime.now()
+        start_day = start.date().isoformat()
+        end_day = end.date().isoformat()
+
+        conn = connect_db(self.db_path)
+        cursor = conn.cursor()
+
+        # Only changes are stored, so the price in effect when the range opens counts too
+        opening = self.get_opening_price(cursor, app_id, start, start_day)
+
+        cursor.execute('''
+            SELECT MIN(price_min), MAX(price_max), SUM(samples) FROM price_history_daily
+            WHERE game_id = ? AND day >= ? AND day <= ?
+        ''', (app_id, start_day, end_day))
+        daily_min, daily_max, daily_samples = cursor.fetchone()
+
+        cursor.execute('''
+            SELECT MIN(price), MAX(price), COUNT(*) FROM price_history
+            WHERE game_id = ? AND recorded_at >= ? AND recorded_at <= ?
+        ''', (app_id, start, end))
+        raw_min, raw_max, raw_samples = cursor.fetchone()
+        conn.close()
+
+        prices_min = [p for p in (opening, daily_min, raw_min) if p is not None]
+        prices_max = [p for p in (opening, daily_max, raw_max) if p is not None]
+
+        return {
+            'app_id': app_id,
+            'min': min(prices_min) if prices_min else None,
+            'max': max(prices_max) if prices_max else None,
+            'changes': (daily_samples or 0) + raw_samples,
+        }
+
+    @staticmethod
+    def get_opening_price(cursor, app_id: int, start: datetime, start_day: str) -> float | None:
+        """Latest recorded price before a point in time (raw samples first, then rollups)"""
+        cursor.execute('''
+            SELECT price FROM price_history
+            WHERE game_id = ? AND recorded_at < ?
+            ORDER BY recorded_at DESC LIMIT 1
+        ''', (app_id, start))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+
+        cursor.execute('''
+            SELECT price_close FROM price_history_daily
+            WHERE game_id = ? AND day < ?
+            ORDER BY day DESC LIMIT 1
+        ''', (app_id, start_day))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_lowest_price(self, app_id: int, days: int = 90) -> float | None:
+        """Lowest price seen for a game in the last N days"""
+        return self.get_price_range(app_id, datetime.now() - timedelta(days=days))['min']
+
     async def get_rawg_data(self, game_name: str) -> dict:
         """Get additional game data from RAWG"""
         try:
             url = f"{self.rawg_api_base}/games"
             params = {'search': game_name, 'key': 'your_rawg_api_key'}  # Add your RAWG API key
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.upstream.get_json('rawg.games', url, params, timeout=10)
             if data.get('results'):
                 return data['results'][0]
             return {}
@@ -502,50 +2096,54 @@ class GameDataManager:
         
     def save_game_data(self, game_data: dict):
         """Save game data to database"""
-        conn = sqlite3.connect('gamepedia_games.db')
+        conn = connect_db(self.db_path)
         cursor = conn.cursor()
         
-        # Insert or update game data
-        cursor.execute('''
-            INSERT OR REPLACE INTO games (
-                steam_id, name, short_description, detailed_description,
-                header_image, website, developers, publishers, release_date,
-                platforms, genres, categories, screenshots, movies,
-                achievements_count, metacritic_score, price_current,
-                price_original, price_discount_percent, system_requirements,
-                supported_languages, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            game_data.get('steam_id'),
-            game_data.get('name'),
-            game_data.get('short_description'),
-            game_data.get('detailed_description'),
-            game_data.get('header_image'),
-            game_data.get('website'),
-            game_data.get('developers'),
-            game_data.get('publishers'),
-            game_data.get('release_date'),
-            game_data.get('platforms'),
-            game_data.get('genres'),
-            game_data.get('categories'),
-            game_data.get('screenshots'),
-            game_data.get('movies'),
-            game_data.get('achievements_count'),
-            game_data.get('metacritic_score'),
-            game_data.get('price_current'),
-            game_data.get('price_original'),
-            game_data.get('price_discount_percent'),
-            game_data.get('system_requirements'),
-            game_data.get('supported_languages'),
-            datetime.now()
-        ))
+        # Insert or update game data; always release the connection so a failed
+        # insert can't leave a write lock behind for other threads
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO games (
+                    steam_id, name, short_description, detailed_description,
+                    header_image, website, developers, publishers, release_date,
+                    platforms, genres, categories, screenshots, movies,
+                    achievements_count, metacritic_score, price_current,
+                    price_original, price_discount_percent, system_requirements,
+                    supported_languages, rawg_tags, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                game_data.get('steam_id'),
+                game_data.get('name'),
+                game_data.get('short_description'),
+                game_data.get('detailed_description'),
+                game_data.get('header_image'),
+                game_data.get('website'),
+                game_data.get('developers'),
+                game_data.get('publishers'),
+                game_data.get('release_date'),
+                game_data.get('platforms'),
+                game_data.get('genres'),
+                game_data.get('categories'),
+                game_data.get('screenshots'),
+                game_data.get('movies'),
+                game_data.get('achievements_count'),
+                game_data.get('metacritic_score'),
+                game_data.get('price_current'),
+                game_data.get('price_original'),
+                game_data.get('price_discount_percent'),
+                game_data.get('system_requirements'),
+                game_data.get('supported_languages'),
+                game_data.get('rawg_tags'),
+                datetime.now()
+            ))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+        finally:
+            conn.close()
         
     def search_games(self, query: str, filters: dict = None) -> list:
         """Advanced game search with filters"""
-        conn = sqlite3.connect('gamepedia_games.db')
+        conn = connect_db(self.db_path)
         cursor = conn.cursor()
         
         sql = '''
@@ -579,16 +2177,995 @@ class GameDataManager:
         conn.close()
         return results
 
+class PriceRefreshJob:
+    """Incremental batch job keeping store prices and price history fresh"""
+
+    def __init__(self, game_data_manager: GameDataManager):
+        self.game_data_manager = game_data_manager
+        self.batch_size = 100               # App IDs per appdetails call
+        self.max_batches_per_run = 10
+        self.refresh_interval = timedelta(hours=6)
+        self.run_interval = 300             # Seconds between incremental runs
+        self.raw_retention_days = 14        # Raw price changes kept before daily rollup
+        self.daily_retention_days = 730
+        self.rollup_interval = timedelta(days=1)
+        self.last_rollup = None
+        self.running = False
+        # Worker processes share the database; only the lease holder refreshes, the rest stand by
+        self.holder = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.lease_seconds = 2 * self.run_interval
+
+    async def run_once(self) -> dict:
+        """Refresh the most stale, most owned games; returns a run summary"""
+        refreshed_before = datetime.now() - self.refresh_interval
+        app_ids = self.game_data_manager.select_price_refresh_candidates(
+            self.batch_size * self.max_batches_per_run, refreshed_before
+        )
+
+        summary = {'candidates': len(app_ids), 'upstream_calls': 0, 'priced': 0}
+        for i in range(0, len(app_ids), self.batch_size):
+            batch = app_ids[i:i + self.batch_size]
+            prices = await self.game_data_manager.get_price_overviews(batch)
+            summary['upstream_calls'] += 1
+            if prices is None:
+                # Upstream failed or the breaker is open; retry on the next run
+                break
+            self.game_data_manager.store_price_overviews(prices)
+            summary['priced'] += sum(1 for overview in prices.values() if overview)
+
+        return summary
+
+    def run_retention(self, force: bool = False) -> dict | None:
+        """Roll up and expire price history, at most once per rollup interval"""
+        now = datetime.now()
+        if not force and self.last_rollup and now - self.last_rollup < self.rollup_interval:
+            return None
+        self.last_rollup = now
+        return self.game_data_manager.rollup_price_history(
+            self.raw_retention_days, self.daily_retention_days
+        )
+
+    def acquire_lease(self) -> bool:
+        """Whether this process runs the next cycle; a crashed holder's lease lapses after lease_seconds"""
+        return self.game_data_manager.acquire_lease('price_refresh', self.holder, self.lease_seconds)
+
+    def start(self):
+        """Run the job periodically in a background thread, in whichever process holds the lease"""
+        if self.running:
+            return
+        self.running = True
+
+        def loop():
+            while self.running:
+                try:
+                    if self.acquire_lease():
+                        asyncio.run(self.run_once())
+                        self.run_retention()
+                except Exception as e:
+                    print(f"Price refresh failed: {e}")
+                time.sleep(self.run_interval)
+
+        threading.Thread(target=loop, daemon=True, name='price-refresh').start()
+
+    def stop(self):
+        """Stop after the current run"""
+        self.running = False
+
+class SteamLibrary:
+    """Columnar, array-backed view of a user's owned games"""
+
+    SORT_COLUMNS = {
+        'playtime': 'playtime_forever',
+        'recent': 'playtime_2weeks',
+        'last_played': 'rtime_last_played',
+        'name': 'names',
+    }
+    FIELDS = ('appid', 'name', 'playtime_forever', 'playtime_2weeks', 'rtime_last_played', 'img_icon_url')
+
+    def __init__(self, appids, playtime_forever, playtime_2weeks, rtime_last_played,
+                 names: list, games: list = None, icons: list = None):
+        self.appids = np.asarray(appids, dtype=np.int64)
+        self.playtime_forever = np.asarray(playtime_forever, dtype=np.int64)
+        self.playtime_2weeks = np.asarray(playtime_2weeks, dtype=np.int64)
+        self.rtime_last_played = np.asarray(rtime_last_played, dtype=np.int64)
+        self.names = names
+        self.games = games  # Original records, kept for callers that need every field
+        self.icons = icons  # img_icon_url hashes when built from a streamed response
+        self.sort_keys = {}
+
+    @classmethod
+    def from_games(cls, games: list) -> 'SteamLibrary':
+        """Build the columns from a GetOwnedGames games list"""
+        if isinstance(games, SteamLibrary):
+            return games
+        count = len(games)
+        return cls(
+            np.fromiter((g.get('appid', 0) for g in games), dtype=np.int64, count=count),
+            np.fromiter((g.get('playtime_forever', 0) for g in games), dtype=np.int64, count=count),
+            np.fromiter((g.get('playtime_2weeks', 0) for g in games), dtype=np.int64, count=count),
+            np.fromiter((g.get('rtime_last_played', 0) for g in games), dtype=np.int64, count=count),
+            [g.get('name', 'Unknown') for g in games],
+            games,
+        )
+
+    def __len__(self):
+        return len(self.appids)
+
+    def __getitem__(self, index: int) -> dict:
+        return self.game(index)
+
+    def __iter__(self):
+        return (self.game(i) for i in range(len(self)))
+
+    def summary(self) -> dict:
+        """Library totals computed with vectorised reductions"""
+        total_games = len(self)
+        if total_games == 0:
+            return {'total_games': 0, 'total_playtime': 0, 'most_played': None,
+                    'never_played': 0, 'played_recently': 0}
+
+        return {
+            'total_games': total_games,
+            'total_playtime': int(self.playtime_forever.sum()),
+            'most_played': int(self.playtime_forever.argmax()),
+            'never_played': int(np.count_nonzero(self.playtime_forever == 0)),
+            'played_recently': int(np.count_nonzero(self.playtime_2weeks > 0)),
+        }
+
+    def top_indices(self, k: int, column: str = 'playtime_forever') -> 'np.ndarray':
+        """Row indices of the k largest values of a column, largest first"""
+        values = getattr(self, column)
+        k = min(k, len(values))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        candidates = np.argpartition(-values, k - 1)[:k]
+        # Ties keep library order, matching a stable sort
+        return candidates[np.lexsort((candidates, -values[candidates]))]
+
+    def game(self, index: int) -> dict:
+        """Game record for a row"""
+        if self.games is not None:
+            return self.games[index]
+        game = {
+            'appid': int(self.appids[index]),
+            'name': self.names[index],
+            'playtime_forever': int(self.playtime_forever[index]),
+            'playtime_2weeks': int(self.playtime_2weeks[index]),
+            'rtime_last_played': int(self.rtime_last_played[index]),
+        }
+        if self.icons is not None and self.icons[index]:
+            game['img_icon_url'] = self.icons[index]
+        return game
+
+    def top_games(self, k: int, column: str = 'playtime_forever') -> list:
+        """Game records for the k largest values of a column"""
+        return [self.game(int(i)) for i in self.top_indices(k, column)]
+
+    def take(self, indices) -> 'SteamLibrary':
+        """New library holding only the given rows, in that order"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return SteamLibrary(
+            self.appids[indices],
+            self.playtime_forever[indices],
+            self.playtime_2weeks[indices],
+            self.rtime_last_played[indices],
+            [self.names[i] for i in indices.tolist()],
+            [self.games[i] for i in indices.tolist()] if self.games is not None else None,
+            [self.icons[i] for i in indices.tolist()] if self.icons is not None else None,
+        )
+
+    def index_of(self, appid: int) -> int | None:
+        """Row of an app ID, None if the game isn't in the library"""
+        rows = np.flatnonzero(self.appids == appid)
+        return int(rows[0]) if len(rows) else None
+
+    def sort_key(self, sort: str) -> 'np.ndarray':
+        """Primary sort values for a sort name, built once per library"""
+        keys = self.sort_keys.get(sort)
+        if keys is None:
+            if sort == 'name':
+                keys = np.array([(name or '').casefold() for name in self.names], dtype=str)
+            else:
+                keys = getattr(self, self.SORT_COLUMNS[sort])
+            self.sort_keys[sort] = keys
+        return keys
+
+    def filter_rows(self, filters: dict) -> 'np.ndarray':
+        """Row indices matching the library filters"""
+        mask = np.ones(len(self), dtype=bool)
+        if 'played' in filters:
+            mask &= (self.playtime_forever > 0) == filters['played']
+        if 'played_recently' in filters:
+            mask &= (self.playtime_2weeks > 0) == filters['played_recently']
+        if 'min_playtime' in filters:
+            mask &= self.playtime_forever >= filters['min_playtime']
+        if 'max_playtime' in filters:
+            mask &= self.playtime_forever <= filters['max_playtime']
+        if filters.get('q'):
+            needle = filters['q'].casefold()
+            mask &= np.fromiter((needle in (name or '').casefold() for name in self.names),
+                                dtype=bool, count=len(self))
+        return np.flatnonzero(mask)
+
+    def page(self, rows, sort: str, descending: bool, after, limit: int) -> tuple:
+        """Keyset page of rows ordered by (sort key, appid), with the key to continue after"""
+        keys = self.sort_key(sort)
+        ordered = rows[np.lexsort((self.appids[rows], keys[rows]))]
+        ordered_keys, ordered_appids = keys[ordered], self.appids[ordered]
+
+        if after is None:
+            position = len(ordered) if descending else 0
+        else:
+            value, appid = after
+            low = np.searchsorted(ordered_keys, value, 'left')
+            high = np.searchsorted(ordered_keys, value, 'right')
+            position = low + int(np.searchsorted(ordered_appids[low:high], appid,
+                                                 'left' if descending else 'right'))
+
+        if descending:
+            page = ordered[max(0, position - limit):position][::-1]
+            has_more = position - limit > 0
+        else:
+            page = ordered[position:position + limit]
+            has_more = position + limit < len(ordered)
+
+        if not has_more or not len(page):
+            return page, None
+        last = int(page[-1])
+        return page, (keys[last].item(), int(self.appids[last]))
+
+OWNED_GAMES_ARRAY = re.compile(r'"games"\s*:\s*\[')
+OWNED_GAMES_COUNT = re.compile(r'"game_count"\s*:\s*(\d+)')
+JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+def parse_owned_games_stream(chunks) -> dict:
+    """Parse a GetOwnedGames body chunk by chunk straight into a SteamLibrary
+
+    Each element of the games array is decoded on its own and reduced to the columns
+    the proxy uses, so neither the full body nor the full nested dict is ever held.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    appids, playtime, recent, last_played = array('q'), array('q'), array('q'), array('q')
+    names, icons = [], []
+    game_count = None
+    buffer, pos, state = '', 0, 'seek'
+    chunks = iter(chunks)
+    exhausted = False
+
+    while True:
+        if state == 'seek':
+            match = OWNED_GAMES_ARRAY.search(buffer)
+            if match:
+                count = OWNED_GAMES_COUNT.search(buffer, 0, match.start())
+                if count:
+                    game_count = int(count.group(1))
+                buffer, pos, state = buffer[match.end():], 0, 'items'
+                continue
+            # Keep just enough to match a key split across chunks
+            buffer = buffer[-256:]
+        elif state == 'items':
+            pos = JSON_SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == ']':
+                buffer, pos, state = buffer[pos + 1:], 0, 'tail'
+                continue
+            if pos < len(buffer):
+                try:
+                    game, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                else:
+                    appids.append(game.get('appid', 0))
+                    playtime.append(game.get('playtime_forever', 0))
+                    recent.append(game.get('playtime_2weeks', 0))
+                    last_played.append(game.get('rtime_last_played', 0))
+                    names.append(game.get('name', 'Unknown'))
+                    icons.append(game.get('img_icon_url'))
+                    pos = end
+                    continue
+            # Drop what has been consumed before reading more
+            buffer, pos = buffer[pos:], 0
+
+        if exhausted:
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text.decode(b'', final=True)
+        else:
+            buffer += text.decode(chunk)
+
+    if state == 'items':
+        raise ValueError("Truncated GetOwnedGames response")
+    if game_count is None:
+        count = OWNED_GAMES_COUNT.search(buffer)
+        game_count = int(count.group(1)) if count else None
+
+    response = {}
+    if game_count is not None:
+        response['game_count'] = game_count
+    if state == 'tail':
+        response['games'] = SteamLibrary(appids, playtime, recent, last_played, names, icons=icons)
+    return {'response': response}
+
+class UserLibraryStore:
+    """Latest library snapshot per user, kept in user_games and updated by delta"""
+
+    def __init__(self, db_path: str = 'gamepedia_games.db', cache_size: int = 1024):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.snapshots = OrderedDict()      # user_id -> (SteamLibrary sorted by appid, stats, sync_version)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def full_stats(library: SteamLibrary) -> dict:
+        """Aggregates computed from scratch"""
+        summary = library.summary()
+        most_played = summary['most_played']
+        return {
+            'total_games': summary['total_games'],
+            'total_playtime': summary['total_playtime'],
+            'games_never_played': summary['never_played'],
+            'games_played_recently': summary['played_recently'],
+            'most_played_appid': int(library.appids[most_played]) if most_played is not None else None,
+            'most_played_minutes': int(library.playtime_forever[most_played]) if most_played is not None else 0,
+        }
+
+    def stored_version(self, user_id: str) -> int:
+        """How many syncs of a user's library any process has committed"""
+        conn = connect_db(self.db_path)
+        row = conn.execute('SELECT sync_version FROM user_library_stats WHERE user_id = ?', (user_id,)).fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def load(self, user_id: str) -> tuple | None:
+        """Snapshot, aggregates and sync version for a user, from memory or user_games (caller holds the lock)"""
+        # Other worker processes sync the same users, so a cached snapshot is only
+        # reused while nobody has committed a newer sync
+        cached = self.snapshots.get(user_id)
+        if cached is not None and cached[2] == self.stored_version(user_id):
+            self.snapshots.move_to_end(user_id)
+            METRICS.inc('gamepedia_cache_requests_total', ('library_snapshot', 'hit'))
+            return cached
+        METRICS.inc('gamepedia_cache_requests_total', ('library_snapshot', 'miss'))
+
+        conn = connect_db(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT game_id, playtime_forever, playtime_2weeks, COALESCE(last_played, 0), name, img_icon_url
+            FROM user_games WHERE user_id = ? ORDER BY game_id
+        ''', (user_id,))
+        rows = cursor.fetchall()
+        cursor.execute('''
+            SELECT total_games, total_playtime, games_never_played, games_played_recently,
+                   most_played_appid, most_played_minutes, sync_version
+            FROM user_library_stats WHERE user_id = ?
+        ''', (user_id,))
+        stats_row = cursor.fetchone()
+        conn.close()
+
+        if not rows:
+            return None
+
+        columns = np.array([row[:4] for row in rows], dtype=np.int64)
+        snapshot = SteamLibrary(columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3],
+                                [row[4] for row in rows], icons=[row[5] for row in rows])
+        if stats_row:
+            keys = ('total_games', 'total_playtime', 'games_never_played',
+                    'games_played_recently', 'most_played_appid', 'most_played_minutes')
+            stats = dict(zip(keys, stats_row))
+            version = stats_row[6]
+        else:
+            stats = self.full_stats(snapshot)
+            version = 0
+        return snapshot, stats, version
+
+    def get_snapshot(self, user_id: str) -> SteamLibrary | None:
+        """Latest stored library for a user (sorted by app ID)"""
+        with self.lock:
+            loaded = self.load(user_id)
+        return loaded[0] if loaded else None
+
+    @staticmethod
+    def apply_delta(stats: dict, previous: SteamLibrary, current: SteamLibrary,
+                    new_rows, changed_prev, changed_rows, removed_prev) -> dict:
+        """Update aggregates from the rows that changed instead of rescanning the library"""
+        stats = dict(stats)
+        before_total = np.concatenate((previous.playtime_forever[changed_prev], previous.playtime_forever[removed_prev]))
+        before_recent = np.concatenate((previous.playtime_2weeks[changed_prev], previous.playtime_2weeks[removed_prev]))
+        after_total = np.concatenate((current.playtime_forever[changed_rows], current.playtime_forever[new_rows]))
+        after_recent = np.concatenate((current.playtime_2weeks[changed_rows], current.playtime_2weeks[new_rows]))
+
+        stats['total_games'] += len(new_rows) - len(removed_prev)
+        stats['total_playtime'] += int(after_total.sum() - before_total.sum())
+        stats['games_never_played'] += int(np.count_nonzero(after_total == 0) - np.count_nonzero(before_total == 0))
+        stats['games_played_recently'] += int(np.count_nonzero(after_recent > 0) - np.count_nonzero(before_recent > 0))
+
+        # Playtime only grows, so the leader can only be overtaken; rescan if it shrank or left
+        leader = current.index_of(stats['most_played_appid']) if stats['most_played_appid'] is not None else None
+        if leader is None or current.playtime_forever[leader] < stats['most_played_minutes']:
+            if len(current):
+                leader = int(current.playtime_forever.argmax())
+        else:
+            touched = np.concatenate((changed_rows, new_rows))
+            if len(touched):
+                best = int(touched[current.playtime_forever[touched].argmax()])
+                if current.playtime_forever[best] > current.playtime_forever[leader]:
+                    leader = best
+
+        if leader is None or not len(current):
+            stats['most_played_appid'], stats['most_played_minutes'] = None, 0
+        else:
+            stats['most_played_appid'] = int(current.appids[leader])
+            stats['most_played_minutes'] = int(current.playtime_forever[leader])
+        return stats
+
+    def diff(self, previous: tuple | None, current: SteamLibrary) -> tuple:
+        """(new, changed, backfill, newly played rows, removed app IDs, updated stats) against a snapshot"""
+        empty = np.zeros(0, dtype=np.int64)
+        if previous is None:
+            return np.arange(len(current)), empty, empty, empty, empty, self.full_stats(current)
+
+        snapshot, stats, _ = previous
+        if len(snapshot):
+            positions = np.minimum(np.searchsorted(snapshot.appids, current.appids), len(snapshot) - 1)
+            matched = snapshot.appids[positions] == current.appids
+        else:
+            positions = np.zeros(len(current), dtype=np.int64)
+            matched = np.zeros(len(current), dtype=bool)
+
+        new_rows = np.flatnonzero(~matched)
+        matched_rows = np.flatnonzero(matched)
+        matched_prev = positions[matched]
+        differs = ((snapshot.playtime_forever[matched_prev] != current.playtime_forever[matched_rows]) |
+                   (snapshot.playtime_2weeks[matched_prev] != current.playtime_2weeks[matched_rows]))
+        changed_rows = matched_rows[differs]
+        changed_prev = matched_prev[differs]
+        # Unchanged rows stored before names and icons were kept are rewritten once to fill them in
+        icons = self.icon_column(current)
+        stored_icons = snapshot.icons or [None] * len(snapshot)
+        missing = np.array([
+            (snapshot.names[prev] is None and current.names[row] is not None) or
+            (stored_icons[prev] is None and icons[row] is not None)
+            for row, prev in zip(matched_rows[~differs].tolist(), matched_prev[~differs].tolist())
+        ], dtype=bool)
+        backfill_rows = matched_rows[~differs][missing] if len(missing) else empty
+        newly_played = changed_rows[(snapshot.playtime_forever[changed_prev] == 0) &
+                                    (current.playtime_forever[changed_rows] > 0)]
+        removed_prev = np.flatnonzero(~np.isin(snapshot.appids, current.appids, assume_unique=True))
+        removed_appids = snapshot.appids[removed_prev]
+
+        stats = self.apply_delta(stats, snapshot, current, new_rows, changed_prev,
+                                 changed_rows, removed_prev)
+        return new_rows, changed_rows, backfill_rows, newly_played, removed_appids, stats
+
+    def sync(self, user_id: str, library: SteamLibrary) -> dict:
+        """Store a fresh library and return what changed plus the updated aggregates"""
+        current = library.take(np.argsort(library.appids, kind='stable'))
+
+        with self.lock:
+            while True:
+                previous = self.load(user_id)
+                version = previous[2] if previous else self.stored_version(user_id)
+                new_rows, changed_rows, backfill_rows, newly_played, removed_appids, stats = self.diff(previous, current)
+                if self.write_delta(user_id, current, np.concatenate((new_rows, changed_rows, backfill_rows)),
+                                    removed_appids, stats, version):
+                    break
+                # Another worker synced this user after we loaded; diff against what it stored
+                self.snapshots.pop(user_id, None)
+
+            self.snapshots[user_id] = (current, stats, version + 1)
+            self.snapshots.move_to_end(user_id)
+            while len(self.snapshots) > self.cache_size:
+                self.snapshots.popitem(last=False)
+
+        return {
+            'new': current.appids[new_rows].tolist(),
+            'changed': current.appids[changed_rows].tolist(),
+            'newly_played': current.appids[newly_played].tolist(),
+            'removed': removed_appids.tolist(),
+            'stats': stats,
+        }
+
+    @staticmethod
+    def icon_column(library: SteamLibrary) -> list:
+        """img_icon_url per row, whichever way the library was built"""
+        return library.icons or [game.get('img_icon_url') for game in library.games or []] or [None] * len(library)
+
+    def write_delta(self, user_id: str, current: SteamLibrary, rows, removed_appids, stats: dict,
+                    version: int) -> bool:
+        """Persist changed rows and aggregates in one transaction; False if the stored sync_version moved on"""
+        now = datetime.now()
+        icons = self.icon_column(current)
+        upserts = [
+            (user_id, appid, playtime, recent, last_played, current.names[row], icons[row], now)
+            for row, appid, playtime, recent, last_played in zip(
+                rows.tolist(), current.appids[rows].tolist(), current.playtime_forever[rows].tolist(),
+                current.playtime_2weeks[rows].tolist(), current.rtime_last_played[rows].tolist()
+            )
+        ]
+
+        conn = connect_db(self.db_path, isolation_level=None)
+        try:
+            # The version check and the writes share one write transaction, so two workers
+            # syncing the same user can't both apply a delta computed from the same snapshot
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT sync_version FROM user_library_stats WHERE user_id = ?',
+                               (user_id,)).fetchone()
+            if (row[0] if row else 0) != version:
+                conn.execute('ROLLBACK')
+                return False
+
+            # last_played holds Steam's rtime_last_played (Unix seconds)
+            conn.executemany('''
+                INSERT INTO user_games (
+                    user_id, game_id, playtime_forever, playtime_2weeks, last_played,
+                    name, img_icon_url, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, game_id) DO UPDATE SET
+                    playtime_forever = excluded.playtime_forever,
+                    playtime_2weeks = excluded.playtime_2weeks,
+                    last_played = excluded.last_played,
+                    name = excluded.name,
+                    img_icon_url = excluded.img_icon_url,
+                    updated_at = excluded.updated_at
+            ''', upserts)
+            conn.executemany('''
+                DELETE FROM user_games WHERE user_id = ? AND game_id = ?
+            ''', [(user_id, appid) for appid in removed_appids.tolist()])
+            conn.execute('''
+                INSERT OR REPLACE INTO user_library_stats (
+                    user_id, total_games, total_playtime, games_never_played,
+                    games_played_recently, most_played_appid, most_played_minutes, updated_at, sync_version
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, stats['total_games'], stats['total_playtime'], stats['games_never_played'],
+                  stats['games_played_recently'], stats['most_played_appid'],
+                  stats['most_played_minutes'], now, version + 1))
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+class AchievementSchemaCache:
+    """Achievement schema and global unlock percentages per app, shared by all users"""
+
+    def __init__(self, upstream: UpstreamClient, db_path: str = 'gamepedia_games.db',
+                 ttl: timedelta = timedelta(days=1), cache_size: int = 512):
+        self.upstream = upstream
+        self.db_path = db_path
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.steam_api_base = upstream_base('STEAM_API', "https://api.steampowered.com")
+        self.schemas = OrderedDict()            # app_id -> (fetched_at, schema)
+        self.lock = threading.Lock()
+        # Striped so the lock table stays a fixed size however many apps are ever fetched
+        self.fetch_locks = [threading.Lock() for _ in range(64)]
+
+    def remember(self, app_id: int, fetched_at: datetime, schema: dict):
+        """Put a schema in the in-memory LRU"""
+        with self.lock:
+            self.schemas[app_id] = (fetched_at, schema)
+            self.schemas.move_to_end(app_id)
+            while len(self.schemas) > self.cache_size:
+                self.schemas.popitem(last=False)
+
+    def lookup(self, app_id: int) -> tuple:
+        """Cached (fetched_at, schema) from memory, then SQLite, or (None, None)"""
+        with self.lock:
+            cached = self.schemas.get(app_id)
+            if cached is not None:
+                self.schemas.move_to_end(app_id)
+                return cached
+
+        conn = connect_db(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        row = conn.execute('SELECT fetched_at, schema FROM achievement_schemas WHERE app_id = ?',
+                           (app_id,)).fetchone()
+        conn.close()
+        if not row:
+            return None, None
+
+        fetched_at, schema = row[0], json.loads(row[1])
+        self.remember(app_id, fetched_at, schema)
+        return fetched_at, schema
+
+    async def get_schema(self, app_id: int, api_key: str) -> dict:
+        """Achievements for an app keyed by API name, refetched at most once per TTL"""
+        fetched_at, schema = self.lookup(app_id)
+        if schema is not None and datetime.now() - fetched_at < self.ttl:
+            METRICS.inc('gamepedia_cache_requests_total', ('achievement_schema', 'hit'))
+            return schema
+        METRICS.inc('gamepedia_cache_requests_total', ('achievement_schema', 'miss'))
+
+        # One fetch per app at a time; later callers pick up the fresh copy
+        with self.fetch_locks[hash(app_id) % len(self.fetch_locks)]:
+            fetched_at, schema = self.lookup(app_id)
+            if schema is not None and datetime.now() - fetched_at < self.ttl:
+                return schema
+
+            try:
+                fresh = self.fetch_schema(app_id, api_key)
+            except Exception as e:
+                print(f"Error getting achievement schema for {app_id}: {e}")
+                return schema or {'achievements': {}}
+
+            self.store(app_id, fresh)
+            return fresh
+
+    def fetch_schema(self, app_id: int, api_key: str) -> dict:
+        """Fetch the schema and global percentages from Steam and merge them"""
+        schema_data = self.upstream.get_json(
+            'steam.achievement_schema',
+            f"{self.steam_api_base}/ISteamUserStats/GetSchemaForGame/v2/",
+            {'key': api_key, 'appid': app_id, 'format': 'json'},
+            timeout=10, serve_stale=False
+        )
+        percentages_data = self.upstream.get_json(
+            'steam.global_achievement_percentages',
+            f"{self.steam_api_base}/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v0002/",
+            {'gameid': app_id, 'format': 'json'},
+            timeout=10, serve_stale=False
+        )
+
+        percentages = {
+            entry.get('name'): float(entry.get('percent', 0))
+            for entry in percentages_data.get('achievementpercentages', {}).get('achievements', [])
+        }
+        game = schema_data.get('game', {})
+        achievements = {}
+        for entry in game.get('availableGameStats', {}).get('achievements', []):
+            achievements[entry.get('name')] = {
+                'name': entry.get('displayName'),
+                'description': entry.get('description'),
+                'icon': entry.get('icon'),
+                'icongray': entry.get('icongray'),
+                'hidden': bool(entry.get('hidden')),
+                'global_percent': percentages.get(entry.get('name')),
+            }
+
+        return {'game_name': game.get('gameName'), 'achievements': achievements}
+
+    def store(self, app_id: int, schema: dict):
+        """Save a schema to SQLite and memory"""
+        now = datetime.now()
+        conn = connect_db(self.db_path)
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO achievement_schemas (app_id, schema, fetched_at)
+                VALUES (?, ?, ?)
+            ''', (app_id, json.dumps(schema), now))
+        conn.close()
+        self.remember(app_id, now, schema)
+
+class RecommendationEngine:
+    """Content-based recommender scoring the whole catalog with one sparse matrix-vector product"""
+
+    # Relative weight of each feature family in the item vectors
+    FEATURE_WEIGHTS = {
+        'genre': 1.0,
+        'category': 0.4,
+        'tag': 0.8,
+        'developer': 1.2,
+    }
+
+    REASONS = {
+        'genre': 'Because you play a lot of {} games',
+        'category': 'Features {} like games you play',
+        'tag': 'Tagged {} like your favorites',
+        'developer': 'From {}, a developer you enjoy',
+    }
+
+    def __init__(self, db_path: str = 'gamepedia_games.db'):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.refresh_interval = 60          # Seconds between checks for catalog changes
+
+        # Item vectors kept per game so refreshes only reparse what changed
+        self.feature_index = {}             # 'genre:RPG' -> column
+        self.feature_names = []
+        self.item_vectors = {}              # app_id -> (columns, weights)
+        self.item_meta = {}                 # app_id -> (name, price)
+        self.loaded_seq = 0                 # Highest games.change_seq seen
+        self.last_refresh = 0.0
+
+        # Catalog matrix in CSR form: row i holds indices/data[indptr[i]:indptr[i + 1]]
+        self.app_ids = np.zeros(0, dtype=np.int64)
+        self.row_of = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.intp)
+        self.data = np.zeros(0, dtype=np.float32)
+        self.nonempty_rows = np.zeros(0, dtype=np.intp)
+        self.contributions = np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def split_field(value: str | None) -> list:
+        """Split a comma-joined games column into values"""
+        if not value:
+            return []
+        return [part.strip() for part in value.split(',') if part.strip()]
+
+    def vectorize(self, row: tuple) -> tuple:
+        """Build the L2-normalised feature vector for one games row"""
+        _, _, genres, categories, developers, rawg_tags = row[:6]
+        features = {}
+        for family, values in (('genre', genres), ('category', categories),
+                               ('developer', developers), ('tag', rawg_tags)):
+            for value in self.split_field(values):
+                features[f"{family}:{value}"] = self.FEATURE_WEIGHTS[family]
+
+        columns = []
+        for name in features:
+            column = self.feature_index.get(name)
+            if column is None:
+                column = len(self.feature_names)
+                self.feature_index[name] = column
+                self.feature_names.append(name)
+            columns.append(column)
+
+        weights = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        norm = np.linalg.norm(weights)
+        if norm > 0:
+            weights /= norm
+        return np.array(columns, dtype=np.intp), weights
+
+    def refresh(self, force: bool = False):
+        """Load games added or changed since the last refresh and rebuild the matrix if needed"""
+        with self.lock:
+            if not force and time.monotonic() - self.last_refresh < self.refresh_interval:
+                return
+            self.last_refresh = time.monotonic()
+
+            conn = connect_db(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT steam_id, name, genres, categories, developers, rawg_tags,
+                       price_current, change_seq
+                FROM games
+                WHERE steam_id IS NOT NULL AND change_seq > ?
+                ORDER BY change_seq
+            ''', (self.loaded_seq,))
+            changed = cursor.fetchall()
+            conn.close()
+
+            for row in changed:
+                app_id = row[0]
+                self.item_vectors[app_id] = self.vectorize(row)
+                self.item_meta[app_id] = (row[1], row[6])
+                self.loaded_seq = max(self.loaded_seq, row[7])
+
+            if changed:
+                self.build_matrix()
+
+    def build_matrix(self):
+        """Assemble the CSR catalog matrix from the per-game vectors (caller holds the lock)"""
+        app_ids = list(self.item_vectors)
+        vectors = [self.item_vectors[app_id] for app_id in app_ids]
+        lengths = np.fromiter((len(columns) for columns, _ in vectors), dtype=np.int64, count=len(vectors))
+
+        self.app_ids = np.array(app_ids, dtype=np.int64)
+        self.row_of = {app_id: row for row, app_id in enumerate(app_ids)}
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.indices = np.concatenate([c for c, _ in vectors]) if vectors else np.zeros(0, dtype=np.intp)
+        self.data = np.concatenate([w for _, w in vectors]) if vectors else np.zeros(0, dtype=np.float32)
+        self.nonempty_rows = np.flatnonzero(lengths)
+        self.contributions = np.empty(len(self.data), dtype=np.float32)
+
+    @staticmethod
+    def owned_pairs(owned_games) -> list:
+        """(appid, playtime_forever) pairs from a games list or a SteamLibrary"""
+        if isinstance(owned_games, SteamLibrary):
+            return list(zip(owned_games.appids.tolist(), owned_games.playtime_forever.tolist()))
+        return [(g.get('appid'), g.get('playtime_forever', 0)) for g in owned_games]
+
+    def user_profile(self, owned_games: list) -> 'np.ndarray | None':
+        """Playtime-weighted sum of the item vectors of a user's owned games"""
+        profile = np.zeros(len(self.feature_names), dtype=np.float32)
+        for appid, playtime in self.owned_pairs(owned_games):
+            row = self.row_of.get(appid)
+            if row is None or playtime <= 0:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            # log scale so a single 2,000 hour game doesn't drown out everything else
+            profile[self.indices[start:end]] += self.data[start:end] * np.log1p(playtime / 60)
+
+        norm = np.linalg.norm(profile)
+        if norm == 0:
+            return None
+        return profile / norm
+
+    def recommend(self, owned_games: list, limit: int = 5) -> list:
+        """Top catalog games for a user's library, excluding games they already own"""
+        self.refresh()
+
+        with self.lock:
+            if len(self.app_ids) == 0:
+                return []
+
+            profile = self.user_profile(owned_games)
+            if profile is None:
+                return []
+
+            # Cosine similarity of every catalog game against the profile in one pass
+            contributions = self.contributions
+            np.take(profile, self.indices, out=contributions)
+            np.multiply(contributions, self.data, out=contributions)
+            scores = np.zeros(len(self.app_ids), dtype=np.float32)
+            if len(self.nonempty_rows):
+                scores[self.nonempty_rows] = np.add.reduceat(
+                    contributions, self.indptr[self.nonempty_rows]
+                )
+
+            owned_rows = [self.row_of[appid] for appid, _ in self.owned_pairs(owned_games) if appid in self.row_of]
+            scores[owned_rows] = -np.inf
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                top = np.argpartition(scores[candidates], -limit)[-limit:]
+                candidates = candidates[top]
+            ranked = candidates[np.argsort(scores[candidates])[::-1]]
+
+            recommendations = []
+            for row in ranked:
+                app_id = int(self.app_ids[row])
+                name, price = self.item_meta[app_id]
+                start, end = self.indptr[row], self.indptr[row + 1]
+                best = self.indices[start + int(np.argmax(contributions[start:end]))]
+                family, value = self.feature_names[best].split(':', 1)
+                recommendations.append({
+                    'appid': app_id,
+                    'name': name,
+                    'reason': self.REASONS[family].format(value),
+                    'score': int(round(float(scores[row]) * 100)),
+                    'price': price,
+                })
+
+            return recommendations
+
+class EncodedResponse(dict):
+    """JSON-ready result that keeps its encoded body so repeat responses skip serialization"""
+
+    def encoded(self) -> bytes:
+        """Response body, encoded once"""
+        body = getattr(self, '_body', None)
+        if body is None:
+            body = json.dumps(self, indent=2).encode('utf-8')
+            self._body = body
+        return body
+
+class EnhancedResultCache:
+    """Fully enhanced user data memoized by a fingerprint of the raw upstream inputs"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl                  # Catalog data and recommendations still drift over time
+        self.clock = clock
+        self.entries = OrderedDict()    # fingerprint -> (stored_at, EncodedResponse)
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def fingerprint(user_key: str, steam_data: dict) -> str:
+        """Hash of everything enhancement depends on: library, recent games, persona and unlocks"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(user_key.encode())
+
+        library = steam_data.get('library')
+        if library is not None:
+            for column in (library.appids, library.playtime_forever, library.playtime_2weeks):
+                digest.update(column.tobytes())
+
+        recent = steam_data.get('recent', {}).get('response', {}).get('games', [])
+        players = steam_data.get('player', {}).get('response', {}).get('players', [])
+        unlocks = {
+            app_id: [(a.get('apiname'), a.get('achieved'), a.get('unlocktime'))
+                     for a in data.get('playerstats', {}).get('achievements', [])]
+            for app_id, data in steam_data.get('achievements', {}).items()
+        }
+        digest.update(json.dumps([
+            [(g.get('appid'), g.get('playtime_2weeks'), g.get('playtime_forever')) for g in recent],
+            players,
+            unlocks,
+            bool(steam_data.get('stale')),
+        ], sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def get(self, fingerprint: str) -> EncodedResponse | None:
+        """Memoized result for a fingerprint, if still fresh"""
+        with self.lock:
+            entry = self.entries.get(fingerprint)
+            if entry is None or self.clock() - entry[0] > self.ttl:
+                self.stats['misses'] += 1
+                METRICS.inc('gamepedia_cache_requests_total', ('enhanced_results', 'miss'))
+                return None
+            self.entries.move_to_end(fingerprint)
+            self.stats['hits'] += 1
+            METRICS.inc('gamepedia_cache_requests_total', ('enhanced_results', 'hit'))
+            return entry[1]
+
+    def put(self, fingerprint: str, result: dict) -> EncodedResponse:
+        """Memoize a result"""
+        response = EncodedResponse(result)
+        with self.lock:
+            self.entries[fingerprint] = (self.clock(), response)
+            self.entries.move_to_end(fingerprint)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+
 class EnhancedSteamAPIProxy:
     """Enhanced Steam API proxy with security and comprehensive features"""
     
     def __init__(self):
         self.security_manager = SecurityManager()
-        self.game_data_manager = GameDataManager()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'GamePedia-Ultimate/3.0-Secure'
-        })
+        self.upstream = UpstreamClient('GamePedia-Ultimate/3.0-Secure')
+        self.steam_api_base = upstream_base('STEAM_API', "https://api.steampowered.com")
+        self.summary_batcher = PlayerSummaryBatcher(self.upstream)
+        self.game_data_manager = GameDataManager(self.upstream)
+        self.price_refresh_job = PriceRefreshJob(self.game_data_manager)
+        self.recommendation_engine = RecommendationEngine(self.game_data_manager.db_path)
+        self.library_store = UserLibraryStore(self.game_data_manager.db_path)
+        self.achievement_schemas = AchievementSchemaCache(self.upstream, self.game_data_manager.db_path)
+        self.enhanced_results = EnhancedResultCache()
+        METRICS.register_collector('upstream', self.collect_upstream_metrics)
+        self.setup_tracing()
+        self.profiler = ProfilerService()
+    
+    def setup_tracing(self):
+        """Sampled request traces for flame charts; off unless a sample rate is set"""
+        self.trace_recorder = TraceRecorder(
+            os.environ.get('GAMEPEDIA_TRACE_FILE', 'gamepedia_traces.jsonl'),
+            float(os.environ.get('GAMEPEDIA_TRACE_SAMPLE_RATE', '0'))
+        )
+        
+    def health_report(self) -> dict:
+        """Database, cache and upstream breaker state for the health endpoints"""
+        databases = {}
+        for name, path in (('secure', self.security_manager.db_path), ('games', self.game_data_manager.db_path)):
+            # Connecting would silently create a deleted database, so check it exists first
+            if not os.path.exists(path):
+                databases[name] = {'ok': False, 'error': 'database file missing'}
+                continue
+            try:
+                conn = connect_db(path, timeout=1.0)
+                try:
+                    version = conn.execute('PRAGMA user_version').fetchone()[0]
+                finally:
+                    conn.close()
+                databases[name] = {'ok': version > 0, 'schema_version': version}
+            except sqlite3.Error as e:
+                databases[name] = {'ok': False, 'error': str(e)}
+        
+        breakers = self.upstream.breaker_states()
+        open_breakers = sorted(name for name, state in breakers.items() if state['state'] == CircuitBreaker.OPEN)
+        if not all(db['ok'] for db in databases.values()):
+            status = 'unavailable'
+        else:
+            # Open breakers are served from stale data, so they degrade rather than fail readiness
+            status = 'degraded' if open_breakers else 'ok'
+        return {
+            'status': status,
+            'databases': databases,
+            'caches': {
+                'enhanced_results': {'entries': len(self.enhanced_results.entries), **self.enhanced_results.stats},
+                'achievement_schemas': {'entries': len(self.achievement_schemas.schemas)},
+                'stale_responses': {'entries': len(self.upstream.last_good)},
+            },
+            'upstream': {
+                'open_breakers': open_breakers,
+                'breakers': {name: state['state'] for name, state in breakers.items()},
+                'quota_remaining': self.upstream.quota.remaining(),
+            },
+        }
+        
+    def collect_upstream_metrics(self) -> list:
+        """Breaker states and remaining quota, sampled at scrape time"""
+        samples = [('gamepedia_upstream_quota_remaining', (), self.upstream.quota.remaining())]
+        for endpoint, state in self.upstream.breaker_states().items():
+            samples.append(('gamepedia_circuit_breaker_open', (endpoint,), int(state['state'] == CircuitBreaker.OPEN)))
+        return samples
         
     async def authenticate_user(self, api_key: str, steam_id: str, 
                               ip_address: str, user_agent: str) -> dict:
@@ -619,7 +3196,15 @@ class EnhancedSteamAPIProxy:
                     f'Invalid credentials: {test_response["error"]}', False
                 )
                 return {'error': test_response['error']}
-            
+
+            # Never authenticate against cached data served while Steam is down
+            if test_response.get('stale'):
+                self.security_manager.log_audit(
+                    None, 'AUTH_UPSTREAM_UNAVAILABLE', ip_address, user_agent,
+                    'Steam API unavailable (circuit open)', False
+                )
+                return {'error': 'Steam is temporarily unavailable. Please try again later.'}
+
             # Create secure user record
             user_id = secrets.token_urlsafe(16)
             steam_id_hash = self.security_manager.hash_steam_id(steam_id)
@@ -628,7 +3213,7 @@ class EnhancedSteamAPIProxy:
             encrypted_api_key = self.security_manager.encrypt_data(api_key)
             encrypted_steam_id = self.security_manager.encrypt_data(steam_id)
             
-            conn = sqlite3.connect(self.security_manager.db_path)
+            conn = connect_db(self.security_manager.db_path)
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -672,22 +3257,23 @@ class EnhancedSteamAPIProxy:
             )
             return {'error': f'Authentication failed: {str(e)}'}
     
-    async def get_comprehensive_user_data(self, session_token: str, 
-                                        ip_address: str, user_agent: str) -> dict:
-        """Get comprehensive user data with enhanced security"""
-        try:
-            # Validate session with security checks
-            if not self.security_manager.validate_session_security(
-                session_token, ip_address, user_agent
-            ):
-                return {"error": "Invalid or expired session"}
-            
-            # Check rate limiting
-            if not self.security_manager.check_rate_limit(ip_address, 'api_calls'):
-                return {"error": "Rate limit exceeded"}
-            
-            # Get user credentials
-            conn = sqlite3.connect(self.security_manager.db_path)
+    def resolve_session(self, session_token: str, ip_address: str, user_agent: str) -> dict:
+        """Validate a session and return the user's decrypted credentials"""
+        # Validate session with security checks
+        with span('session'):
+            valid = self.security_manager.validate_session_security(session_token, ip_address, user_agent)
+        if not valid:
+            return {"error": "Invalid or expired session"}
+        
+        # Check rate limiting
+        with span('rate_limit'):
+            allowed = self.security_manager.check_rate_limit(ip_address, 'api_calls')
+        if not allowed:
+            return {"error": "Rate limit exceeded"}
+        
+        # Get user credentials
+        with span('credentials'):
+            conn = connect_db(self.security_manager.db_path)
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -699,27 +3285,50 @@ class EnhancedSteamAPIProxy:
             
             result = cursor.fetchone()
             conn.close()
-            
-            if not result:
-                return {"error": "Session not found"}
-            
-            user_id, encrypted_api_key, encrypted_steam_id = result
-            
-            # Decrypt credentials
-            api_key = self.security_manager.decrypt_data(encrypted_api_key)
-            steam_id = self.security_manager.decrypt_data(encrypted_steam_id)
+        
+        if not result:
+            return {"error": "Session not found"}
+        
+        user_id, encrypted_api_key, encrypted_steam_id = result
+        
+        # Decrypt credentials
+        with span('decrypt'):
+            return {
+                'user_id': user_id,
+                'api_key': self.security_manager.decrypt_data(encrypted_api_key),
+                'steam_id': self.security_manager.decrypt_data(encrypted_steam_id),
+            }
+    
+    async def get_comprehensive_user_data(self, session_token: str, 
+                                        ip_address: str, user_agent: str) -> dict:
+        """Get comprehensive user data with enhanced security"""
+        try:
+            session = self.resolve_session(session_token, ip_address, user_agent)
+            if 'error' in session:
+                return session
+            user_id, api_key, steam_id = session['user_id'], session['api_key'], session['steam_id']
             
             # Get Steam data
-            steam_data = await self.get_enhanced_steam_data(api_key, steam_id)
+            with span('steam'):
+                steam_data = await self.get_enhanced_steam_data(api_key, steam_id)
             
-            # Get additional game data
-            enhanced_data = await self.enhance_with_game_data(steam_data, user_id)
+            # Get additional game data; user_id changes per login, so key the library by Steam account
+            library_key = self.security_manager.hash_steam_id(steam_id)
+            with span('fingerprint'):
+                fingerprint = self.enhanced_results.fingerprint(library_key, steam_data)
+                enhanced_data = self.enhanced_results.get(fingerprint)
+            if enhanced_data is None:
+                with span('enrich'):
+                    enhanced_data = await self.enhance_with_game_data(steam_data, library_key)
+                if 'error' not in enhanced_data:
+                    enhanced_data = self.enhanced_results.put(fingerprint, enhanced_data)
             
             # Log successful data retrieval
-            self.security_manager.log_audit(
-                user_id, 'DATA_RETRIEVED', ip_address, user_agent, 
-                'Comprehensive user data', True
-            )
+            with span('audit'):
+                self.security_manager.log_audit(
+                    user_id, 'DATA_RETRIEVED', ip_address, user_agent, 
+                    'Comprehensive user data', True
+                )
             
             return enhanced_data
             
@@ -730,35 +3339,144 @@ class EnhancedSteamAPIProxy:
             )
             return {"error": f"Failed to get user data: {str(e)}"}
     
+    @staticmethod
+    def parse_library_query(data: dict) -> dict:
+        """Validate library browsing parameters, raising ValueError on bad input"""
+        sort = data.get('sort', 'playtime')
+        if not isinstance(sort, str) or sort not in SteamLibrary.SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {', '.join(SteamLibrary.SORT_COLUMNS)}")
+        order = data.get('order', 'asc' if sort == 'name' else 'desc')
+        if not isinstance(order, str) or order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+
+        def integer(value, name: str) -> int:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be an integer")
+
+        limit = integer(data.get('limit', 50), 'limit')
+        if not 1 <= limit <= 500:
+            raise ValueError("limit must be between 1 and 500")
+
+        fields = data.get('fields') or list(SteamLibrary.FIELDS)
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise ValueError("fields must be a list of field names")
+        unknown = set(fields) - set(SteamLibrary.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        filters = {}
+        raw_filters = data.get('filter') or {}
+        if not isinstance(raw_filters, dict):
+            raise ValueError("filter must be an object")
+        for name in ('played', 'played_recently'):
+            if name in raw_filters:
+                filters[name] = bool(raw_filters[name])
+        for name in ('min_playtime', 'max_playtime'):
+            if name in raw_filters:
+                filters[name] = integer(raw_filters[name], name)
+        if raw_filters.get('q'):
+            filters['q'] = str(raw_filters['q'])
+
+        after = None
+        if data.get('cursor'):
+            try:
+                cursor = json.loads(base64.urlsafe_b64decode(data['cursor'].encode()))
+                value, appid = cursor['after']
+                appid = int(appid)
+            except Exception:
+                raise ValueError("Invalid cursor")
+            # The value is compared against the sort column, so it must have that column's type
+            expected = str if sort == 'name' else int
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise ValueError("Invalid cursor")
+            if cursor.get('sort') != sort or cursor.get('order') != order:
+                raise ValueError("Cursor belongs to a different sort order")
+            after = (value, appid)
+
+        return {'sort': sort, 'order': order, 'limit': limit, 'fields': fields,
+                'filters': filters, 'after': after}
+
+    async def get_library_page(self, session_token: str, ip_address: str, user_agent: str,
+                               query: dict) -> dict:
+        """One page of a user's library, served from the stored snapshot; errors carry an HTTP status"""
+        try:
+            session = self.resolve_session(session_token, ip_address, user_agent)
+            if 'error' in session:
+                return {**session, 'status': 429 if session['error'] == 'Rate limit exceeded' else 401}
+            
+            library_key = self.security_manager.hash_steam_id(session['steam_id'])
+            library = self.library_store.get_snapshot(library_key)
+            if library is None:
+                # First visit: fetch the library once, later pages come from the snapshot
+                games_data = await self.get_owned_games(session['api_key'], session['steam_id'])
+                if 'error' in games_data:
+                    return {**games_data, 'status': 502}
+                games = games_data.get('response', {}).get('games') or []
+                self.library_store.sync(library_key, SteamLibrary.from_games(games))
+                library = self.library_store.get_snapshot(library_key)
+            
+            rows = library.filter_rows(query['filters'])
+            page, next_key = library.page(rows, query['sort'], query['order'] == 'desc',
+                                          query['after'], query['limit'])
+            
+            next_cursor = None
+            if next_key is not None:
+                cursor = {'sort': query['sort'], 'order': query['order'], 'after': list(next_key)}
+                next_cursor = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            
+            return {
+                'games': [
+                    {field: game.get(field) for field in query['fields']}
+                    for game in (library.game(int(row)) for row in page)
+                ],
+                'total': len(rows),
+                'next_cursor': next_cursor,
+            }
+            
+        except Exception as e:
+            return {"error": f"Failed to get library: {str(e)}", 'status': 500}
+    
     async def get_enhanced_steam_data(self, api_key: str, steam_id: str) -> dict:
         """Get enhanced Steam data with additional features"""
         try:
             # Get basic Steam data
-            player_data = await self.get_player_summaries(api_key, steam_id)
-            games_data = await self.get_owned_games(api_key, steam_id)
-            recent_data = await self.get_recently_played_games(api_key, steam_id, 10)
+            with span('steam.player'):
+                player_data = await self.get_player_summaries(api_key, steam_id)
+            with span('steam.owned_games'):
+                games_data = await self.get_owned_games(api_key, steam_id)
+            with span('steam.recent'):
+                recent_data = await self.get_recently_played_games(api_key, steam_id, 10)
             
             # Get achievements for top games
             achievements_data = {}
+            achievement_schemas = {}
+            library = None
             if games_data.get('response', {}).get('games'):
-                top_games = sorted(
-                    games_data['response']['games'], 
-                    key=lambda x: x.get('playtime_forever', 0), 
-                    reverse=True
-                )[:3]
+                library = SteamLibrary.from_games(games_data['response']['games'])
+                top_games = library.top_games(3)
                 
                 for game in top_games:
                     app_id = game.get('appid')
                     if app_id:
-                        achievements = await self.get_player_achievements(api_key, steam_id, app_id)
+                        with span('steam.achievements'):
+                            achievements = await self.get_player_achievements(api_key, steam_id, app_id)
                         if achievements and 'error' not in achievements:
                             achievements_data[app_id] = achievements
+                            with span('steam.achievement_schema'):
+                                achievement_schemas[app_id] = await self.achievement_schemas.get_schema(app_id, api_key)
             
             return {
                 'player': player_data,
                 'games': games_data,
                 'recent': recent_data,
-                'achievements': achievements_data
+                'achievements': achievements_data,
+                'achievement_schemas': achievement_schemas,
+                'library': library,
+                'stale': any(d.get('stale') for d in (player_data, games_data, recent_data))
             }
             
         except Exception as e:
@@ -774,7 +3492,8 @@ class EnhancedSteamAPIProxy:
                 'topGames': None,
                 'achievements': None,
                 'recommendations': None,
-                'priceAlerts': None
+                'priceAlerts': None,
+                'stale': bool(steam_data.get('stale'))
             }
             
             # Process player data
@@ -784,23 +3503,14 @@ class EnhancedSteamAPIProxy:
             # Process games data
             if steam_data.get('games', {}).get('response', {}).get('games'):
                 games = steam_data['games']['response']['games']
+                library = steam_data.get('library') or SteamLibrary.from_games(games)
                 
-                # Basic stats
-                total_games = len(games)
-                total_playtime = sum(game.get('playtime_forever', 0) for game in games)
-                most_played = max(games, key=lambda x: x.get('playtime_forever', 0)) if games else None
-                
-                result['stats'] = {
-                    'total_games': total_games,
-                    'total_playtime': f"{total_playtime // 60:,} hours",
-                    'most_played': most_played.get('name', 'None') if most_played else 'None',
-                    'average_playtime': f"{(total_playtime // total_games) // 60:.1f} hours" if total_games > 0 else "0 hours",
-                    'games_never_played': len([g for g in games if g.get('playtime_forever', 0) == 0]),
-                    'games_played_recently': len([g for g in games if g.get('playtime_2weeks', 0) > 0])
-                }
+                # Basic stats, maintained incrementally from the rows that changed since the last sync
+                with span('library_stats'):
+                    result['stats'] = self.build_library_stats(library, user_id)
                 
                 # Top games
-                top_games = sorted(games, key=lambda x: x.get('playtime_forever', 0), reverse=True)[:10]
+                top_games = library.top_games(10)
                 result['topGames'] = await self.process_game_list(top_games, user_id)
             
             # Process recent games
@@ -810,25 +3520,106 @@ class EnhancedSteamAPIProxy:
             
             # Process achievements
             if steam_data.get('achievements'):
-                result['achievements'] = self.process_achievements(steam_data['achievements'])
+                result['achievements'] = self.process_achievements(
+                    steam_data['achievements'], steam_data.get('achievement_schemas')
+                )
             
             # Generate recommendations
-            result['recommendations'] = await self.generate_recommendations(user_id, games if 'games' in locals() else [])
+            with span('recommendations'):
+                result['recommendations'] = await self.generate_recommendations(user_id, games if 'games' in locals() else [])
             
             return result
             
         except Exception as e:
             return {"error": f"Failed to enhance data: {str(e)}"}
     
+    def build_library_stats(self, library: SteamLibrary, user_id: str) -> dict:
+        """Sync the library snapshot and format its aggregates for the widget"""
+        stats = self.library_store.sync(user_id, library)['stats']
+        total_games = stats['total_games']
+        total_playtime = stats['total_playtime']
+        most_played_index = library.index_of(stats['most_played_appid']) if stats['most_played_appid'] is not None else None
+        most_played = library.game(most_played_index) if most_played_index is not None else None
+        
+        return {
+            'total_games': total_games,
+            'total_playtime': f"{total_playtime // 60:,} hours",
+            'most_played': most_played.get('name', 'None') if most_played else 'None',
+            'average_playtime': f"{(total_playtime // total_games) // 60:.1f} hours" if total_games > 0 else "0 hours",
+            'games_never_played': stats['games_never_played'],
+            'games_played_recently': stats['games_played_recently']
+        }
+    
+    async def stream_user_data(self, session_token: str, ip_address: str, user_agent: str):
+        """Yield (section, data) pairs for user data, each as soon as it is ready"""
+        session = self.resolve_session(session_token, ip_address, user_agent)
+        if 'error' in session:
+            yield 'error', session
+            return
+        user_id, api_key, steam_id = session['user_id'], session['api_key'], session['steam_id']
+        library_key = self.security_manager.hash_steam_id(steam_id)
+        stale = False
+        
+        try:
+            # One Steam round trip each for the player card and the stats
+            player_data = await self.get_player_summaries(api_key, steam_id)
+            stale |= bool(player_data.get('stale'))
+            players = player_data.get('response', {}).get('players')
+            yield 'player', players[0] if players else None
+            
+            games_data = await self.get_owned_games(api_key, steam_id)
+            stale |= bool(games_data.get('stale'))
+            games = games_data.get('response', {}).get('games') or []
+            library = SteamLibrary.from_games(games)
+            yield 'stats', self.build_library_stats(library, library_key) if len(library) else None
+            
+            # Enrichment may go upstream for uncached games
+            yield 'topGames', await self.process_game_list(library.top_games(10), library_key) if len(library) else None
+            
+            recent_data = await self.get_recently_played_games(api_key, steam_id, 10)
+            stale |= bool(recent_data.get('stale'))
+            recent_games = recent_data.get('response', {}).get('games')
+            yield 'recentGames', await self.process_game_list(recent_games, library_key) if recent_games else None
+            
+            achievements_data, schemas = {}, {}
+            for game in library.top_games(3):
+                achievements = await self.get_player_achievements(api_key, steam_id, game['appid'])
+                if achievements and 'error' not in achievements:
+                    achievements_data[game['appid']] = achievements
+                    schemas[game['appid']] = await self.achievement_schemas.get_schema(game['appid'], api_key)
+            yield 'achievements', self.process_achievements(achievements_data, schemas) if achievements_data else None
+            
+            yield 'recommendations', await self.generate_recommendations(library_key, library)
+            yield 'done', {'stale': stale}
+            
+            self.security_manager.log_audit(
+                user_id, 'DATA_RETRIEVED', ip_address, user_agent, 
+                'Streamed user data', True
+            )
+            
+        except Exception as e:
+            self.security_manager.log_audit(
+                user_id, 'DATA_ERROR', ip_address, user_agent, 
+                f'Exception: {str(e)}', False
+            )
+            yield 'error', {"error": f"Failed to get user data: {str(e)}"}
+    
     async def process_game_list(self, games: list, user_id: str) -> list:
         """Process and enhance game list with additional data"""
         processed_games = []
+        with span('game_details.cached'):
+            cached_details = self.game_data_manager.get_cached_game_details(
+                [game['appid'] for game in games if game.get('appid')]
+            )
         
         for game in games:
             app_id = game.get('appid')
             if app_id:
-                # Get detailed game data
-                game_details = await self.game_data_manager.get_game_details(app_id)
+                # Get detailed game data, going upstream only for games not cached yet
+                game_details = cached_details.get(app_id)
+                if game_details is None:
+                    with span('game_details.fetch'):
+                        game_details = await self.game_data_manager.get_game_details(app_id)
                 
                 enhanced_game = {
                     'appid': app_id,
@@ -858,22 +3649,25 @@ class EnhancedSteamAPIProxy:
         
         return processed_games
     
-    def process_achievements(self, achievements_data: dict) -> dict:
-        """Process achievements data"""
+    def process_achievements(self, achievements_data: dict, schemas: dict = None) -> dict:
+        """Process achievements data, merging in shared app-level metadata"""
         processed = {}
+        schemas = schemas or {}
         
         for app_id, data in achievements_data.items():
             if 'playerstats' in data:
                 achievements = data['playerstats'].get('achievements', [])
                 total = len(achievements)
                 unlocked = sum(1 for ach in achievements if ach.get('achieved', 0) == 1)
+                metadata = schemas.get(app_id, {}).get('achievements', {})
                 
                 processed[app_id] = {
                     'total': total,
                     'unlocked': unlocked,
                     'percentage': (unlocked / total * 100) if total > 0 else 0,
                     'recent_unlocks': [
-                        ach for ach in achievements 
+                        {**metadata.get(ach.get('apiname'), {}), **ach}
+                        for ach in achievements 
                         if ach.get('achieved', 0) == 1 and ach.get('unlocktime', 0) > 0
                     ][-5:]  # Last 5 unlocked
                 }
@@ -883,54 +3677,18 @@ class EnhancedSteamAPIProxy:
     async def generate_recommendations(self, user_id: str, owned_games: list) -> list:
         """Generate game recommendations based on user data"""
         try:
-            # Get user's favorite genres
-            genres = []
-            for game in owned_games:
-                if game.get('playtime_forever', 0) > 60:  # More than 1 hour
-                    # Get game genres (would need to implement game data lookup)
-                    pass
-            
-            # For now, return popular games (would implement ML recommendations)
-            recommendations = [
-                {
-                    'name': 'Baldur\'s Gate 3',
-                    'reason': 'Highly rated RPG',
-                    'score': 95,
-                    'price': 59.99
-                },
-                {
-                    'name': 'Cyberpunk 2077',
-                    'reason': 'Action RPG with great reviews',
-                    'score': 86,
-                    'price': 29.99
-                },
-                {
-                    'name': 'The Witcher 3: Wild Hunt',
-                    'reason': 'Based on your RPG preferences',
-                    'score': 93,
-                    'price': 39.99
-                }
-            ]
-            
-            return recommendations
+            return self.recommendation_engine.recommend(owned_games)
             
         except Exception as e:
+            print(f"Error generating recommendations: {e}")
             return []
     
     # Steam API methods (enhanced versions)
     async def get_player_summaries(self, api_key: str, steam_id: str) -> dict:
         """Get player profile information"""
         try:
-            url = "https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/"
-            params = {
-                'key': api_key,
-                'steamids': steam_id,
-                'format': 'json'
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            # Coalesced with other sessions' lookups into one call per 100 Steam IDs
+            return await asyncio.wrap_future(self.summary_batcher.submit(api_key, steam_id))
             
         except Exception as e:
             return {"error": f"Failed to get player summaries: {str(e)}"}
@@ -938,7 +3696,7 @@ class EnhancedSteamAPIProxy:
     async def get_owned_games(self, api_key: str, steam_id: str) -> dict:
         """Get owned games with enhanced data"""
         try:
-            url = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/"
+            url = f"{self.steam_api_base}/IPlayerService/GetOwnedGames/v0001/"
             params = {
                 'key': api_key,
                 'steamid': steam_id,
@@ -948,9 +3706,9 @@ class EnhancedSteamAPIProxy:
                 'include_free_sub': 1
             }
             
-            response = self.session.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            return response.json()
+            # Large libraries are parsed incrementally straight into columns
+            return self.upstream.get_json('steam.owned_games', url, params, timeout=15, hedge=True,
+                                          parse=parse_owned_games_stream)
             
         except Exception as e:
             return {"error": f"Failed to get owned games: {str(e)}"}
@@ -958,7 +3716,7 @@ class EnhancedSteamAPIProxy:
     async def get_recently_played_games(self, api_key: str, steam_id: str, count: int = 10) -> dict:
         """Get recently played games"""
         try:
-            url = "https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v0001/"
+            url = f"{self.steam_api_base}/IPlayerService/GetRecentlyPlayedGames/v0001/"
             params = {
                 'key': api_key,
                 'steamid': steam_id,
@@ -966,9 +3724,7 @@ class EnhancedSteamAPIProxy:
                 'count': count
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.upstream.get_json('steam.recently_played', url, params, timeout=10, hedge=True)
             
         except Exception as e:
             return {"error": f"Failed to get recent games: {str(e)}"}
@@ -976,7 +3732,7 @@ class EnhancedSteamAPIProxy:
     async def get_player_achievements(self, api_key: str, steam_id: str, app_id: int) -> dict:
         """Get player achievements for a specific game"""
         try:
-            url = "https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v0001/"
+            url = f"{self.steam_api_base}/ISteamUserStats/GetPlayerAchievements/v0001/"
             params = {
                 'key': api_key,
                 'steamid': steam_id,
@@ -984,26 +3740,179 @@ class EnhancedSteamAPIProxy:
                 'format': 'json'
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.upstream.get_json('steam.player_achievements', url, params, timeout=10, hedge=True)
             
         except Exception as e:
             return {"error": f"Failed to get achievements: {str(e)}"}
 
+class RouteGate:
+    """Concurrency cap for one route with a bounded, deadline-limited wait queue"""
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float,
+                 clock=time.monotonic):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.service_time = 0.5         # EWMA of admitted request duration, seeds Retry-After
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected_full': 0, 'rejected_timeout': 0}
+
+    def acquire(self) -> bool:
+        """Wait for a slot; False means the request should be shed"""
+        with self.condition:
+            if self.in_flight < self.max_in_flight and self.waiting == 0:
+                self.in_flight += 1
+                self.stats['admitted'] += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self.stats['rejected_full'] += 1
+                return False
+
+            # Queue, but give up once the client would likely have timed out anyway
+            self.waiting += 1
+            self.stats['queued'] += 1
+            deadline = self.clock() + self.queue_timeout
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.stats['rejected_timeout'] += 1
+                        return False
+                    self.condition.wait(remaining)
+                self.in_flight += 1
+                self.stats['admitted'] += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self, duration: float):
+        """Free a slot and fold the request's duration into the service time estimate"""
+        with self.condition:
+            self.in_flight -= 1
+            self.service_time = 0.8 * self.service_time + 0.2 * duration
+            self.condition.notify()
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: time to drain the current queue"""
+        with self.condition:
+            backlog = self.waiting + self.in_flight
+        return max(1, math.ceil(self.service_time * backlog / self.max_in_flight))
+
+class AdmissionController:
+    """Per-route admission control; static assets are never queued behind API work"""
+
+    def __init__(self, route_limits: dict = None):
+        # route -> (max in flight, max queued, queue timeout seconds)
+        self.route_limits = route_limits or {
+            '/api/steam/authenticate': (4, 16, 2.0),
+            '/api/steam/validate': (16, 32, 1.0),
+            '/api/steam/user-data': (8, 16, 2.0),
+            '/api/steam/user-data/stream': (8, 16, 2.0),
+            '/api/steam/library': (16, 32, 1.0),
+            '/api/games/details': (4, 8, 2.0),
+        }
+        self.gates = {
+            route: RouteGate(route, *limits) for route, limits in self.route_limits.items()
+        }
+
+    def gate_for(self, path: str) -> RouteGate | None:
+        """Gate guarding a path, None for paths that are always admitted"""
+        return self.gates.get(path)
+
+class DeferredProxy:
+    """Builds the Steam proxy on a background thread so the listener can bind and serve first"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.proxy = None
+        self.error = None
+        self.ready = threading.Event()
+
+    def start(self):
+        """Begin initializing in the background"""
+        threading.Thread(target=self.build, name='proxy-init', daemon=True).start()
+
+    def build(self):
+        try:
+            self.proxy = self.factory()
+        except Exception as e:
+            self.error = e
+            print(f"❌ Steam proxy failed to initialize: {e}")
+        finally:
+            self.ready.set()
+
+    def get(self, timeout: float = None):
+        """The proxy once built, or None if it isn't ready within the timeout or failed"""
+        self.ready.wait(timeout)
+        return self.proxy
+
 class GamePediaServer(SimpleHTTPRequestHandler):
     """Enhanced HTTP server with secure Steam API proxy"""
     
-    def __init__(self, *args, steam_proxy=None, **kwargs):
-        self.steam_proxy = steam_proxy
+    API_ROUTES = frozenset({
+        '/api/steam/authenticate', '/api/steam/validate', '/api/steam/user-data',
+        '/api/steam/user-data/stream', '/api/steam/library', '/api/games/details', '/metrics',
+        '/admin/profile', '/admin/memory', '/healthz', '/readyz',
+    })
+    
+    STARTUP_WAIT = 30.0     # Seconds an API request waits for a proxy that is still initializing
+    
+    def __init__(self, *args, steam_proxy=None, admission=None, **kwargs):
+        self.proxy_source = steam_proxy
+        self.admission = admission
+        self.static_cors = False
         super().__init__(*args, **kwargs)
     
+    @property
+    def steam_proxy(self):
+        """The Steam proxy, waiting for a deferred one to finish initializing"""
+        if isinstance(self.proxy_source, DeferredProxy):
+            return self.proxy_source.get(self.STARTUP_WAIT)
+        return self.proxy_source
+    
+    def current_proxy(self):
+        """The Steam proxy if it is ready now, without waiting"""
+        if isinstance(self.proxy_source, DeferredProxy):
+            return self.proxy_source.get(0)
+        return self.proxy_source
+    
+    def handle_one_request(self):
+        """Handle one request and record its count and latency per route"""
+        start = time.perf_counter()
+        self.response_status = None
+        self.static_cors = False
+        # Static files and health checks are served during startup, so don't wait for the proxy here
+        proxy = self.current_proxy()
+        with proxy.profiler.profile_request() if proxy else nullcontext():
+            super().handle_one_request()
+        if self.response_status is None:
+            return
+        
+        path = urlparse(self.path).path
+        # Bounded label set: anything that isn't an API route is a static asset
+        route = path if path in self.API_ROUTES else ('static' if self.command == 'GET' else 'other')
+        METRICS.inc('gamepedia_http_requests_total', (route, self.command, str(self.response_status)))
+        METRICS.observe('gamepedia_http_request_duration_seconds', (route,), time.perf_counter() - start)
+    
+    def send_response(self, code, message=None):
+        """Send the status line, remembering the code for metrics"""
+        self.response_status = code
+        super().send_response(code, message)
+    
     def do_GET(self):
         """Handle GET requests"""
         parsed_path = urlparse(self.path)
         
+        if parsed_path.path == '/metrics':
+            self.handle_metrics()
+        elif parsed_path.path in ('/healthz', '/readyz'):
+            self.handle_health(readiness=parsed_path.path == '/readyz')
         # Handle legacy Steam API proxy requests (deprecated)
-        if parsed_path.path.startswith('/api/steam/'):
+        elif parsed_path.path.startswith('/api/steam/'):
             self.send_json_response({"error": "Please use the new secure authentication system"}, 400)
         else:
             # Handle static files
@@ -1013,12 +3922,50 @@ class GamePediaServer(SimpleHTTPRequestHandler):
         """Handle POST requests for secure Steam API"""
         parsed_path = urlparse(self.path)
         
+        # Spans recorded anywhere below land in this request's trace
+        trace = Trace(parsed_path.path)
+        token = CURRENT_TRACE.set(trace)
+        try:
+            # Shed load early rather than queueing behind slow upstream calls
+            gate = self.admission.gate_for(parsed_path.path) if self.admission else None
+            with span('admission'):
+                admitted = gate is None or gate.acquire()
+            if not admitted:
+                self.send_json_response({"error": "Server busy, please retry shortly"}, 503,
+                                        headers={'Retry-After': str(gate.retry_after())})
+                return
+            
+            start = time.monotonic()
+            try:
+                self.route_post(parsed_path)
+            finally:
+                if gate is not None:
+                    gate.release(time.monotonic() - start)
+        finally:
+            CURRENT_TRACE.reset(token)
+            # Never wait for startup just to record a trace of a shed or failed request
+            proxy = self.current_proxy()
+            if proxy:
+                proxy.trace_recorder.maybe_record(trace, self.response_status)
+    
+    def route_post(self, parsed_path):
+        """Dispatch an admitted POST request"""
         if parsed_path.path == '/api/steam/authenticate':
             asyncio.run(self.handle_authentication())
         elif parsed_path.path == '/api/steam/validate':
             self.handle_session_validation()
         elif parsed_path.path == '/api/steam/user-data':
             asyncio.run(self.handle_user_data())
+        elif parsed_path.path == '/api/steam/user-data/stream':
+            asyncio.run(self.handle_user_data_stream())
+        elif parsed_path.path == '/api/steam/library':
+            asyncio.run(self.handle_library())
+        elif parsed_path.path == '/api/games/details':
+            self.handle_game_details()
+        elif parsed_path.path == '/admin/profile':
+            self.handle_admin_profile()
+        elif parsed_path.path == '/admin/memory':
+            self.handle_admin_memory()
         else:
             self.send_error(404)
     
@@ -1041,7 +3988,9 @@ class GamePediaServer(SimpleHTTPRequestHandler):
                 return
             
             # Authenticate with Steam API
-            result = await self.steam_proxy.authenticate_user(api_key, steam_id)
+            result = await self.steam_proxy.authenticate_user(
+                api_key, steam_id, *self.client_identity()
+            )
             
             if result.get('success'):
                 self.send_json_response(result)
@@ -1068,7 +4017,9 @@ class GamePediaServer(SimpleHTTPRequestHandler):
                 self.send_json_response({"error": "Session token required"}, 400)
                 return
             
-            is_valid = self.steam_proxy.validate_session_token(session_token)
+            is_valid = self.steam_proxy.security_manager.validate_session_security(
+                session_token, *self.client_identity()
+            )
             
             if is_valid:
                 self.send_json_response({"valid": True})
@@ -1096,7 +4047,9 @@ class GamePediaServer(SimpleHTTPRequestHandler):
                 return
             
             # Get comprehensive user data
-            user_data = await self.steam_proxy.get_comprehensive_user_data(session_token)
+            user_data = await self.steam_proxy.get_comprehensive_user_data(
+                session_token, *self.client_identity()
+            )
             
             if 'error' in user_data:
                 self.send_json_response(user_data, 401)
@@ -1106,26 +4059,319 @@ class GamePediaServer(SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({"error": f"Data retrieval error: {str(e)}"}, 500)
     
+    async def handle_user_data_stream(self):
+        """Handle user data as NDJSON lines (or SSE events), one per section"""
+        streaming = False
+        use_sse = False
+        try:
+            if not self.steam_proxy:
+                self.send_json_response({"error": "Steam proxy not initialized"}, 500)
+                return
+                
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            data = json.loads(post_data.decode('utf-8'))
+            
+            session_token = data.get('session_token')
+            
+            if not session_token:
+                self.send_json_response({"error": "Session token required"}, 400)
+                return
+            
+            sections = self.steam_proxy.stream_user_data(session_token, *self.client_identity())
+            use_sse = 'text/event-stream' in self.headers.get('Accept', '')
+            
+            # Session problems are reported with a status code before anything is streamed
+            section, payload = await sections.__anext__()
+            if section == 'error':
+                self.send_json_response(payload, 401)
+                return
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream' if use_sse else 'application/x-ndjson')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            streaming = True
+            
+            while True:
+                if use_sse:
+                    message = f"event: {section}\ndata: {json.dumps(payload)}\n\n"
+                else:
+                    message = json.dumps({'section': section, 'data': payload}) + "\n"
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+                try:
+                    section, payload = await sections.__anext__()
+                except StopAsyncIteration:
+                    break
+                
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-stream
+        except Exception as e:
+            error = {"error": f"Data retrieval error: {str(e)}"}
+            if not streaming:
+                self.send_json_response(error, 500)
+                return
+            # The 200 is already out; end the stream with an error record instead
+            if use_sse:
+                message = f"event: error\ndata: {json.dumps(error)}\n\n"
+            else:
+                message = json.dumps({'section': 'error', 'data': error}) + "\n"
+            try:
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+    
+    async def handle_library(self):
+        """Handle paginated library browsing"""
+        try:
+            if not self.steam_proxy:
+                self.send_json_response({"error": "Steam proxy not initialized"}, 500)
+                return
+                
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            data = json.loads(post_data.decode('utf-8'))
+            
+            # Query string parameters (e.g. ?fields=appid,name) are defaults for the body
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            data = {**params, **data}
+            
+            session_token = data.get('session_token')
+            
+            if not session_token:
+                self.send_json_response({"error": "Session token required"}, 400)
+                return
+            
+            try:
+                query = self.steam_proxy.parse_library_query(data)
+            except ValueError as e:
+                self.send_json_response({"error": str(e)}, 400)
+                return
+            
+            library = await self.steam_proxy.get_library_page(
+                session_token, *self.client_identity(), query
+            )
+            
+            if 'error' in library:
+                # Only session problems are 401s; rate limits and upstream failures keep their own codes
+                status = library.pop('status', 500)
+                self.send_json_response(library, status)
+            else:
+                self.send_json_response(library)
+                
+        except Exception as e:
+            self.send_json_response({"error": f"Library error: {str(e)}"}, 500)
+    
+    def handle_game_details(self):
+        """Handle bulk game detail lookups, optionally streamed as NDJSON"""
+        streaming = False
+        try:
+            if not self.steam_proxy:
+                self.send_json_response({"error": "Steam proxy not initialized"}, 500)
+                return
+                
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            data = json.loads(post_data.decode('utf-8'))
+            
+            try:
+                app_ids = list(dict.fromkeys(int(app_id) for app_id in data.get('app_ids', [])))
+            except (TypeError, ValueError):
+                self.send_json_response({"error": "app_ids must be a list of integers"}, 400)
+                return
+            
+            if not app_ids or len(app_ids) > 100:
+                self.send_json_response({"error": "Between 1 and 100 app_ids are required"}, 400)
+                return
+            
+            ip_address, _ = self.client_identity()
+            if not self.steam_proxy.security_manager.check_rate_limit(ip_address, 'api_calls'):
+                self.send_json_response({"error": "Rate limit exceeded"}, 429)
+                return
+            
+            manager = self.steam_proxy.game_data_manager
+            results = manager.iter_game_details(app_ids)
+            
+            stream = data.get('stream') or 'application/x-ndjson' in self.headers.get('Accept', '')
+            if stream:
+                # One line per game as soon as it resolves; cached hits go out first
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                streaming = True
+                for app_id, details, status in results:
+                    line = {'appid': app_id, 'status': status}
+                    if details is not None:
+                        line['game'] = manager.public_game_details(details)
+                    self.wfile.write(json.dumps(line).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+                return
+            
+            games, missing, deferred = {}, [], []
+            for app_id, details, status in results:
+                if details is not None:
+                    games[app_id] = manager.public_game_details(details)
+                elif status == 'deferred':
+                    deferred.append(app_id)
+                else:
+                    missing.append(app_id)
+            
+            self.send_json_response({
+                'games': [games[app_id] for app_id in app_ids if app_id in games],
+                'missing': missing,
+                'deferred': deferred,
+            })
+                
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-stream
+        except Exception as e:
+            if streaming:
+                self.wfile.write(json.dumps({"error": f"Game details error: {str(e)}"}).encode('utf-8') + b'\n')
+            else:
+                self.send_json_response({"error": f"Game details error: {str(e)}"}, 500)
+    
+    def is_local_admin_request(self) -> bool:
+        """Admin endpoints answer loopback clients only, and never requests relayed by a proxy"""
+        try:
+            loopback = ipaddress.ip_address(self.client_address[0]).is_loopback
+        except ValueError:
+            loopback = False
+        return loopback and not self.headers.get('X-Forwarded-For') and not self.headers.get('Forwarded')
+    
+    def read_admin_request(self):
+        """JSON body of an admin request, or None after sending a 403 for remote clients"""
+        if not self.steam_proxy or not self.is_local_admin_request():
+            self.send_json_response({"error": "Admin endpoints are only available from localhost"}, 403)
+            return None
+        content_length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(content_length).decode('utf-8')) if content_length else {}
+    
+    def send_text_response(self, text: str, content_type: str = 'text/plain; charset=utf-8'):
+        """Send a plain-text body"""
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def handle_admin_profile(self):
+        """Profile the server for N seconds: cProfile stats or sampled collapsed stacks"""
+        try:
+            data = self.read_admin_request()
+            if data is None:
+                return
+            
+            mode = data.get('mode', 'sampling')
+            seconds = float(data.get('seconds', 10))
+            if mode not in ('cprofile', 'sampling'):
+                self.send_json_response({"error": "mode must be 'cprofile' or 'sampling'"}, 400)
+                return
+            if not 0 < seconds <= ProfilerService.MAX_SECONDS:
+                self.send_json_response({"error": f"seconds must be between 0 and {ProfilerService.MAX_SECONDS}"}, 400)
+                return
+            
+            profiler = self.steam_proxy.profiler
+            if mode == 'cprofile':
+                result = profiler.run_cprofile(seconds, data.get('sort', 'cumulative'), int(data.get('limit', 40)))
+            else:
+                result = profiler.run_sampler(seconds, float(data.get('interval_ms', 5)) / 1000,
+                                              bool(data.get('include_idle')))
+            
+            if 'error' in result:
+                self.send_json_response(result, 409)
+            else:
+                self.send_text_response(result['output'])
+                
+        except Exception as e:
+            self.send_json_response({"error": f"Profiling error: {str(e)}"}, 500)
+    
+    def handle_admin_memory(self):
+        """tracemalloc baseline, diff against it, or stop tracing"""
+        try:
+            data = self.read_admin_request()
+            if data is None:
+                return
+            
+            profiler = self.steam_proxy.profiler
+            action = data.get('action', 'diff')
+            if action == 'baseline':
+                result = profiler.take_memory_baseline(int(data.get('frames', 1)))
+            elif action == 'diff':
+                result = profiler.memory_diff(int(data.get('limit', 25)), data.get('scope', 'proxy'))
+            elif action == 'stop':
+                result = profiler.stop_memory_tracing()
+            else:
+                result = {"error": "action must be 'baseline', 'diff' or 'stop'"}
+            
+            self.send_json_response(result, 400 if 'error' in result else 200)
+                
+        except Exception as e:
+            self.send_json_response({"error": f"Memory profiling error: {str(e)}"}, 500)
+    
+    def handle_metrics(self):
+        """Serve metrics in Prometheus text format"""
+        self.send_text_response(METRICS.render(), 'text/plain; version=0.0.4; charset=utf-8')
+    
+    def handle_health(self, readiness: bool):
+        """Liveness (/healthz) or readiness (/readyz), with database, cache and breaker state"""
+        proxy = self.current_proxy()
+        if proxy is None:
+            failed = isinstance(self.proxy_source, DeferredProxy) and self.proxy_source.error is not None
+            report = {'status': 'failed' if failed else 'starting'}
+            # A process still initializing is alive but not ready; one whose init failed is neither
+            healthy = not failed and not readiness
+        else:
+            report = proxy.health_report()
+            healthy = not readiness or report['status'] != 'unavailable'
+        report['pid'] = os.getpid()
+        self.send_json_response(report, 200 if healthy else 503, {'Cache-Control': 'no-store'})
+    
     def handle_static_files(self):
         """Handle static file requests"""
-        # Add CORS headers for all responses
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        # CORS headers are added in end_headers, after the status line has been written
+        self.static_cors = True
         super().do_GET()
     
-    def send_json_response(self, data, status_code=200):
+    def end_headers(self):
+        """Add CORS headers for all static responses"""
+        if self.static_cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        super().end_headers()
+    
+    def client_identity(self) -> tuple:
+        """(ip_address, user_agent) used for rate limits, session binding and audit logs"""
+        return self.client_address[0], self.headers.get('User-Agent', '')
+    
+    def send_json_response(self, data, status_code=200, headers: dict = None):
         """Send JSON response with CORS headers"""
-        response = json.dumps(data, indent=2)
+        # Memoized results carry their encoded body
+        with span('encode'):
+            response = data.encoded() if isinstance(data, EncodedResponse) else json.dumps(data, indent=2).encode('utf-8')
+        
+        trace = CURRENT_TRACE.get()
+        if trace is not None:
+            headers = {**(headers or {}), 'Server-Timing': trace.server_timing()}
         
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Expose-Headers', 'Server-Timing')
+        self.send_header('Timing-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(response)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         
-        self.wfile.write(response.encode('utf-8'))
+        self.wfile.write(response)
     
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
@@ -1144,78 +4390,355 @@ def get_free_port():
         port = s.getsockname()[1]
     return port
 
-def create_server_handler(steam_proxy):
+def create_server_handler(steam_proxy, admission: AdmissionController = None):
     """Create a server handler with Steam proxy"""
+    admission = admission or AdmissionController()
+    
+    def collect_admission_metrics():
+        samples = []
+        for route, gate in admission.gates.items():
+            samples.append(('gamepedia_admission_in_flight', (route,), gate.in_flight))
+            for outcome, count in gate.stats.items():
+                samples.append(('gamepedia_admission_total', (route, outcome), count))
+        return samples
+    
+    METRICS.register_collector('admission', collect_admission_metrics)
+    
     def handler(*args, **kwargs):
-        return GamePediaServer(*args, steam_proxy=steam_proxy, **kwargs)
+        return GamePediaServer(*args, steam_proxy=steam_proxy, admission=admission, **kwargs)
     return handler
 
-def main():
-    """Main server function"""
-    # Initialize Steam API proxy
+class DrainingServerMixIn:
+    """Counts in-flight connections so a stopping server can finish them before the process exits"""
+
+    daemon_threads = True
+    reuse_port = False
+
+    def __init__(self, *args, **kwargs):
+        self.active_connections = 0
+        self.connections_done = threading.Condition()
+        super().__init__(*args, **kwargs)
+
+    def server_bind(self):
+        if self.reuse_port:
+            # Several worker processes listen on one port and the kernel spreads connections across them
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        # Counted before the thread starts, so drain() can't miss a connection that was just accepted
+        with self.connections_done:
+            self.active_connections += 1
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self.connections_done:
+                self.active_connections -= 1
+                self.connections_done.notify_all()
+
+    def drain(self, timeout: float) -> int:
+        """Once serve_forever has returned, serve connections already queued on the listener and wait
+        for in-flight ones; returns how many were still open at the timeout"""
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self, selectors.EVENT_READ)
+            while time.monotonic() < deadline and selector.select(0):
+                self.handle_request()
+        with self.connections_done:
+            self.connections_done.wait_for(lambda: self.active_connections == 0,
+                                           max(0.0, deadline - time.monotonic()))
+            return self.active_connections
+
+class GamePediaHTTPServer(DrainingServerMixIn, ThreadingHTTPServer):
+    """Threaded so concurrent sessions can share batched upstream calls"""
+
+class ThreadingUnixHTTPServer(DrainingServerMixIn, socketserver.ThreadingUnixStreamServer):
+    """ThreadingHTTPServer on a unix domain socket, for running behind a local reverse proxy"""
+
+    def server_bind(self):
+        # Replace the socket file a previous run left behind, but never a regular file
+        if os.path.exists(self.server_address) and stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+            os.unlink(self.server_address)
+        super().server_bind()
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # Unix peers have no IP; a non-IP placeholder keeps them out of the loopback-only admin routes
+        return request, ('unix', 0)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+def build_proxy() -> EnhancedSteamAPIProxy:
+    """Initialize the Steam proxy and start its background jobs"""
     steam_proxy = EnhancedSteamAPIProxy()
+    steam_proxy.price_refresh_job.start()
+    return steam_proxy
+
+def start_gamepedia_server(address, directory: str, reuse_port: bool = False) -> tuple:
+    """Bind the listener (a (host, port) tuple or a unix socket path), then initialize the Steam proxy in
+    the background; returns (httpd, deferred proxy)"""
+    steam_proxy = DeferredProxy(build_proxy)
+    server_handler = functools.partial(create_server_handler(steam_proxy), directory=directory)
+    if isinstance(address, str):
+        httpd = ThreadingUnixHTTPServer(address, server_handler)
+    else:
+        httpd = GamePediaHTTPServer(address, server_handler, bind_and_activate=False)
+        httpd.reuse_port = reuse_port
+        try:
+            httpd.server_bind()
+            httpd.server_activate()
+        except OSError:
+            httpd.server_close()
+            raise
+    steam_proxy.start()
+    return httpd, steam_proxy
+
+def wait_until_ready(url: str, timeout: float = 30.0, process=None) -> bool:
+    """Poll a server's /readyz until it answers 200; False on timeout or if its process exits first"""
+    import urllib.error
+    import urllib.request
+    # Bypass any configured HTTP proxy, which can't reach a local server
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            with opener.open(url.rstrip('/') + '/readyz', timeout=1.0) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass  # Not listening yet, or 503 while the proxy initializes
+        time.sleep(0.05)
+    return False
+
+class ProcessSupervisor:
+    """Keeps worker processes running, restarting crashed ones with exponential backoff"""
+
+    def __init__(self, command: list, workers: int = 1, cwd: str = None, env: dict = None,
+                 min_backoff: float = 0.5, max_backoff: float = 30.0, stable_after: float = 60.0,
+                 popen=subprocess.Popen, clock=time.monotonic):
+        self.command = command
+        self.workers = workers
+        self.cwd = cwd
+        self.env = env
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after    # A worker up this long has recovered; its backoff resets
+        self.popen = popen
+        self.clock = clock
+        self.processes = {}                 # slot -> Popen, or None while waiting to restart
+        self.started_at = {}
+        self.backoff = {}
+        self.restart_at = {}
+        self.restarts = 0
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        self.processes[slot] = self.popen(self.command, cwd=self.cwd, env=self.env)
+        self.started_at[slot] = self.clock()
+
+    def start(self):
+        """Launch every worker"""
+        if threading.current_thread() is threading.main_thread():
+            # SIGTERM raises KeyboardInterrupt like Ctrl+C, so the caller's cleanup stops the workers too
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+    def poll(self) -> list:
+        """Schedule restarts for crashed workers and launch those whose backoff has passed;
+        returns (slot, exit code) for workers that exited since the last poll"""
+        exited = []
+        now = self.clock()
+        for slot, process in list(self.processes.items()):
+            if process is None:
+                if not self.stopping and now >= self.restart_at[slot]:
+                    self.spawn(slot)
+                    self.restarts += 1
+                continue
+            code = process.poll()
+            if code is None or self.stopping:
+                continue
+            exited.append((slot, code))
+            if code == 0:
+                # A clean exit is a deliberate stop, not a crash
+                del self.processes[slot]
+                continue
+            if now - self.started_at[slot] >= self.stable_after:
+                self.backoff[slot] = self.min_backoff
+            delay = self.backoff.get(slot, self.min_backoff)
+            self.backoff[slot] = min(self.max_backoff, delay * 2)
+            self.restart_at[slot] = now + delay
+            self.processes[slot] = None
+            print(f"⚠️ Worker {slot} exited with code {code}; restarting in {delay:.1f}s")
+        return exited
+
+    def run(self, interval: float = 0.2):
+        """Supervise until every worker has exited cleanly or stop() is called"""
+        while self.processes and not self.stopping:
+            self.poll()
+            time.sleep(interval)
+
+    def stop(self, timeout: float = 10.0):
+        """Terminate every worker, killing any still running after the timeout"""
+        self.stopping = True
+        running = [p for p in self.processes.values() if p is not None and p.poll() is None]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in running:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+def print_server_banner(url: str, port: int, gamepedia_dir: Path, workers: int = 1):
+    """Startup banner with the URL and feature summary"""
+    print("🎮 GamePedia + Secure Steam API Server v2.0")
+    print("=" * 55)
+    print(f"🚀 Server URL: {url}")
+    if port:
+        print(f"🔧 Port: {port}")
+    if workers > 1:
+        print(f"👷 Workers: {workers} (sharing the port via SO_REUSEPORT)")
+    print(f"📁 Serving from: {gamepedia_dir}")
+    print("🔗 Steam API Proxy: Active (Secure)")
+    print("🩺 Health: /healthz (alive) and /readyz (ready for API traffic)")
+    print("\n" + "🎯 SECURITY FEATURES:")
+    print("✅ Session-based Authentication")
+    print("✅ Encrypted Credential Storage")
+    print("✅ No Client-side API Key Exposure")
+    print("✅ Automatic Session Expiration")
+    print("✅ Secure Token Generation")
+    print("\n" + "🔧 STEAM INTEGRATION:")
+    print("✅ Real-time Steam Data")
+    print("✅ Player Profile & Statistics")
+    print("✅ Recently Played Games")
+    print("✅ Secure API Proxy")
+    print("✅ Auto-refresh Every 5 Minutes")
+    print("\n" + "⚙️ SETUP:")
+    print("1. Get Steam API Key: https://steamcommunity.com/dev/apikey")
+    print("2. Find Steam ID: https://steamidfinder.com/")
+    print("3. Configure in the Steam widget (one-time setup)")
+    print("4. Your credentials are stored securely server-side")
+    print("\n" + "=" * 55)
+    print("❌ Press Ctrl+C to stop the server", flush=True)
+
+def run_workers(args, gamepedia_dir: Path) -> bool:
+    """Pre-fork mode: supervise single-process workers that share one port through SO_REUSEPORT"""
+    if args.unix_socket or not hasattr(socket, 'SO_REUSEPORT'):
+        print("❌ Error: multiple workers need a TCP port and a platform with SO_REUSEPORT")
+        return False
+    
+    # Workers are spawned rather than forked, so no threads or open databases cross into them
+    port = args.port or get_free_port()
+    command = [sys.executable, str(Path(__file__).resolve()), '--worker', '--host', args.host,
+               '--port', str(port), '--drain-timeout', str(args.drain_timeout)]
+    supervisor = ProcessSupervisor(command, workers=args.workers,
+                                   env={**os.environ, 'GAMEPEDIA_WORKERS': str(args.workers)})
+    url = f"http://localhost:{port}"
+    try:
+        supervisor.start()
+        if not wait_until_ready(f"http://127.0.0.1:{port}", timeout=60):
+            print("❌ Error: workers did not become ready")
+            return False
+        print_server_banner(url, port, gamepedia_dir, args.workers)
+        if not args.no_browser:
+            print(f"🌐 Opening browser to {url}")
+            webbrowser.open(url)
+        supervisor.run()
+    except KeyboardInterrupt:
+        print("\n\n🛑 Server stopped by user, draining workers...")
+    finally:
+        # Workers drain on SIGTERM; the margin covers their own drain timeout
+        supervisor.stop(args.drain_timeout + 5)
+    return True
+
+def main(argv: list = None):
+    """Main server function"""
+    import argparse
+    parser = argparse.ArgumentParser(description='GamePedia secure Steam API proxy server')
+    parser.add_argument('--host', default='', help='interface to bind (default: all)')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('GAMEPEDIA_PORT', 0)),
+                        help='TCP port to listen on; 0 picks a free one (default: $GAMEPEDIA_PORT or 0)')
+    parser.add_argument('--unix-socket', help='listen on this unix domain socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('GAMEPEDIA_WORKERS', 1)),
+                        help='worker processes sharing the port; 0 for one per CPU (default: $GAMEPEDIA_WORKERS or 1)')
+    parser.add_argument('--reuse-port', action='store_true',
+                        help='set SO_REUSEPORT, e.g. to start a new version before stopping the old one')
+    parser.add_argument('--drain-timeout', type=float, default=10.0,
+                        help='seconds to finish in-flight requests after SIGTERM or Ctrl+C')
+    parser.add_argument('--no-browser', action='store_true', help="don't open a browser once the server is ready")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
     
-    # Change to gamepedia directory
     gamepedia_dir = Path(__file__).parent / 'gamepedia'
     if not gamepedia_dir.exists():
         print("❌ Error: gamepedia directory not found!")
         print("Please make sure you're running this script from the project root directory.")
         return False
     
-    os.chdir(gamepedia_dir)
-    
-    # Find free port and start server
-    port = get_free_port()
-    server_handler = create_server_handler(steam_proxy)
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    if args.workers > 1 and not args.worker:
+        return run_workers(args, gamepedia_dir)
     
     try:
-        with HTTPServer(("", port), server_handler) as httpd:
-            url = f"http://localhost:{port}"
-            
-            print("🎮 GamePedia + Secure Steam API Server v2.0")
-            print("=" * 55)
-            print(f"🚀 Server URL: {url}")
-            print(f"🔧 Port: {port}")
-            print(f"📁 Serving from: {gamepedia_dir}")
-            print("🔗 Steam API Proxy: Active (Secure)")
-            print("\n" + "🎯 SECURITY FEATURES:")
-            print("✅ Session-based Authentication")
-            print("✅ Encrypted Credential Storage")
-            print("✅ No Client-side API Key Exposure")
-            print("✅ Automatic Session Expiration")
-            print("✅ Secure Token Generation")
-            print("\n" + "🔧 STEAM INTEGRATION:")
-            print("✅ Real-time Steam Data")
-            print("✅ Player Profile & Statistics")
-            print("✅ Recently Played Games")
-            print("✅ Secure API Proxy")
-            print("✅ Auto-refresh Every 5 Minutes")
-            print("\n" + "⚙️ SETUP:")
-            print("1. Get Steam API Key: https://steamcommunity.com/dev/apikey")
-            print("2. Find Steam ID: https://steamidfinder.com/")
-            print("3. Configure in the Steam widget (one-time setup)")
-            print("4. Your credentials are stored securely server-side")
-            print("\n" + "=" * 55)
-            print(f"🌐 Opening browser to {url}")
-            print("❌ Press Ctrl+C to stop the server")
+        # The databases stay in the working directory; static files come from gamepedia/
+        address = args.unix_socket or (args.host, args.port)
+        httpd, steam_proxy = start_gamepedia_server(address, str(gamepedia_dir), args.reuse_port or args.worker)
+        with httpd:
+            if args.unix_socket:
+                url = f"unix:{args.unix_socket}"
+                port = None
+            else:
+                port = httpd.server_address[1]
+                url = f"http://localhost:{port}"
+            
+            if args.worker:
+                print(f"👷 Worker {os.getpid()} listening on port {port}", flush=True)
+            else:
+                print_server_banner(url, port, gamepedia_dir)
             
-            # Open browser after delay
-            def open_browser():
-                time.sleep(1.5)
-                webbrowser.open(url)
+            def when_initialized():
+                # Exit on a failed init so a supervisor restarts us; otherwise open the browser once ready
+                if steam_proxy.get() is None:
+                    httpd.shutdown()
+                elif port and not (args.no_browser or args.worker):
+                    print(f"🌐 Opening browser to {url}")
+                    webbrowser.open(url)
             
-            threading.Thread(target=open_browser, daemon=True).start()
+            threading.Thread(target=when_initialized, daemon=True).start()
             
-            # Start server
-            httpd.serve_forever()
+            # SIGTERM stops accepting like Ctrl+C does; shutdown() waits for serve_forever, so not from here
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=httpd.shutdown,
+                                                                                 daemon=True).start())
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                if not args.worker:
+                    print("\n\n🛑 Server stopped by user")
+            
+            # Requests already accepted or queued on the listener still get their responses
+            unfinished = httpd.drain(args.drain_timeout)
+            if unfinished:
+                print(f"⚠️ {unfinished} connection(s) still open after the {args.drain_timeout:.0f}s drain")
+            return steam_proxy.error is None
             
-    except KeyboardInterrupt:
-        print("\n\n🛑 Server stopped by user")
-        return True
     except Exception as e:
         print(f"❌ Error starting server: {e}")
         return False
 
 if __name__ == "__main__":
     if not main():
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
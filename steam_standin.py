@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Local Steam Web API stand-in
+Serves Steam, Steam store and RAWG shaped responses with injected latency, errors and throttling,
+so the proxy can be benchmarked and tested end-to-end without the real APIs
+
+Point the proxy at it with the variables printed on startup, e.g.
+    GAMEPEDIA_STEAM_API_BASE=http://127.0.0.1:8765
+    GAMEPEDIA_STEAM_STORE_BASE=http://127.0.0.1:8765/api
+    GAMEPEDIA_RAWG_API_BASE=http://127.0.0.1:8765/api
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import synthetic_library
+from synthetic_library import SyntheticLibrary
+
+
+class LatencyDistribution:
+    """Samples response delays: a lognormal body plus an occasional slow tail"""
+
+    def __init__(self, median_ms: float = 30.0, sigma: float = 0.3,
+                 tail_probability: float = 0.05, tail_ms: float = 400.0, seed: int = None):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.tail_probability = tail_probability
+        self.tail_ms = tail_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        """Delay in seconds for one response"""
+        with self.lock:
+            if self.random.random() < self.tail_probability:
+                return self.tail_ms * self.random.uniform(0.8, 1.5) / 1000
+            return self.median_ms * self.random.lognormvariate(0, self.sigma) / 1000
+
+
+class FaultProfile:
+    """Injected failures: random 5xx errors, random 429s and a per-key request rate limit"""
+
+    def __init__(self, error_rate: float = 0.0, throttle_rate: float = 0.0, rate_limit: float = None,
+                 retry_after: int = 1, seed: int = None, clock=time.monotonic):
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit            # Requests per second per key; a burst of the same size is allowed
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.buckets = {}                       # key -> (tokens, last refill)
+        self.lock = threading.Lock()
+
+    def take_token(self, key: str) -> bool:
+        """Token bucket check for one request"""
+        now = self.clock()
+        tokens, last = self.buckets.get(key, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - last) * self.rate_limit)
+        if tokens < 1:
+            self.buckets[key] = (tokens, now)
+            return False
+        self.buckets[key] = (tokens - 1, now)
+        return True
+
+    def check(self, key: str):
+        """(status, payload, headers) for a request that should fail, else None"""
+        with self.lock:
+            if self.rate_limit is not None and not self.take_token(key):
+                return 429, {'error': 'Too Many Requests'}, {'Retry-After': str(self.retry_after)}
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return 429, {'error': 'Too Many Requests'}, {'Retry-After': str(self.retry_after)}
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {'error': 'Internal Server Error'}, {}
+        return None
+
+
+class SteamStandIn:
+    """Canned Steam Web API, store and RAWG data served by the stand-in"""
+
+    STEAM_ID = '76561198000000000'
+
+    def __init__(self, latency: LatencyDistribution = None, faults: FaultProfile = None,
+                 library_size: int = None, endpoint_latency: dict = None, seed: int = 0):
+        self.latency = latency or LatencyDistribution()
+        self.endpoint_latency = endpoint_latency or {}  # path -> LatencyDistribution
+        self.faults = faults or FaultProfile()
+        self.library_size = library_size
+        self.seed = seed
+        self.request_counts = {}
+        self.status_counts = {}
+        self.libraries = OrderedDict()          # steam_id -> games, for synthetic libraries
+        self.lock = threading.Lock()
+        self.games = [
+            {"appid": 730, "name": "Counter-Strike: Global Offensive", "playtime_forever": 1247, "playtime_2weeks": 45},
+            {"appid": 440, "name": "Team Fortress 2", "playtime_forever": 892, "playtime_2weeks": 23},
+            {"appid": 570, "name": "Dota 2", "playtime_forever": 2156, "playtime_2weeks": 89},
+            {"appid": 292030, "name": "The Witcher 3: Wild Hunt", "playtime_forever": 145, "playtime_2weeks": 12},
+            {"appid": 1086940, "name": "Baldur's Gate 3", "playtime_forever": 123, "playtime_2weeks": 15},
+        ]
+        self.routes = {
+            '/ISteamUser/GetPlayerSummaries/v0002/': self.player_summaries,
+            '/IPlayerService/GetOwnedGames/v0001/': self.owned_games,
+            '/IPlayerService/GetRecentlyPlayedGames/v0001/': self.recently_played,
+            '/ISteamUserStats/GetPlayerAchievements/v0001/': self.player_achievements,
+            '/ISteamUserStats/GetSchemaForGame/v2/': self.achievement_schema,
+            '/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v0002/': self.achievement_percentages,
+            '/api/appdetails': self.app_details,
+            '/api/games': self.rawg_search,
+        }
+
+    def count(self, path: str, status: int = None):
+        """Count a served request"""
+        with self.lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+            if status is not None:
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def delay(self, path: str) -> float:
+        """Response delay for a path"""
+        return self.endpoint_latency.get(path, self.latency).sample()
+
+    def library(self, steam_id: str) -> list:
+        """Owned games for a Steam ID: the canned five, or a synthetic library seeded by the ID"""
+        if not self.library_size:
+            return self.games
+        with self.lock:
+            games = self.libraries.get(steam_id)
+            if games is None:
+                games = SyntheticLibrary(self.library_size, f'{self.seed}:{steam_id}', steam_id=steam_id).games
+                self.libraries[steam_id] = games
+                while len(self.libraries) > 64:
+                    self.libraries.popitem(last=False)
+            return games
+
+    def respond(self, path: str, params: dict) -> tuple:
+        """(status, payload, headers) for a request, after fault injection"""
+        failure = self.faults.check(params.get('key') or path)
+        if failure is not None:
+            return failure
+        status, payload = self.handle(path, params)
+        return status, payload, {}
+
+    def handle(self, path: str, params: dict) -> tuple:
+        """Return (status, payload) for an API path"""
+        route = self.routes.get(path)
+        if route is None:
+            return 404, {'error': 'Unknown endpoint'}
+        return 200, route(params)
+
+    def player_summaries(self, params: dict) -> dict:
+        steam_ids = (params.get('steamids') or self.STEAM_ID).split(',')
+        return {'response': {'players': [{
+            'steamid': sid,
+            'personaname': f'Player {sid[-4:]}',
+            'personastate': 1,
+            'avatarfull': '',
+        } for sid in steam_ids]}}
+
+    def owned_games(self, params: dict) -> dict:
+        games = self.library(params.get('steamid') or self.STEAM_ID)
+        if params.get('include_appinfo') not in ('1', 'true'):
+            games = [{k: v for k, v in g.items() if k not in ('name', 'img_icon_url', 'has_community_visible_stats')}
+                     for g in games]
+        return {'response': {'game_count': len(games), 'games': games}}
+
+    def recently_played(self, params: dict) -> dict:
+        recent = [g for g in self.library(params.get('steamid') or self.STEAM_ID) if g.get('playtime_2weeks', 0) > 0]
+        recent.sort(key=lambda g: -g['playtime_2weeks'])
+        count = int(params.get('count', 10))
+        return {'response': {'total_count': len(recent), 'games': recent[:count]}}
+
+    def player_achievements(self, params: dict) -> dict:
+        app_id = int(params.get('appid', 0))
+        steam_id = params.get('steamid') or self.STEAM_ID
+        rng = random.Random(f'{steam_id}:{app_id}')
+        game = next((g for g in self.library(steam_id) if g['appid'] == app_id), None)
+        engagement = 0.4 if game is None else 1 - math.exp(-game['playtime_forever'] / 1200)
+        achievements = []
+        for name, percent in synthetic_library.global_percentages(app_id).items():
+            achieved = rng.random() < engagement * (0.3 + percent / 100)
+            achievements.append({'apiname': name, 'achieved': int(achieved),
+                                 'unlocktime': 1600000000 + rng.randrange(100000000) if achieved else 0})
+        return {'playerstats': {'steamID': steam_id, 'gameName': synthetic_library.app_name(app_id),
+                                'achievements': achievements, 'success': True}}
+
+    def achievement_schema(self, params: dict) -> dict:
+        return synthetic_library.achievement_schema(int(params.get('appid', 0)))
+
+    def achievement_percentages(self, params: dict) -> dict:
+        percentages = synthetic_library.global_percentages(int(params.get('gameid', 0)))
+        return {'achievementpercentages': {'achievements': [
+            {'name': name, 'percent': percent} for name, percent in percentages.items()
+        ]}}
+
+    def app_details(self, params: dict) -> dict:
+        """Store appdetails; app IDs that aren't multiples of ten are unknown, like delisted apps"""
+        details = {}
+        for app_id in str(params.get('appids', '')).split(','):
+            if not app_id.isdigit() or int(app_id) % 10:
+                details[app_id] = {'success': False}
+            else:
+                details[app_id] = {'success': True, 'data': synthetic_library.app_details(int(app_id))}
+        return details
+
+    def rawg_search(self, params: dict) -> dict:
+        name = params.get('search', '')
+        if not name:
+            return {'count': 0, 'results': []}
+        rng = random.Random(name)
+        return {'count': 1, 'results': [{
+            'name': name,
+            'rating': round(rng.uniform(2.5, 4.8), 2),
+            'ratings_count': rng.randrange(10, 5000),
+            'suggestions_count': rng.randrange(0, 500),
+            'tags': [{'name': tag} for tag in rng.sample(['Singleplayer', 'Multiplayer', 'Atmospheric', 'Co-op',
+                                                          'Open World', 'Story Rich'], 2)],
+        }]}
+
+
+def standin_environment(base_url: str) -> dict:
+    """Environment variables that point the proxy's upstream calls at a stand-in"""
+    return {
+        'GAMEPEDIA_STEAM_API_BASE': base_url,
+        'GAMEPEDIA_STEAM_STORE_BASE': f'{base_url}/api',
+        'GAMEPEDIA_RAWG_API_BASE': f'{base_url}/api',
+    }
+
+
+def create_handler(standin: SteamStandIn):
+    """Create a request handler bound to a stand-in"""
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+            time.sleep(standin.delay(parsed.path))
+            status, payload, headers = standin.respond(parsed.path, params)
+            standin.count(parsed.path, status)
+
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return StandInHandler
+
+
+def start_standin(standin: SteamStandIn = None, host: str = '127.0.0.1', port: int = 0):
+    """Start a stand-in server in a background thread, returning (server, base_url)"""
+    standin = standin or SteamStandIn()
+    server = ThreadingHTTPServer((host, port), create_handler(standin))
+    server.daemon_threads = True
+    server.standin = standin
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    """Run the stand-in in the foreground"""
+    parser = argparse.ArgumentParser(description='Local Steam Web API stand-in')
+    parser.add_argument('port', nargs='?', type=int, default=8765)
+    parser.add_argument('--median-ms', type=float, default=30.0, help='median response latency')
+    parser.add_argument('--tail-probability', type=float, default=0.05, help='share of responses in the slow tail')
+    parser.add_argument('--tail-ms', type=float, default=400.0, help='slow-tail latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--rate-limit', type=float, default=None, help='requests per second per API key before 429s')
+    parser.add_argument('--library-size', type=int, default=None, help='synthetic games per Steam ID')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    standin = SteamStandIn(
+        LatencyDistribution(args.median_ms, tail_probability=args.tail_probability, tail_ms=args.tail_ms, seed=args.seed),
+        FaultProfile(args.error_rate, args.throttle_rate, args.rate_limit, seed=args.seed),
+        library_size=args.library_size, seed=args.seed,
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), create_handler(standin))
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"🧪 Steam API stand-in listening on {base_url}")
+    for name, value in standin_environment(base_url).items():
+        print(f"   export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stand-in stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Synthetic Steam library generator
+Seeded, realistic accounts from 10 to 100k games for the demo UI, the Steam stand-in and benchmarks.
+Playtime is power-law distributed with a large never-played share, only a handful of games are
+played in any two-week window, and achievements and store appdetails agree with each other.
+"""
+
+import math
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+ADJECTIVES = ['Crimson', 'Silent', 'Eternal', 'Hollow', 'Iron', 'Neon', 'Forgotten', 'Savage', 'Frozen',
+              'Broken', 'Golden', 'Shattered', 'Distant', 'Wild', 'Hidden', 'Last', 'Burning', 'Quantum']
+NOUNS = ['Frontier', 'Kingdom', 'Protocol', 'Legacy', 'Horizon', 'Dungeon', 'Empire', 'Odyssey', 'Outpost',
+         'Harvest', 'Requiem', 'Circuit', 'Tides', 'Crown', 'Hunters', 'Station', 'Garden', 'Arena']
+SUFFIXES = ['', '', '', '', ' II', ' III', ' Remastered', ': Origins', ' Tactics', ' Online', ' Simulator']
+GENRES = ['Action', 'Adventure', 'RPG', 'Strategy', 'Indie', 'Simulation', 'Casual', 'Racing', 'Sports']
+
+NEVER_PLAYED_SHARE = 0.4        # Roughly the unplayed share of a typical Steam backlog
+PLAYTIME_ALPHA = 1.1            # Pareto tail of minutes played among played games
+PLAYTIME_SCALE = 30             # Minimum minutes for a game that was played at all
+MAX_PLAYTIME = 200000           # ~3,300 hours
+RECENT_MEDIAN = 4               # Games played in the last two weeks, independent of library size
+TWO_WEEKS = 14 * 86400
+
+
+def app_name(app_id: int) -> str:
+    """Deterministic store name for an app, cheap enough to call for every game in a large library"""
+    h = (app_id * 2654435761) & 0xFFFFFFFF
+    return (f"{ADJECTIVES[h % len(ADJECTIVES)]} {NOUNS[(h >> 8) % len(NOUNS)]}"
+            f"{SUFFIXES[(h >> 16) % len(SUFFIXES)]}")
+
+def app_profile(app_id: int) -> Dict:
+    """Store-side facts about an app, shared by every account that owns it"""
+    rng = random.Random(app_id)
+    has_achievements = rng.random() < 0.6
+    price = rng.choice([0, 0, 499, 999, 1499, 1999, 2999, 3999, 5999])
+    return {
+        'name': app_name(app_id),
+        'developer': f"{NOUNS[rng.randrange(len(NOUNS))]} Studio",
+        'publisher': f"{ADJECTIVES[rng.randrange(len(ADJECTIVES))]} Games",
+        'genres': rng.sample(GENRES, rng.randint(1, 3)),
+        'release_date': f"{rng.randint(1, 28)} {rng.choice(['Jan', 'Mar', 'May', 'Aug', 'Oct', 'Nov'])}, {rng.randint(2004, 2024)}",
+        'price': price,
+        'discount': rng.choice([0, 0, 0, 0, 25, 50, 75]) if price else 0,
+        'metacritic': rng.randint(45, 96) if rng.random() < 0.4 else None,
+        'achievement_count': min(500, int(rng.lognormvariate(math.log(30), 0.8))) + 1 if has_achievements else 0,
+        'rarity_seed': rng.getrandbits(32),
+    }
+
+def achievement_names(app_id: int) -> List[str]:
+    """API names of an app's achievements"""
+    return [f"ACH_{app_id}_{i:03d}" for i in range(app_profile(app_id)['achievement_count'])]
+
+def global_percentages(app_id: int) -> Dict[str, float]:
+    """Global unlock percentage per achievement; early achievements are common, late ones rare"""
+    rng = random.Random(app_profile(app_id)['rarity_seed'])
+    names = achievement_names(app_id)
+    return {name: round(max(0.1, 95 * math.exp(-3 * i / max(1, len(names))) * rng.uniform(0.6, 1.0)), 1)
+            for i, name in enumerate(names)}
+
+def app_details(app_id: int) -> Dict:
+    """Store appdetails 'data' record for an app"""
+    profile = app_profile(app_id)
+    data = {
+        'type': 'game',
+        'steam_appid': app_id,
+        'name': profile['name'],
+        'short_description': f"{profile['name']} is a {' / '.join(profile['genres']).lower()} game.",
+        'detailed_description': f"<p>{profile['name']}</p>",
+        'header_image': f"https://example.invalid/apps/{app_id}/header.jpg",
+        'website': None,
+        'developers': [profile['developer']],
+        'publishers': [profile['publisher']],
+        'release_date': {'coming_soon': False, 'date': profile['release_date']},
+        'platforms': {'windows': True, 'mac': app_id % 3 == 0, 'linux': app_id % 7 == 0},
+        'genres': [{'id': str(GENRES.index(g) + 1), 'description': g} for g in profile['genres']],
+        'categories': [{'id': 2, 'description': 'Single-player'}]
+                      + ([{'id': 22, 'description': 'Steam Achievements'}] if profile['achievement_count'] else []),
+        'screenshots': [{'id': i, 'path_full': f"https://example.invalid/apps/{app_id}/ss_{i}.jpg"} for i in range(4)],
+        'movies': [],
+        'achievements': {'total': profile['achievement_count']},
+        'pc_requirements': {'minimum': '<strong>Minimum:</strong> 8 GB RAM'},
+        'supported_languages': 'English',
+    }
+    if profile['metacritic'] is not None:
+        data['metacritic'] = {'score': profile['metacritic']}
+    if profile['price']:
+        # Free games carry no price_overview at all
+        data['price_overview'] = {'currency': 'USD', 'initial': profile['price'],
+                                  'final': profile['price'] * (100 - profile['discount']) // 100,
+                                  'discount_percent': profile['discount']}
+    return data
+
+def achievement_schema(app_id: int) -> Dict:
+    """GetSchemaForGame response for an app"""
+    return {'game': {'gameName': app_name(app_id), 'availableGameStats': {'achievements': [{
+        'name': name,
+        'displayName': f"{ADJECTIVES[i % len(ADJECTIVES)]} {NOUNS[(i // len(ADJECTIVES)) % len(NOUNS)]}",
+        'description': f"Achievement {i + 1} of {app_name(app_id)}",
+        'hidden': int(i % 9 == 8),
+        'icon': f"https://example.invalid/apps/{app_id}/{name}.jpg",
+        'icongray': f"https://example.invalid/apps/{app_id}/{name}_gray.jpg",
+    } for i, name in enumerate(achievement_names(app_id))]}}}
+
+
+class SyntheticLibrary:
+    """One seeded account: owned games with power-law playtime, recent play and per-game achievements"""
+
+    def __init__(self, game_count: int, seed=0, now: int = None,
+                 steam_id: str = '76561198000000000', persona: str = 'Demo Player'):
+        self.seed = seed
+        self.now = int(now if now is not None else time.time())
+        self.steam_id = steam_id
+        self.persona = persona
+        self.games = self.generate(game_count)
+
+    def generate(self, game_count: int) -> List[Dict]:
+        rng = random.Random(f"library:{self.seed}")
+        app_ids = sorted(rng.sample(range(1, max(250000, game_count * 3)), game_count))
+        account_created = self.now - rng.randint(1, 15) * 365 * 86400
+
+        games = []
+        played = []
+        for i, slot in enumerate(app_ids):
+            app_id = slot * 10
+            if rng.random() < NEVER_PLAYED_SHARE:
+                playtime, last_played = 0, 0
+            else:
+                playtime = min(MAX_PLAYTIME, int(PLAYTIME_SCALE * rng.paretovariate(PLAYTIME_ALPHA)))
+                last_played = rng.randint(account_created, self.now - TWO_WEEKS)
+                played.append(i)
+            games.append({
+                'appid': app_id,
+                'name': app_name(app_id),
+                'playtime_forever': playtime,
+                'playtime_2weeks': 0,
+                'img_icon_url': f"{(app_id * 0x9E3779B97F4A7C15) & ((1 << 160) - 1):040x}",
+                'has_community_visible_stats': app_id % 5 != 0,
+                'rtime_last_played': last_played,
+            })
+
+        # A few games in the last two weeks, favouring the ones played most
+        if played:
+            recent_count = min(len(played), max(1, round(rng.lognormvariate(math.log(RECENT_MEDIAN), 0.5))))
+            weights = [math.sqrt(games[i]['playtime_forever']) for i in played]
+            recent = set()
+            while len(recent) < recent_count:
+                recent.update(rng.choices(played, weights, k=recent_count - len(recent)))
+            for i in recent:
+                game = games[i]
+                game['playtime_2weeks'] = max(1, min(game['playtime_forever'], int(rng.lognormvariate(math.log(240), 1.0))))
+                game['rtime_last_played'] = self.now - rng.randint(0, TWO_WEEKS)
+        return games
+
+    def owned_games_response(self, include_appinfo: bool = True) -> Dict:
+        """GetOwnedGames response"""
+        games = self.games
+        if not include_appinfo:
+            games = [{k: v for k, v in g.items() if k not in ('name', 'img_icon_url', 'has_community_visible_stats')}
+                     for g in games]
+        return {'response': {'game_count': len(games), 'games': games}}
+
+    def recent_games(self) -> List[Dict]:
+        """Games played in the last two weeks, most played first"""
+        return sorted((g for g in self.games if g['playtime_2weeks']), key=lambda g: -g['playtime_2weeks'])
+
+    def recent_games_response(self, count: int = 10) -> Dict:
+        """GetRecentlyPlayedGames response"""
+        recent = self.recent_games()
+        return {'response': {'total_count': len(recent), 'games': recent[:count]}}
+
+    def player_summary_response(self) -> Dict:
+        """GetPlayerSummaries response"""
+        return {'response': {'players': [{
+            'steamid': self.steam_id,
+            'personaname': self.persona,
+            'personastate': 1,
+            'avatar': '', 'avatarmedium': '', 'avatarfull': '',
+            'lastlogoff': self.now - 3600,
+            'timecreated': self.now - 5 * 365 * 86400,
+        }]}}
+
+    def game(self, app_id: int) -> Optional[Dict]:
+        """Owned game by app ID"""
+        for game in self.games:
+            if game['appid'] == app_id:
+                return game
+        return None
+
+    def player_achievements(self, app_id: int) -> Dict:
+        """GetPlayerAchievements response; more playtime unlocks more, common achievements first"""
+        game = self.game(app_id)
+        playtime = game['playtime_forever'] if game else 0
+        percentages = global_percentages(app_id)
+        rng = random.Random(f"achievements:{self.seed}:{app_id}")
+        engagement = 1 - math.exp(-playtime / 1200)
+        achievements = []
+        for name, percent in percentages.items():
+            achieved = playtime > 0 and rng.random() < engagement * (0.3 + percent / 100)
+            achievements.append({
+                'apiname': name,
+                'achieved': int(achieved),
+                'unlocktime': rng.randint(self.now - 3 * 365 * 86400, self.now) if achieved else 0,
+            })
+        return {'playerstats': {'steamID': self.steam_id, 'gameName': app_name(app_id),
+                                'achievements': achievements, 'success': True}}
+
+
+def main():
+    """Print a summary of a generated library"""
+    game_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    start = time.perf_counter()
+    library = SyntheticLibrary(game_count, seed)
+    elapsed = time.perf_counter() - start
+
+    playtimes = sorted((g['playtime_forever'] for g in library.games), reverse=True)
+    total = sum(playtimes) or 1
+    top_decile = sum(playtimes[:max(1, len(playtimes) // 10)])
+    print(f"🎲 {game_count} games (seed {seed}) generated in {elapsed * 1000:.0f} ms")
+    print(f"Never played: {sum(1 for p in playtimes if p == 0) / len(playtimes):.0%}")
+    print(f"Top 10% of games hold {top_decile / total:.0%} of {total // 60:,} hours")
+    print(f"Played in the last two weeks: {len(library.recent_games())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1781 @@
+#!/usr/bin/env python3
+"""
+Test script for the secure Steam API proxy server
+Tests the upstream resilience and data processing components without network access
+"""
+
+import sys
+import os
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import json
+import random
+import gzip
+import base64
+import functools
+import socket
+import subprocess
+import requests
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import steam_proxy_server
+from steam_proxy_server import (
+    CircuitBreaker, CircuitOpenError, UpstreamClient, GameDataManager, PriceRefreshJob,
+    RecommendationEngine, SteamLibrary, UserLibraryStore, AchievementSchemaCache,
+    EnhancedSteamAPIProxy, PlayerSummaryBatcher, EnhancedResultCache, EncodedResponse,
+    parse_owned_games_stream, RouteGate, AdmissionController, MetricsRegistry, connect_db,
+    create_server_handler, Trace, TraceRecorder, CURRENT_TRACE, span, ProfilerService, UpstreamCassette,
+    DeferredProxy, migrate_database, ThreadingUnixHTTPServer, ProcessSupervisor, wait_until_ready,
+    SecurityManager, GamePediaHTTPServer
+)
+from steam_standin import start_standin, SteamStandIn, LatencyDistribution, FaultProfile, standin_environment
+
+
+class FakeClock:
+    """Manually advanced clock for breaker tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return self.payload
+
+    def iter_content(self, chunk_size=1):
+        body = json.dumps(self.payload).encode('utf-8')
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Session returning queued responses (or raising queued exceptions)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class SlowFirstSession:
+    """Session whose first call hangs, so a hedge should win"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(0.5)
+            return FakeResponse({'from': 'primary'})
+        return FakeResponse({'from': 'hedge'})
+
+
+class PriceSession:
+    """Session answering batched appdetails price_overview requests"""
+
+    def __init__(self):
+        self.requested = []
+        self.unavailable = set()
+
+    def get(self, url, params=None, timeout=None):
+        app_ids = params['appids'].split(',')
+        self.requested.append(app_ids)
+        payload = {}
+        for app_id in app_ids:
+            if app_id in self.unavailable:
+                payload[app_id] = {'success': False}  # Delisted or region-locked
+            elif app_id == '20':
+                payload[app_id] = {'success': True, 'data': []}  # Free to play
+            else:
+                payload[app_id] = {'success': True, 'data': {'price_overview': {
+                    'currency': 'USD', 'initial': 5999, 'final': 2999, 'discount_percent': 50
+                }}}
+        return FakeResponse(payload)
+
+
+class SummarySession:
+    """Session answering GetPlayerSummaries for every requested steamid"""
+
+    def __init__(self):
+        self.requested = []
+        self.fail = False
+
+    def get(self, url, params=None, timeout=None):
+        if self.fail:
+            raise requests.ConnectionError("Steam unreachable")
+        steam_ids = params['steamids'].split(',')
+        self.requested.append((params['key'], steam_ids))
+        players = [{'steamid': sid, 'personaname': f'Player {sid}'} for sid in steam_ids if sid != 'missing']
+        return FakeResponse({'response': {'players': players}})
+
+
+class SteamRouterSession:
+    """Session answering every Steam endpoint the proxy calls for one small library"""
+
+    GAMES = [
+        {"appid": 10, "name": "Alpha", "playtime_forever": 600, "playtime_2weeks": 30, "img_icon_url": "abc"},
+        {"appid": 20, "name": "Beta", "playtime_forever": 0},
+    ]
+
+    def __init__(self):
+        self.paths = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        path = url.split('://', 1)[1].split('/', 1)[1]
+        self.paths.append(path)
+        if path.endswith('GetPlayerSummaries/v0002/'):
+            return FakeResponse({'response': {'players': [
+                {'steamid': sid, 'personaname': 'Tester', 'personastate': 1} for sid in params['steamids'].split(',')
+            ]}})
+        if path.endswith('GetOwnedGames/v0001/'):
+            return FakeResponse({'response': {'game_count': 2, 'games': self.GAMES}})
+        if path.endswith('GetRecentlyPlayedGames/v0001/'):
+            return FakeResponse({'response': {'total_count': 1, 'games': self.GAMES[:1]}})
+        if path.endswith('GetPlayerAchievements/v0001/'):
+            return FakeResponse({'playerstats': {'achievements': [
+                {'apiname': 'WIN', 'achieved': 1, 'unlocktime': 1700000000}
+            ]}})
+        if path.endswith('GetSchemaForGame/v2/'):
+            return FakeResponse({'game': {'availableGameStats': {'achievements': [
+                {'name': 'WIN', 'displayName': 'Winner'}
+            ]}}})
+        if path.endswith('GetGlobalAchievementPercentagesForApp/v0002/'):
+            return FakeResponse({'achievementpercentages': {'achievements': [{'name': 'WIN', 'percent': 12.5}]}})
+        if path.endswith('appdetails'):
+            app_id = str(params['appids'])
+            return FakeResponse({app_id: {'success': True, 'data': {'steam_appid': int(app_id), 'name': f'Game {app_id}'}}})
+        if 'games' in path:
+            return FakeResponse({'results': []})
+        return FakeResponse({}, 404)
+
+
+class StoreSession:
+    """Session answering appdetails for known apps (slowly) and empty RAWG searches"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        if 'rawg' in url:
+            return FakeResponse({'results': []})
+        app_id = str(params['appids'])
+        with self.lock:
+            self.requested.append(app_id)
+        time.sleep(self.delay)
+        if app_id == '404':
+            return FakeResponse({app_id: {'success': False}})
+        return FakeResponse({app_id: {'success': True, 'data': {
+            'steam_appid': int(app_id), 'name': f'Game {app_id}', 'screenshots': [{'path_full': 'shot.jpg'}],
+        }}})
+
+
+def test_circuit_breaker_states():
+    """Test breaker tripping, fail-fast and half-open probing"""
+    print("Testing CircuitBreaker...")
+
+    clock = FakeClock()
+    breaker = CircuitBreaker('steam.test', minimum_calls=4, open_seconds=30, clock=clock)
+
+    # Healthy calls keep the breaker closed
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    print("✅ Breaker stays closed on healthy calls")
+
+    # Failures trip it once the failure rate crosses the threshold
+    for _ in range(4):
+        breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request(), "Open breaker should fail fast"
+    print("✅ Breaker opens on high failure rate and fails fast")
+
+    # After the cool-down a single probe is allowed
+    clock.now += 31
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request(), "Only one probe should be in flight"
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    print("✅ Successful half-open probe closes the breaker")
+
+    # Slow calls trip it as well
+    slow_breaker = CircuitBreaker('steam.slow', minimum_calls=2, slow_call_seconds=1.0, clock=clock)
+    slow_breaker.record_success(2.5)
+    slow_breaker.record_success(2.5)
+    assert slow_breaker.state == CircuitBreaker.OPEN
+    print("✅ Breaker opens on slow-call rate")
+
+    print("✅ All CircuitBreaker tests passed!")
+
+def test_upstream_client_serves_stale():
+    """Test stale fallback when upstream fails or the breaker is open"""
+    print("\nTesting UpstreamClient stale fallback...")
+
+    client = UpstreamClient()
+    client.breaker_settings.update({'minimum_calls': 2, 'open_seconds': 60})
+    payload = {'response': {'players': [{'personaname': 'Demo Player'}]}}
+    client.session = FakeSession([
+        FakeResponse(payload),
+        requests.ConnectionError("down"),
+        requests.Timeout("slow"),
+    ])
+    params = {'key': 'secret', 'steamids': '76561198000000000'}
+
+    fresh = client.get_json('steam.player_summaries', 'http://steam', params)
+    assert fresh == payload and 'stale' not in fresh
+    print("✅ Fresh response returned and remembered")
+
+    stale = client.get_json('steam.player_summaries', 'http://steam', params)
+    assert stale['stale'] is True and stale['response'] == payload['response']
+    print("✅ Upstream failure served from last known good data")
+
+    client.get_json('steam.player_summaries', 'http://steam', params)
+    assert client.get_breaker('steam.player_summaries').state == CircuitBreaker.OPEN
+    calls_before = client.session.calls
+    stale = client.get_json('steam.player_summaries', 'http://steam', params)
+    assert stale['stale'] is True and client.session.calls == calls_before
+    print("✅ Open breaker serves stale data without calling upstream")
+
+    try:
+        client.get_json('steam.player_summaries', 'http://steam', {'key': 'other', 'steamids': '1'})
+        assert False, "Expected CircuitOpenError without cached data"
+    except CircuitOpenError:
+        print("✅ Open breaker without cached data fails fast")
+
+    # Client errors (bad API key) must not count against the endpoint
+    client = UpstreamClient()
+    client.breaker_settings.update({'minimum_calls': 2})
+    client.session = FakeSession([FakeResponse({}, 403), FakeResponse({}, 403)])
+    for _ in range(2):
+        try:
+            client.get_json('steam.owned_games', 'http://steam', params)
+        except requests.HTTPError:
+            pass
+    assert client.get_breaker('steam.owned_games').state == CircuitBreaker.CLOSED
+    print("✅ 4xx responses do not trip the breaker")
+
+    print("✅ All UpstreamClient tests passed!")
+
+def test_hedged_requests():
+    """Test that a slow call is hedged after the observed p95 and charged to the quota"""
+    print("\nTesting request hedging...")
+
+    client = UpstreamClient()
+    client.hedging_enabled = True
+    client.session = SlowFirstSession()
+    for _ in range(client.hedge_min_samples):
+        client.latency_trackers['steam.owned_games'].record(0.01)
+
+    start = time.monotonic()
+    data = client.get_json('steam.owned_games', 'http://steam', {'steamid': '1'}, hedge=True)
+    elapsed = time.monotonic() - start
+
+    assert data == {'from': 'hedge'}, f"Expected hedge to win, got {data}"
+    assert elapsed < 0.4, f"Hedged call took {elapsed:.2f}s"
+    assert client.hedge_stats['hedged'] == 1 and client.hedge_stats['hedge_wins'] == 1
+    assert client.quota.used == 2, "Hedge must be charged against the quota"
+    print(f"✅ Hedge won in {elapsed * 1000:.0f}ms and was charged to the quota")
+
+    # Without tokens no further hedges are sent
+    client.hedge_tokens = 0
+    client.hedge_max_ratio = 0
+    client.session = SlowFirstSession()
+    data = client.get_json('steam.owned_games', 'http://steam', {'steamid': '2'}, hedge=True)
+    assert data == {'from': 'primary'} and client.hedge_stats['hedged'] == 1
+    print("✅ Hedge rate cap is enforced")
+
+    print("✅ All hedging tests passed!")
+
+def test_price_refresh_job():
+    """Test batched price ingestion into price_history and games"""
+    print("\nTesting PriceRefreshJob...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = UpstreamClient()
+        client.session = PriceSession()
+        manager = GameDataManager(client, db_path=os.path.join(tmp, 'games.db'))
+
+        conn = sqlite3.connect(manager.db_path)
+        conn.executemany("INSERT INTO games (steam_id, name) VALUES (?, ?)",
+                         [(10, 'Alpha'), (20, 'Free Game'), (30, 'Owned Game')])
+        conn.executemany("INSERT INTO user_games (user_id, game_id) VALUES (?, ?)",
+                         [('u1', 30), ('u2', 30), ('u1', 40)])
+        conn.commit()
+        conn.close()
+
+        job = PriceRefreshJob(manager)
+        job.batch_size = 2
+        summary = asyncio.run(job.run_once())
+
+        assert summary == {'candidates': 4, 'upstream_calls': 2, 'priced': 3}, summary
+        assert client.session.requested[0] == ['30', '40'], "Library games should be refreshed first"
+        print(f"✅ 4 games refreshed with {summary['upstream_calls']} upstream calls, library games first")
+
+        conn = sqlite3.connect(manager.db_path)
+        history = conn.execute("SELECT game_id, price, discount_percent FROM price_history ORDER BY game_id").fetchall()
+        assert history == [(10, 29.99, 50), (30, 29.99, 50), (40, 29.99, 50)], history
+        game = conn.execute("SELECT price_current, price_original FROM games WHERE steam_id = 30").fetchone()
+        assert game == (29.99, 59.99), game
+        conn.close()
+        print("✅ price_history rows written and games.price_* updated in place")
+
+        summary = asyncio.run(job.run_once())
+        assert summary['candidates'] == 0, "Fresh prices should not be refetched"
+        print("✅ Incremental run skips recently refreshed games")
+
+        # A batch where every app is delisted must not stall the job or be reselected forever
+        conn = sqlite3.connect(manager.db_path)
+        conn.executemany("INSERT INTO games (steam_id, name) VALUES (?, ?)",
+                         [(50, 'Delisted A'), (60, 'Delisted B'), (70, 'Beta')])
+        conn.commit()
+        client.session.unavailable = {'50', '60'}
+        summary = asyncio.run(job.run_once())
+        assert summary == {'candidates': 3, 'upstream_calls': 2, 'priced': 1}, summary
+        state = conn.execute(
+            "SELECT game_id, last_price FROM price_refresh_state WHERE game_id IN (50, 60)"
+        ).fetchall()
+        conn.close()
+        assert sorted(state) == [(50, None), (60, None)], state
+        assert asyncio.run(job.run_once())['candidates'] == 0
+        print("✅ success:false batches are recorded and the job moves on to later batches")
+
+        # Worker processes each build a job over the shared database; one of them runs it
+        other = PriceRefreshJob(manager)
+        assert job.acquire_lease() and not other.acquire_lease()
+        assert job.acquire_lease(), "The holder renews its own lease"
+        job.lease_seconds = -1
+        assert job.acquire_lease() and other.acquire_lease(), "A lapsed lease passes to another worker"
+        assert not job.acquire_lease()
+        print("✅ Only the lease holder runs the refresh; a lapsed lease is taken over")
+
+    print("✅ All PriceRefreshJob tests passed!")
+
+def test_price_history_rollups():
+    """Test run-length storage, daily rollups and range queries"""
+    print("\nTesting price history rollups...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = GameDataManager(UpstreamClient(), db_path=os.path.join(tmp, 'games.db'))
+
+        # Unchanged prices are not stored again
+        overview = {'initial': 5999, 'final': 5999, 'discount_percent': 0}
+        manager.store_price_overviews({10: overview})
+        manager.store_price_overviews({10: overview})
+        manager.store_price_overviews({10: {'initial': 5999, 'final': 2999, 'discount_percent': 50}})
+        conn = sqlite3.connect(manager.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM price_history WHERE game_id = 10").fetchone()[0]
+        assert count == 2, f"Expected 2 price changes, got {count}"
+        print("✅ Only price changes are stored")
+
+        now = datetime.now()
+        conn.execute("DELETE FROM price_history")
+        conn.executemany(
+            "INSERT INTO price_history (game_id, platform, price, discount_percent, recorded_at) VALUES (?, 'steam', ?, ?, ?)",
+            [
+                (20, 30.0, 0, now - timedelta(days=40)),
+                (20, 20.0, 33, now - timedelta(days=39, hours=2)),
+                (20, 25.0, 17, now - timedelta(days=39, hours=1)),
+                (20, 15.0, 50, now - timedelta(days=5)),
+            ]
+        )
+        conn.commit()
+
+        result = manager.rollup_price_history(raw_retention_days=14)
+        assert result['rolled_up_days'] == 2 and result['raw_deleted'] == 3, result
+        rollups = conn.execute(
+            "SELECT price_min, price_max, price_close FROM price_history_daily WHERE game_id = 20 ORDER BY day"
+        ).fetchall()
+        assert rollups[-1] == (20.0, 25.0, 25.0), rollups
+        raw_left = conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+        assert raw_left == 1
+        conn.close()
+        print("✅ Old raw samples rolled up to daily min/max/close and expired")
+
+        full = manager.get_price_range(20, now - timedelta(days=90))
+        assert (full['min'], full['max']) == (15.0, 30.0), full
+        recent = manager.get_price_range(20, now - timedelta(days=20))
+        assert (recent['min'], recent['max']) == (15.0, 25.0), recent
+        assert manager.get_lowest_price(20, days=30) == 15.0
+        print("✅ Range min/max combine rollups, raw samples and the opening price")
+
+    print("✅ All price history tests passed!")
+
+def test_recommendation_engine():
+    """Test playtime-weighted content recommendations"""
+    print("\nTesting RecommendationEngine...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = GameDataManager(UpstreamClient(), db_path=os.path.join(tmp, 'games.db'))
+        catalog = [
+            (1, 'Owned RPG', 'RPG, Adventure', 'Single-player', 'CD PROJEKT RED', 'Open World'),
+            (2, 'Owned Shooter', 'Action', 'Multi-player', 'Valve', 'FPS'),
+            (3, 'Unowned RPG', 'RPG, Adventure', 'Single-player', 'Larian Studios', 'Open World'),
+            (4, 'Unowned Shooter', 'Action', 'Multi-player', 'Valve', 'FPS'),
+            (5, 'Puzzle Game', 'Casual', 'Single-player', 'Someone', 'Puzzle'),
+        ]
+        for app_id, name, genres, categories, developers, tags in catalog:
+            manager.save_game_data({
+                'steam_id': app_id, 'name': name, 'genres': genres, 'categories': categories,
+                'developers': developers, 'rawg_tags': tags, 'price_current': 19.99,
+            })
+
+        engine = RecommendationEngine(manager.db_path)
+        owned = [
+            {'appid': 1, 'playtime_forever': 6000},
+            {'appid': 2, 'playtime_forever': 30},
+        ]
+        recommendations = engine.recommend(owned, limit=2)
+        names = [r['name'] for r in recommendations]
+
+        assert names[0] == 'Unowned RPG', f"Heavily played genre should rank first, got {names}"
+        assert 'Owned RPG' not in names and 'Owned Shooter' not in names, "Owned games must be excluded"
+        assert 0 < recommendations[0]['score'] <= 100 and recommendations[0]['price'] == 19.99
+        print(f"✅ Recommendations: {names} ({recommendations[0]['reason']})")
+
+        # New catalog entries are picked up incrementally
+        manager.save_game_data({'steam_id': 6, 'name': 'Another RPG', 'genres': 'RPG, Adventure',
+                                'categories': 'Single-player', 'developers': 'CD PROJEKT RED',
+                                'rawg_tags': 'Open World'})
+        engine.refresh(force=True)
+        assert len(engine.item_vectors) == 6
+        names = [r['name'] for r in engine.recommend(owned, limit=2)]
+        assert names[0] == 'Another RPG', names
+        print("✅ Catalog refresh picks up new games incrementally")
+
+        # Rows committed with an older timestamp and in-place price updates are still picked up
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("INSERT INTO games (steam_id, name, genres, updated_at) VALUES (7, 'Late RPG', 'RPG', ?)",
+                     (datetime.now() - timedelta(days=1),))
+        details_stamp = conn.execute("SELECT updated_at FROM games WHERE steam_id = 3").fetchone()
+        conn.commit()
+        manager.store_price_overviews({3: {'initial': 5999, 'final': 999, 'discount_percent': 83}})
+        engine.refresh(force=True)
+        assert 7 in engine.item_vectors, "A row written with an older updated_at must not be skipped"
+        assert engine.item_meta[3][1] == 9.99, engine.item_meta[3]
+        assert conn.execute("SELECT updated_at FROM games WHERE steam_id = 3").fetchone() == details_stamp, \
+            "Price refreshes must not extend the details cache"
+        conn.close()
+        print("✅ Refresh follows the change counter, not updated_at")
+
+    print("✅ All RecommendationEngine tests passed!")
+
+def test_steam_library_columns():
+    """Test columnar library stats and top-k against the list-of-dicts results"""
+    print("\nTesting SteamLibrary...")
+
+    games = [
+        {"appid": 730, "name": "Counter-Strike", "playtime_forever": 1247, "playtime_2weeks": 45},
+        {"appid": 440, "name": "Team Fortress 2", "playtime_forever": 892},
+        {"appid": 570, "name": "Dota 2", "playtime_forever": 2156, "playtime_2weeks": 89},
+        {"appid": 4000, "name": "Garry's Mod", "playtime_forever": 0},
+        {"appid": 292030, "name": "The Witcher 3", "playtime_forever": 892, "playtime_2weeks": 12},
+        {"appid": 431960, "name": "Wallpaper Engine", "playtime_forever": 0},
+    ]
+    library = SteamLibrary.from_games(games)
+    summary = library.summary()
+
+    assert summary['total_games'] == 6
+    assert summary['total_playtime'] == sum(g['playtime_forever'] for g in games)
+    assert library.game(summary['most_played'])['name'] == 'Dota 2'
+    assert summary['never_played'] == 2 and summary['played_recently'] == 3
+    print(f"✅ Summary: {summary}")
+
+    expected = sorted(games, key=lambda x: x.get('playtime_forever', 0), reverse=True)[:4]
+    assert library.top_games(4) == expected, "Top-k must match a stable sort (ties in library order)"
+    assert library.top_games(100) == sorted(games, key=lambda x: x['playtime_forever'], reverse=True)
+    assert SteamLibrary.from_games([]).summary()['total_games'] == 0
+    print("✅ argpartition top-k matches sorted order")
+
+    print("✅ All SteamLibrary tests passed!")
+
+def test_user_library_sync():
+    """Test incremental library diffing and aggregates against a full recompute"""
+    print("\nTesting UserLibraryStore...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = GameDataManager(UpstreamClient(), db_path=os.path.join(tmp, 'games.db'))
+        store = UserLibraryStore(manager.db_path)
+
+        games = [
+            {"appid": 730, "name": "Counter-Strike", "playtime_forever": 1247, "playtime_2weeks": 45},
+            {"appid": 440, "name": "Team Fortress 2", "playtime_forever": 892},
+            {"appid": 570, "name": "Dota 2", "playtime_forever": 2156, "playtime_2weeks": 89},
+            {"appid": 4000, "name": "Garry's Mod", "playtime_forever": 0},
+        ]
+        first = store.sync('player', SteamLibrary.from_games(games))
+        assert sorted(first['new']) == [440, 570, 730, 4000] and not first['changed']
+        assert first['stats'] == UserLibraryStore.full_stats(SteamLibrary.from_games(games))
+        print("✅ First sync stores the whole library")
+
+        games[3] = {**games[3], "playtime_forever": 30, "playtime_2weeks": 30}
+        games[0] = {**games[0], "playtime_forever": 2500}
+        games.pop(2)
+        games.append({"appid": 292030, "name": "The Witcher 3", "playtime_forever": 0})
+        library = SteamLibrary.from_games(games)
+
+        # A fresh store reloads the snapshot from SQLite
+        store = UserLibraryStore(manager.db_path)
+        delta = store.sync('player', library)
+        assert delta['new'] == [292030] and delta['removed'] == [570]
+        assert delta['changed'] == [730, 4000] and delta['newly_played'] == [4000]
+        assert delta['stats'] == UserLibraryStore.full_stats(library), delta['stats']
+        assert delta['stats']['most_played_appid'] == 730
+        print(f"✅ Delta: new={delta['new']} changed={delta['changed']} removed={delta['removed']}")
+
+        conn = sqlite3.connect(manager.db_path)
+        rows = conn.execute("SELECT game_id, playtime_forever FROM user_games WHERE user_id = 'player' ORDER BY game_id").fetchall()
+        stored = conn.execute("SELECT total_games, total_playtime FROM user_library_stats WHERE user_id = 'player'").fetchone()
+        conn.close()
+        assert rows == [(440, 892), (730, 2500), (4000, 30), (292030, 0)], rows
+        assert stored == (4, 3422), stored
+        print("✅ Only changed rows written; aggregates persisted")
+
+        unchanged = store.sync('player', library)
+        assert not (unchanged['new'] or unchanged['changed'] or unchanged['removed'])
+        print("✅ Unchanged library produces an empty delta")
+
+        # Rows written before user_games kept names and icons
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("INSERT INTO games (steam_id, name) VALUES (440, 'Team Fortress 2')")
+        conn.execute("UPDATE user_games SET name = NULL, img_icon_url = NULL WHERE game_id IN (440, 730)")
+        manager.backfill_user_game_names(conn.cursor())
+        conn.commit()
+        names = conn.execute("SELECT game_id, name FROM user_games WHERE game_id IN (440, 730) ORDER BY game_id").fetchall()
+        assert names == [(440, 'Team Fortress 2'), (730, None)], names
+        print("✅ Migration backfills missing names from the games catalog")
+
+        games = [{**game, 'img_icon_url': f"icon{game['appid']}"} for game in games]
+        store = UserLibraryStore(manager.db_path)
+        refetched = store.sync('player', SteamLibrary.from_games(games))
+        assert not (refetched['new'] or refetched['changed'] or refetched['removed'])
+        rows = conn.execute("SELECT game_id, name, img_icon_url FROM user_games WHERE game_id IN (440, 730) ORDER BY game_id").fetchall()
+        conn.close()
+        assert rows == [(440, 'Team Fortress 2', 'icon440'), (730, 'Counter-Strike', 'icon730')], rows
+        print("✅ The next fetch fills in the remaining names and icons without reporting changes")
+
+        # Two workers, each with its own cached snapshot of the same user
+        worker_a, worker_b = UserLibraryStore(manager.db_path), UserLibraryStore(manager.db_path)
+        base = SteamLibrary.from_games(games)
+        worker_a.sync('player', base)
+        worker_b.sync('player', SteamLibrary.from_games(games + [{"appid": 999, "name": "Demo", "playtime_forever": 5}]))
+        delta = worker_a.sync('player', base)
+        assert delta['removed'] == [999], "A's cached snapshot predates B's sync and must not be diffed against"
+        conn = sqlite3.connect(manager.db_path)
+        stored_ids = [row[0] for row in conn.execute("SELECT game_id FROM user_games WHERE user_id = 'player' ORDER BY game_id")]
+        stored_stats = conn.execute("SELECT total_games, total_playtime FROM user_library_stats WHERE user_id = 'player'").fetchone()
+        conn.close()
+        expected = UserLibraryStore.full_stats(base)
+        assert stored_ids == sorted(base.appids.tolist()), stored_ids
+        assert stored_stats == (expected['total_games'], expected['total_playtime']), stored_stats
+        nothing = base.appids[:0]
+        assert not worker_b.write_delta('player', base, nothing, nothing, expected, version=0), \
+            "A delta computed from an outdated snapshot must not be committed"
+        print("✅ Snapshots cached by another worker are revalidated against the stored sync version")
+
+    print("✅ All UserLibraryStore tests passed!")
+
+def test_achievement_schema_cache():
+    """Test shared achievement metadata is fetched once per app and merged per user"""
+    print("\nTesting AchievementSchemaCache...")
+
+    schema = FakeResponse({'game': {'gameName': 'Alpha', 'availableGameStats': {'achievements': [
+        {'name': 'FIRST_KILL', 'displayName': 'First Blood', 'description': 'Win a round',
+         'icon': 'https://cdn/first.jpg', 'icongray': 'https://cdn/first_gray.jpg', 'hidden': 0},
+    ]}}})
+    percentages = FakeResponse({'achievementpercentages': {'achievements': [
+        {'name': 'FIRST_KILL', 'percent': '61.5'},
+    ]}})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = UpstreamClient()
+        client.session = FakeSession([schema, percentages])
+        manager = GameDataManager(client, db_path=os.path.join(tmp, 'games.db'))
+        cache = AchievementSchemaCache(client, manager.db_path)
+
+        first = asyncio.run(cache.get_schema(10, 'key-a'))
+        second = asyncio.run(cache.get_schema(10, 'key-b'))
+        assert first == second and client.session.calls == 2
+        assert first['achievements']['FIRST_KILL']['global_percent'] == 61.5
+        print("✅ Schema and percentages fetched once, reused across users")
+
+        restarted = AchievementSchemaCache(client, manager.db_path)
+        assert asyncio.run(restarted.get_schema(10, 'key-c')) == first and client.session.calls == 2
+        print("✅ Schema served from SQLite after a restart")
+
+        restarted.ttl = timedelta(0)
+        client.session = FakeSession([requests.ConnectionError("down"), requests.ConnectionError("down")])
+        assert asyncio.run(restarted.get_schema(10, 'key-c')) == first
+        print("✅ Expired schema still served when Steam is unreachable")
+
+        stripes = len(restarted.fetch_locks)
+        restarted.fetch_schema = lambda app_id, api_key: {'achievements': {}}
+        for app_id in range(1000, 1500):
+            asyncio.run(restarted.get_schema(app_id, 'key-c'))
+        assert len(restarted.fetch_locks) == stripes
+        print(f"✅ 500 distinct apps fetched through {stripes} striped locks")
+
+    player = {10: {'playerstats': {'achievements': [
+        {'apiname': 'FIRST_KILL', 'achieved': 1, 'unlocktime': 1700000000},
+        {'apiname': 'MASTER', 'achieved': 0, 'unlocktime': 0},
+    ]}}}
+    processed = EnhancedSteamAPIProxy.process_achievements(None, player, {10: first})[10]
+    assert processed['unlocked'] == 1 and processed['total'] == 2
+    assert processed['recent_unlocks'][0]['name'] == 'First Blood'
+    assert processed['recent_unlocks'][0]['unlocktime'] == 1700000000
+    print("✅ Per-user unlocks merged with display names and global percentages")
+
+    print("✅ All AchievementSchemaCache tests passed!")
+
+def test_player_summary_batcher():
+    """Test lookups from many sessions are coalesced into 100-ID calls"""
+    print("\nTesting PlayerSummaryBatcher...")
+
+    client = UpstreamClient()
+    client.session = SummarySession()
+    batcher = PlayerSummaryBatcher(client, max_wait=0.2)
+
+    futures = {('key-a', str(i)): batcher.submit('key-a', str(i)) for i in range(230)}
+    futures[('key-b', '7')] = batcher.submit('key-b', '7')
+    futures[('key-a', 'missing')] = batcher.submit('key-a', 'missing')
+    duplicate = batcher.submit('key-a', '5')
+
+    results = {key: future.result(timeout=5) for key, future in futures.items()}
+    calls = client.session.requested
+    assert len(calls) == 4 and all(len(ids) <= 100 for _, ids in calls), [len(ids) for _, ids in calls]
+    assert ('key-b', ['7']) in calls, "Lookups must never share a call across API keys"
+    assert results[('key-a', '42')] == {'response': {'players': [{'steamid': '42', 'personaname': 'Player 42'}]}}
+    assert results[('key-a', 'missing')] == {'response': {'players': []}}
+    assert duplicate.result(timeout=5) == results[('key-a', '5')]
+    print(f"✅ {batcher.stats['lookups']} lookups served by {len(calls)} upstream calls")
+
+    async def lookup():
+        return await asyncio.wrap_future(batcher.submit('key-a', '42'))
+
+    client.session.fail = True
+    stale = asyncio.run(lookup())
+    assert stale['stale'] and stale['response']['players'][0]['steamid'] == '42'
+    failed = batcher.submit('key-a', 'never-seen').result(timeout=5)
+    assert 'error' in failed
+    print("✅ Failed batch falls back to each player's last good summary")
+
+    # A waiter that gave up must not leave the others sharing its batch hanging
+    client.session.fail = False
+    abandoned = batcher.submit('key-a', '8')
+    sibling = batcher.submit('key-a', '8')
+    other = batcher.submit('key-a', '9')
+    assert abandoned.cancel()
+    assert sibling.result(timeout=5)['response']['players'][0]['steamid'] == '8'
+    assert other.result(timeout=5)['response']['players'][0]['steamid'] == '9'
+    print("✅ Cancelled waiters are skipped and the rest of the batch still resolves")
+
+    client.session.requested.clear()
+    shared = PlayerSummaryBatcher(client, max_wait=0.2, shared_key='server-key')
+    lookups = [shared.submit(f'session-key-{i}', str(100 + i)) for i in range(3)]
+    assert all(future.result(timeout=5)['response']['players'] for future in lookups)
+    assert client.session.requested == [('server-key', ['100', '101', '102'])], client.session.requested
+    print("✅ With a server-side key, lookups from different sessions share one call")
+
+    print("✅ All PlayerSummaryBatcher tests passed!")
+
+def test_enhanced_result_cache():
+    """Test fingerprint memoization of enhanced results and their encoded bodies"""
+    print("\nTesting EnhancedResultCache...")
+
+    def steam_data(playtime=1247, personastate=1):
+        games = [
+            {"appid": 730, "name": "Counter-Strike", "playtime_forever": playtime, "playtime_2weeks": 45},
+            {"appid": 440, "name": "Team Fortress 2", "playtime_forever": 892},
+        ]
+        return {
+            'player': {'response': {'players': [{'steamid': '1', 'personastate': personastate}]}},
+            'recent': {'response': {'games': games[:1]}},
+            'achievements': {},
+            'library': SteamLibrary.from_games(games),
+        }
+
+    fingerprint = EnhancedResultCache.fingerprint
+    assert fingerprint('user', steam_data()) == fingerprint('user', steam_data())
+    assert fingerprint('user', steam_data()) != fingerprint('user', steam_data(playtime=1250))
+    assert fingerprint('user', steam_data()) != fingerprint('user', steam_data(personastate=0))
+    assert fingerprint('user', steam_data()) != fingerprint('other', steam_data())
+    print("✅ Fingerprint changes only when library, persona or user changes")
+
+    clock = FakeClock()
+    cache = EnhancedResultCache(max_entries=2, ttl=60, clock=clock)
+    key = fingerprint('user', steam_data())
+    assert cache.get(key) is None
+    stored = cache.put(key, {'stats': {'total_games': 2}})
+    assert isinstance(stored, EncodedResponse) and cache.get(key) is stored
+    assert stored.encoded() is stored.encoded(), "Body should be encoded once and reused"
+    assert stored.encoded() == b'{\n  "stats": {\n    "total_games": 2\n  }\n}'
+    print("✅ Unchanged polls reuse the memoized result and encoded bytes")
+
+    clock.now += 61
+    assert cache.get(key) is None, "Memoized results expire after the TTL"
+    print(f"✅ Expired entries are recomputed (stats: {cache.stats})")
+
+    print("✅ All EnhancedResultCache tests passed!")
+
+def test_streaming_owned_games():
+    """Test the incremental GetOwnedGames parser against a full json.loads"""
+    print("\nTesting streaming GetOwnedGames parse...")
+
+    games = [
+        {"appid": 730 + i, "name": f"Jeu n°{i} – édition ✨", "playtime_forever": i * 7,
+         "playtime_2weeks": i % 3, "img_icon_url": f"{i:040x}", "rtime_last_played": 1700000000 + i,
+         "has_community_visible_stats": True, "content_descriptorids": [2, 5]}
+        for i in range(500)
+    ]
+    body = json.dumps({"response": {"game_count": len(games), "games": games}}, ensure_ascii=False).encode('utf-8')
+    expected = SteamLibrary.from_games(games)
+
+    for size in (1, 7, 4096, len(body)):
+        chunks = (body[i:i + size] for i in range(0, len(body), size))
+        parsed = parse_owned_games_stream(chunks)
+        library = parsed['response']['games']
+        assert parsed['response']['game_count'] == 500
+        assert (library.appids == expected.appids).all() and library.names == expected.names
+        assert (library.playtime_forever == expected.playtime_forever).all()
+        assert (library.rtime_last_played == expected.rtime_last_played).all()
+    assert library.game(3) == {k: games[3][k] for k in ('appid', 'name', 'playtime_forever', 'playtime_2weeks',
+                                                        'rtime_last_played', 'img_icon_url')}
+    print("✅ Columns match json.loads for every chunk size, including split UTF-8")
+
+    assert parse_owned_games_stream([b'{"response": {}}']) == {'response': {}}
+    try:
+        parse_owned_games_stream([body[:len(body) // 2]])
+        assert False, "Truncated body should fail"
+    except ValueError:
+        pass
+    print("✅ Private profiles and truncated bodies handled")
+
+    server, base_url = start_standin()
+    try:
+        data = UpstreamClient().get_json('steam.owned_games', f"{base_url}/IPlayerService/GetOwnedGames/v0001/",
+                                         {'key': 'k', 'steamid': '1'}, parse=parse_owned_games_stream)
+    finally:
+        server.shutdown()
+    streamed = data['response']['games']
+    assert data['response']['game_count'] == len(streamed) == 5
+    assert SteamLibrary.from_games(streamed) is streamed and list(streamed)[0]['appid'] == 730
+    print("✅ UpstreamClient streams the response body into a SteamLibrary")
+
+    print("✅ All streaming parse tests passed!")
+
+def test_library_pagination():
+    """Test keyset pagination, sorting, filtering and query validation for the library endpoint"""
+    print("\nTesting library pagination...")
+
+    rng = random.Random(3)
+    games = [
+        {"appid": 10 * (i + 1), "name": rng.choice(["Alpha", "beta", "Gamma", "delta"]) + f" {i % 7}",
+         "playtime_forever": rng.choice([0, 0, 15, 60, 600, 1200]), "playtime_2weeks": rng.choice([0, 30]),
+         "rtime_last_played": rng.choice([0, 1700000000, 1710000000])}
+        for i in range(300)
+    ]
+    library = SteamLibrary.from_games(games)
+    parse = EnhancedSteamAPIProxy.parse_library_query
+
+    expectations = {
+        ('playtime', 'desc'): lambda g: (-g['playtime_forever'], -g['appid']),
+        ('playtime', 'asc'): lambda g: (g['playtime_forever'], g['appid']),
+        ('name', 'asc'): lambda g: (g['name'].casefold(), g['appid']),
+        ('last_played', 'desc'): lambda g: (-g['rtime_last_played'], -g['appid']),
+    }
+    for (sort, order), key in expectations.items():
+        rows = library.filter_rows({})
+        seen, after = [], None
+        while True:
+            page, after = library.page(rows, sort, order == 'desc', after, 32)
+            seen.extend(int(library.appids[row]) for row in page)
+            if after is None:
+                break
+        assert seen == [g['appid'] for g in sorted(games, key=key)], (sort, order)
+    print("✅ Pages concatenate to the fully sorted library for every sort order")
+
+    played = library.filter_rows({'played': True, 'min_playtime': 60, 'q': 'ALPHA'})
+    assert [int(library.appids[r]) for r in played] == [
+        g['appid'] for g in games if g['playtime_forever'] >= 60 and 'alpha' in g['name'].lower()
+    ]
+    print("✅ Filters combine (played, min_playtime, name search)")
+
+    query = parse({'sort': 'name', 'fields': 'appid,name', 'limit': '2', 'filter': {'played_recently': 1}})
+    assert query['order'] == 'asc' and query['fields'] == ['appid', 'name'] and query['limit'] == 2
+    def cursor(sort, order, after):
+        return base64.urlsafe_b64encode(json.dumps({'sort': sort, 'order': order, 'after': after}).encode()).decode()
+
+    assert parse({'cursor': cursor('playtime', 'desc', [60, 10])})['after'] == (60, 10)
+    for bad in ({'sort': 'price'}, {'fields': 'appid,secret'}, {'limit': 0}, {'cursor': 'not-a-cursor'},
+                {'limit': 'ten'}, {'limit': None}, {'filter': {'min_playtime': [60]}}, {'filter': 'played'},
+                {'sort': ['name']}, {'order': {'asc': 1}}, {'fields': [['appid']]}, {'fields': {'appid': 1}},
+                {'cursor': cursor('playtime', 'desc', ['sixty', 10])},
+                {'sort': 'name', 'cursor': cursor('name', 'asc', [[1], 10])}):
+        try:
+            parse(bad)
+            assert False, f"{bad} should be rejected"
+        except ValueError:
+            pass
+    print("✅ Invalid sort, fields, limit, filters and cursor are rejected")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            proxy = EnhancedSteamAPIProxy()
+            proxy.upstream.session = SteamRouterSession()
+            server = ThreadingHTTPServer(('127.0.0.1', 0), create_server_handler(proxy))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_address[1]}/api/steam/library"
+            try:
+                token = asyncio.run(proxy.authenticate_user('A' * 32, '76561198000000001', '127.0.0.1', 'ua'))['session_token']
+                malformed = requests.post(url, json={'session_token': token, 'limit': 'ten'}, timeout=5)
+                bogus = requests.post(url, json={'session_token': 'bogus'}, timeout=5)
+                proxy.security_manager.rate_limits['api_calls'] = {'max': 0, 'window': 60}
+                limited = requests.post(url, json={'session_token': token}, timeout=5)
+            finally:
+                server.shutdown()
+                server.server_close()
+        finally:
+            os.chdir(cwd)
+    assert malformed.status_code == 400 and 'integer' in malformed.json()['error'], malformed.text
+    assert bogus.status_code == 401 and limited.status_code == 429, (bogus.status_code, limited.status_code)
+    assert 'status' not in limited.json()
+    print("✅ Malformed parameters are 400s; only session failures are 401s")
+
+    print("✅ All library pagination tests passed!")
+
+def test_bulk_game_details():
+    """Test bulk details answer from cache first and fetch misses concurrently under budget"""
+    print("\nTesting bulk game details...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = UpstreamClient()
+        client.session = StoreSession(delay=0.1)
+        manager = GameDataManager(client, db_path=os.path.join(tmp, 'games.db'))
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("INSERT INTO games (steam_id, name, screenshots, updated_at) VALUES (10, 'Cached', '[]', ?)",
+                     (datetime.now(),))
+        conn.commit()
+        conn.close()
+
+        start = time.monotonic()
+        results = list(manager.iter_game_details([20, 10, 30, 404, 40]))
+        elapsed = time.monotonic() - start
+
+        assert results[0][:1] + results[0][2:] == (10, 'cached'), "Cached hits come first"
+        statuses = {app_id: status for app_id, _, status in results}
+        assert statuses == {10: 'cached', 20: 'fetched', 30: 'fetched', 40: 'fetched', 404: 'missing'}, statuses
+        assert elapsed < 0.3, f"Misses should be fetched concurrently ({elapsed:.2f}s)"
+        game = manager.public_game_details(next(d for a, d, _ in results if a == 20))
+        assert game['screenshots'] == ['shot.jpg'] and game['name'] == 'Game 20'
+        print(f"✅ 1 cached hit, 4 misses fetched concurrently in {elapsed * 1000:.0f} ms")
+
+        client.session.requested.clear()
+        manager.bulk_max_misses = 1
+        results = list(manager.iter_game_details([20, 50, 60]))
+        assert [status for _, _, status in results] == ['cached', 'deferred', 'fetched']
+        assert client.session.requested == ['50']
+        print("✅ Fetched misses are cached; misses over the budget are deferred")
+
+    print("✅ All bulk game details tests passed!")
+
+def test_streamed_user_data():
+    """Test user data sections stream in order and match the one-shot response"""
+    print("\nTesting streamed user data...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            proxy = EnhancedSteamAPIProxy()
+            proxy.upstream.session = SteamRouterSession()
+            identity = ('127.0.0.1', 'test-agent')
+
+            auth = asyncio.run(proxy.authenticate_user('A' * 32, '76561198000000001', *identity))
+            assert auth.get('success'), auth
+            token = auth['session_token']
+
+            async def collect():
+                return [item async for item in proxy.stream_user_data(token, *identity)]
+
+            sections = asyncio.run(collect())
+            names = [name for name, _ in sections]
+            assert names == ['player', 'stats', 'topGames', 'recentGames', 'achievements', 'recommendations', 'done'], names
+            streamed = dict(sections)
+            assert streamed['player']['personaname'] == 'Tester'
+            assert streamed['stats']['total_games'] == 2 and streamed['stats']['most_played'] == 'Alpha'
+            assert streamed['achievements'][10]['recent_unlocks'][0]['name'] == 'Winner'
+            print(f"✅ Sections streamed in order: {', '.join(names)}")
+
+            full = asyncio.run(proxy.get_comprehensive_user_data(token, *identity))
+            for name in ('player', 'stats', 'topGames', 'recentGames', 'achievements'):
+                assert full[name] == streamed[name], name
+            print("✅ Streamed sections match the one-shot user-data response")
+
+            async def first_section(session_token):
+                return await proxy.stream_user_data(session_token, *identity).__anext__()
+
+            assert asyncio.run(first_section('bogus'))[0] == 'error'
+            print("✅ Invalid sessions produce a single error section")
+
+            async def failing_stream(session_token, ip_address, user_agent):
+                yield 'player', {'personaname': 'Tester'}
+                raise RuntimeError("enrichment blew up")
+
+            proxy.stream_user_data = failing_stream
+            server = ThreadingHTTPServer(('127.0.0.1', 0), create_server_handler(proxy))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_address[1]}/api/steam/user-data/stream"
+            try:
+                ndjson = requests.post(url, json={'session_token': token}, timeout=5)
+                sse = requests.post(url, json={'session_token': token}, timeout=5,
+                                    headers={'Accept': 'text/event-stream'})
+            finally:
+                server.shutdown()
+                server.server_close()
+            lines = [json.loads(line) for line in ndjson.text.splitlines()]
+            assert ndjson.status_code == 200 and [line['section'] for line in lines] == ['player', 'error'], lines
+            assert 'enrichment blew up' in lines[-1]['data']['error']
+            assert sse.text.endswith('\n\n') and 'event: error\ndata: ' in sse.text and 'HTTP/' not in sse.text
+            print("✅ Failures after the headers end the stream with an error record")
+        finally:
+            os.chdir(cwd)
+
+    print("✅ All streamed user data tests passed!")
+
+def test_admission_control():
+    """Test route gates admit, queue, shed when full and shed on queue deadline"""
+    print("\nTesting admission control...")
+
+    gate = RouteGate('/api/steam/user-data', max_in_flight=1, max_queue=1, queue_timeout=0.5)
+    assert gate.acquire(), "First request is admitted immediately"
+
+    queued = {}
+    waiter = threading.Thread(target=lambda: queued.setdefault('admitted', gate.acquire()))
+    waiter.start()
+    while gate.waiting == 0:
+        time.sleep(0.001)
+    assert not gate.acquire(), "A full queue sheds immediately"
+    assert gate.retry_after() >= 1
+
+    gate.release(0.1)
+    waiter.join()
+    assert queued['admitted'] and gate.in_flight == 1
+    print("✅ Queued request admitted when a slot frees; overflow shed at once")
+
+    gate.queue_timeout = 0.05
+    start = time.monotonic()
+    assert not gate.acquire(), "Queued requests give up at the deadline"
+    assert time.monotonic() - start < 0.5
+    gate.release(0.1)
+    assert gate.stats == {'admitted': 2, 'queued': 2, 'rejected_full': 1, 'rejected_timeout': 1}, gate.stats
+    print(f"✅ Queue deadline enforced: {gate.stats}")
+
+    admission = AdmissionController()
+    assert admission.gate_for('/index.html') is None, "Static assets are never gated"
+    assert admission.gate_for('/api/steam/user-data').max_in_flight < admission.gate_for('/api/steam/library').max_in_flight
+    print("✅ Static paths bypass admission; user-data has the tightest cap")
+
+    print("✅ All admission control tests passed!")
+
+def test_metrics_registry():
+    """Test per-thread shards merge into Prometheus text and /metrics serves it"""
+    print("\nTesting metrics registry...")
+
+    registry = MetricsRegistry()
+    registry.describe('test_requests_total', 'counter', 'Requests', ('route',))
+    registry.describe('test_latency_seconds', 'histogram', 'Latency', ('route',), buckets=(0.1, 1.0))
+    registry.describe('test_depth', 'gauge', 'Queue depth')
+    registry.register_collector('depth', lambda: [('test_depth', (), 3)])
+
+    def work():
+        for _ in range(100):
+            registry.inc('test_requests_total', ('/a',))
+        registry.observe('test_latency_seconds', ('/a',), 0.05)
+        registry.observe('test_latency_seconds', ('/a',), 5.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    work()
+
+    text = registry.render()
+    assert 'test_requests_total{route="/a"} 500' in text, text
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 5' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 10' in text
+    assert 'test_latency_seconds_count{route="/a"} 10' in text
+    assert '# TYPE test_depth gauge' in text and 'test_depth 3' in text
+    assert len(registry.shards) == 1, "Shards of finished threads are folded together"
+    print("✅ Counts from five threads merge; finished threads' shards are retired")
+
+    registry.describe('test_bytes_total', 'counter', 'Bytes sent')
+    registry.describe('test_ratio', 'gauge', 'Fractional gauge')
+    registry.inc('test_bytes_total', (), 1234567891)
+    registry.register_collector('ratio', lambda: [('test_ratio', (), 1234567.125)])
+    text = registry.render()
+    assert 'test_bytes_total 1234567891\n' in text, "Large counters must not be rounded to 6 digits"
+    assert 'test_ratio 1234567.125\n' in text
+    assert registry.format_value(float('inf')) == '+Inf' and registry.format_value(float('nan')) == 'NaN'
+    print("✅ Values above 1e6 render exactly")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_db(os.path.join(tmp, 'metrics.db'))
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+        conn.close()
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            proxy = EnhancedSteamAPIProxy()
+            proxy.upstream.session = SteamRouterSession()
+            server = ThreadingHTTPServer(('127.0.0.1', 0), create_server_handler(proxy))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            try:
+                requests.get(f"{base}/metrics", timeout=5)
+                requests.post(f"{base}/api/steam/validate", json={}, timeout=5)
+                response = requests.get(f"{base}/metrics", timeout=5)
+            finally:
+                server.shutdown()
+                server.server_close()
+        finally:
+            os.chdir(cwd)
+
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.text
+    assert 'gamepedia_http_requests_total{route="/metrics",method="GET",status="200"}' in text
+    assert 'gamepedia_http_request_duration_seconds_count{route="/api/steam/validate"}' in text
+    assert 'gamepedia_sqlite_query_duration_seconds_count{database="metrics.db",statement="INSERT"} 1' in text
+    assert 'gamepedia_admission_total{route="/api/steam/validate",outcome="admitted"}' in text
+    assert 'gamepedia_upstream_quota_remaining ' in text
+    print("✅ /metrics reports routes, SQLite statements, admission and quota")
+
+    print("✅ All metrics tests passed!")
+
+def test_request_tracing():
+    """Test spans nest per task, feed Server-Timing and are sampled to JSONL"""
+    print("\nTesting request tracing...")
+
+    with span('outside'):
+        pass  # No active trace: nothing to record
+
+    trace = Trace('/api/test')
+    token = CURRENT_TRACE.set(trace)
+    try:
+        async def step(name):
+            with span(name):
+                await asyncio.sleep(0.01)
+
+        async def fan_out():
+            with span('steam'):
+                await asyncio.gather(step('steam.player'), step('steam.owned_games'))
+
+        asyncio.run(fan_out())
+        with span('encode'):
+            pass
+        with span('encode'):
+            pass
+    finally:
+        CURRENT_TRACE.reset(token)
+
+    names = [name for name, _, _, _ in trace.spans]
+    assert sorted(names) == ['encode', 'encode', 'steam', 'steam.owned_games', 'steam.player'], names
+    timing = trace.server_timing()
+    assert timing.count('encode;dur=') == 1 and timing.startswith('steam.') and 'total;dur=' in timing, timing
+    lanes = {event['name']: event['tid'] for event in trace.chrome_events()}
+    assert lanes['steam.player'] != lanes['steam.owned_games'], "Concurrent tasks get separate lanes"
+    print(f"✅ Server-Timing: {timing}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'traces.jsonl')
+        assert not TraceRecorder(path, 0.0).maybe_record(trace) and not os.path.exists(path)
+        assert TraceRecorder(path, 1.0).maybe_record(trace, 200)
+        with open(path) as f:
+            recorded = json.loads(f.readline())
+        assert recorded['metadata']['route'] == '/api/test' and recorded['metadata']['status'] == 200
+        assert all(event['ph'] == 'X' for event in recorded['traceEvents'])
+        print("✅ Sampled traces are written as Chrome trace events")
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            proxy = EnhancedSteamAPIProxy()
+            proxy.upstream.session = SteamRouterSession()
+            proxy.trace_recorder.sample_rate = 1.0
+            server = ThreadingHTTPServer(('127.0.0.1', 0), create_server_handler(proxy))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            try:
+                auth = requests.post(f"{base}/api/steam/authenticate",
+                                     json={'api_key': 'A' * 32, 'steam_id': '76561198000000001'}, timeout=5).json()
+                response = requests.post(f"{base}/api/steam/user-data",
+                                         json={'session_token': auth['session_token']}, timeout=5)
+            finally:
+                server.shutdown()
+                server.server_close()
+            with open(proxy.trace_recorder.path) as f:
+                traces = [json.loads(line) for line in f]
+        finally:
+            os.chdir(cwd)
+
+    timing = response.headers['Server-Timing']
+    for name in ('admission', 'session', 'rate_limit', 'decrypt', 'steam', 'enrich', 'encode', 'total'):
+        assert f"{name};dur=" in timing, (name, timing)
+    assert [t['metadata']['route'] for t in traces] == ['/api/steam/authenticate', '/api/steam/user-data']
+    print("✅ User-data responses break down session, Steam fan-out, enrichment and encoding")
+
+    print("✅ All request tracing tests passed!")
+
+def test_profiler_service():
+    """Test sampled stacks, per-request cProfile sessions, allocation diffs and the localhost guard"""
+    print("\nTesting profiler service...")
+
+    def busy_loop(stop):
+        while not stop.is_set():
+            sum(i * i for i in range(1000))
+
+    profiler = ProfilerService()
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name='Worker-7')
+    worker.start()
+    try:
+        sampled = profiler.run_sampler(0.2, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+    busy = [line for line in sampled['output'].splitlines() if 'busy_loop' in line]
+    assert busy and busy[0].startswith('Worker;'), sampled['output'][:500]
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in sampled['output'].splitlines())
+    print(f"✅ Sampler collected {sampled['samples']} samples as collapsed stacks")
+
+    def render_page():
+        return sorted(random.random() for _ in range(5000))
+
+    def fake_request():
+        with profiler.profile_request():
+            render_page()
+
+    session = {}
+    runner = threading.Thread(target=lambda: session.update(profiler.run_cprofile(0.3, limit=10)))
+    runner.start()
+    while not profiler.cprofile_active:
+        time.sleep(0.001)
+    requests_threads = [threading.Thread(target=fake_request) for _ in range(3)]
+    for thread in requests_threads:
+        thread.start()
+    for thread in requests_threads:
+        thread.join()
+    assert 'error' in profiler.run_sampler(0.01), "Only one session at a time"
+    runner.join()
+    assert session['requests'] == 3 and 'render_page' in session['output'], session
+    fake_request()
+    assert not profiler.collected, "Requests outside a session are not profiled"
+    print("✅ cProfile session merges the requests handled during its window")
+
+    # Overlapping requests must all be served, even where only one profiler may be active (3.12+)
+    both_inside = threading.Barrier(2)
+
+    def overlapping_request(served):
+        with profiler.profile_request():
+            both_inside.wait(timeout=5)
+            render_page()
+        served.append(True)
+
+    def run_overlapping(expect_profiles: bool):
+        served = []
+        session.clear()
+        runner = threading.Thread(target=lambda: session.update(profiler.run_cprofile(0.3, limit=60)))
+        runner.start()
+        while not profiler.cprofile_active:
+            time.sleep(0.001)
+        threads = [threading.Thread(target=overlapping_request, args=(served,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        runner.join()
+        assert served == [True, True] and session['requests'] == 2, session
+        assert ('render_page' in session['output']) == expect_profiles, session
+
+    run_overlapping(True)
+
+    class BusyProfile:
+        """cProfile.Profile as it behaves when another tool already holds the profiling hook"""
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+        def disable(self):
+            pass
+
+    saved_profile = steam_proxy_server.cProfile.Profile
+    steam_proxy_server.cProfile.Profile = BusyProfile
+    try:
+        if ProfilerService.PROCESS_WIDE_PROFILER:
+            assert 'error' in profiler.run_cprofile(0.01)
+        else:
+            run_overlapping(False)
+    finally:
+        steam_proxy_server.cProfile.Profile = saved_profile
+    print("✅ Overlapping requests are all served, and a busy profiling hook skips rather than fails")
+
+    baseline = profiler.take_memory_baseline()
+    assert baseline['tracing']
+    cache = EnhancedResultCache(max_entries=1000)
+    for i in range(500):
+        cache.put(str(i), {'games': list(range(50))})
+    diff = profiler.memory_diff(limit=5)
+    profiler.stop_memory_tracing()
+    assert diff['growth_bytes'] > 0 and diff['sites'][0]['scope'] == 'EnhancedResultCache.put', diff
+    assert 'error' in profiler.memory_diff(), "Diffs need a baseline"
+    print(f"✅ Allocation growth attributed to {diff['sites'][0]['scope']} ({diff['sites'][0]['size_diff']} bytes)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            proxy = EnhancedSteamAPIProxy()
+            server = ThreadingHTTPServer(('127.0.0.1', 0), create_server_handler(proxy))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            try:
+                relayed = requests.post(f"{base}/admin/profile", json={'seconds': 0.1},
+                                        headers={'X-Forwarded-For': '203.0.113.9'}, timeout=5)
+                local = requests.post(f"{base}/admin/profile", json={'mode': 'sampling', 'seconds': 0.1}, timeout=5)
+                bad = requests.post(f"{base}/admin/profile", json={'seconds': 600}, timeout=5)
+                memory = requests.post(f"{base}/admin/memory", json={'action': 'diff'}, timeout=5)
+            finally:
+                server.shutdown()
+                server.server_close()
+        finally:
+            os.chdir(cwd)
+
+    assert relayed.status_code == 403 and local.status_code == 200 and bad.status_code == 400
+    assert local.headers['Content-Type'].startswith('text/plain') and memory.status_code == 400
+    print("✅ Admin endpoints refuse relayed clients and validate their parameters")
+
+    print("✅ All profiler service tests passed!")
+
+def test_standin_end_to_end():
+    """Test the proxy runs end-to-end against the stand-in via the upstream base URL variables"""
+    print("\nTesting proxy against the Steam stand-in...")
+
+    clock = FakeClock()
+    faults = FaultProfile(rate_limit=2, clock=clock)
+    assert [faults.check('k') for _ in range(2)] == [None, None]
+    status, _, headers = faults.check('k')
+    assert status == 429 and headers['Retry-After'] == '1' and faults.check('other') is None
+    clock.now += 0.5
+    assert faults.check('k') is None, "Tokens refill at the configured rate"
+    assert FaultProfile(error_rate=1.0).check('k')[0] == 500
+    print("✅ Rate limit, 429 and error injection")
+
+    standin = SteamStandIn(LatencyDistribution(median_ms=1, tail_probability=0), library_size=300)
+    server, base_url = start_standin(standin)
+    saved = {name: os.environ.get(name) for name in standin_environment(base_url)}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            os.environ.update(standin_environment(base_url))
+            proxy = EnhancedSteamAPIProxy()
+            identity = ('127.0.0.1', 'test-agent')
+            auth = asyncio.run(proxy.authenticate_user('A' * 32, '76561198000000042', *identity))
+            data = asyncio.run(proxy.get_comprehensive_user_data(auth['session_token'], *identity))
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    assert 'error' not in data, data
+    assert data['stats']['total_games'] == 300 and len(data['topGames']) == 10
+    assert all(game['header_image'] and game['genres'] for game in data['topGames'])
+    unlocks = [unlock for app in data['achievements'].values() for unlock in app['recent_unlocks']]
+    assert unlocks and all('global_percent' in unlock for unlock in unlocks)
+    for path in ('/IPlayerService/GetOwnedGames/v0001/', '/ISteamUserStats/GetSchemaForGame/v2/',
+                 '/api/appdetails', '/api/games'):
+        assert standin.request_counts.get(path), path
+    print(f"✅ 300-game synthetic library served end-to-end ({sum(standin.request_counts.values())} upstream calls)")
+
+    print("✅ All stand-in tests passed!")
+
+def test_upstream_cassette():
+    """Test recording strips credentials and replay serves the same payloads at scaled latency"""
+    print("\nTesting upstream cassettes...")
+
+    standin = SteamStandIn(LatencyDistribution(median_ms=40, sigma=0.01, tail_probability=0))
+    server, base_url = start_standin(standin)
+    owned_url = f"{base_url}/IPlayerService/GetOwnedGames/v0001/"
+    details_url = f"{base_url}/api/appdetails"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'upstream.cassette.gz')
+        try:
+            recorder = UpstreamClient()
+            cassette = recorder.use_cassette('record', path)
+            cassette.record_meta(steam_id='1')
+            live_games = recorder.get_json('steam.owned_games', owned_url, {'key': 'SECRET-KEY', 'steamid': '1'},
+                                           parse=parse_owned_games_stream)
+            live_details = recorder.get_json('steam.store_appdetails', details_url, {'appids': 730})
+            cassette.close()
+        finally:
+            server.shutdown()
+
+        with gzip.open(path, 'rt') as f:
+            recorded = f.read()
+        assert 'SECRET-KEY' not in recorded and 'steamid' in recorded
+        print(f"✅ Recorded {cassette.stats['recorded']} exchanges without credentials ({os.path.getsize(path)} bytes)")
+
+        player = UpstreamClient()
+        replayed = player.use_cassette('replay', path, time_scale=0.5)
+        start = time.monotonic()
+        games = player.get_json('steam.owned_games', owned_url.replace(base_url, 'https://api.steampowered.com'),
+                                {'key': 'another-key', 'steamid': '1'}, parse=parse_owned_games_stream)
+        elapsed = time.monotonic() - start
+        assert list(games['response']['games']) == list(live_games['response']['games'])
+        assert 0.015 < elapsed < 0.1, f"Replay should take about half the recorded ~40 ms ({elapsed * 1000:.0f} ms)"
+        assert player.get_json('steam.store_appdetails', details_url, {'appids': 730}) == live_details
+        assert replayed.meta == {'steam_id': '1'}
+        print(f"✅ Replay matches the live payloads in {elapsed * 1000:.0f} ms at half speed, on any host or key")
+
+        try:
+            player.get_json('steam.store_appdetails', details_url, {'appids': 440}, serve_stale=False)
+            assert False, "Unrecorded calls must fail like an unreachable upstream"
+        except requests.ConnectionError:
+            pass
+        assert replayed.stats == {'recorded': 0, 'replayed': 2, 'misses': 1}
+        print("✅ Unrecorded calls fail without touching the network")
+
+        replayed.time_scale = 1.0
+        try:
+            player.session.get(details_url, params={'appids': 730}, timeout=0.005)
+            assert False, "A recorded call slower than the timeout must time out on replay"
+        except requests.Timeout:
+            pass
+        print("✅ Replayed latency longer than the caller's timeout raises requests.Timeout")
+
+        rerecorded = UpstreamCassette(path)
+        rerecorded.record(details_url, {'appids': 570}, 200, b'{}', 0.01)
+        rerecorded.record(details_url, {'appids': 570}, 200, b'{}', 0.01)
+        rerecorded.close()
+        reloaded = UpstreamCassette(path).load()
+        assert list(reloaded.entries) == [UpstreamCassette.match_key(details_url, {'appids': 570})]
+        assert len(reloaded.entries[list(reloaded.entries)[0]]) == 2 and not reloaded.meta
+        print("✅ A new recording replaces the old cassette instead of appending to it")
+
+    assert UpstreamCassette.match_key('https://a/x', {'key': 'k', 'appid': 5}) == UpstreamCassette.match_key('http://b/x', {'appid': '5'})
+    print("✅ All upstream cassette tests passed!")
+
+def test_deferred_startup():
+    """Test heavy modules load lazily, migrations run once per schema version and the port serves before init"""
+    print("\nTesting deferred startup...")
+
+    loaded = subprocess.run([sys.executable, '-c', 'import sys, steam_proxy_server; '
+                             'print([m for m in ("numpy", "requests", "cryptography") if m in sys.modules])'],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == '[]', loaded.stdout
+    print("✅ Importing the server loads no heavy modules")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'migrations.db')
+        applied = []
+        first = lambda cursor: (applied.append(1), cursor.execute('CREATE TABLE items (id INTEGER)'))
+        second = lambda cursor: (applied.append(2), cursor.execute('ALTER TABLE items ADD COLUMN name TEXT'))
+        assert migrate_database(db_path, [first]) == 1
+        assert migrate_database(db_path, [first]) == 0
+        assert migrate_database(db_path, [first, second]) == 1 and applied == [1, 2]
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+        conn.close()
+
+        failing = lambda cursor: (cursor.execute('CREATE TABLE partial (id INTEGER)'), 1 / 0)
+        try:
+            migrate_database(db_path, [first, second, failing])
+            assert False, "A failing migration must raise"
+        except ZeroDivisionError:
+            pass
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+        assert not conn.execute("SELECT name FROM sqlite_master WHERE name = 'partial'").fetchall()
+        conn.close()
+        print("✅ Migrations apply once per version and roll back together on failure")
+
+        # A database from before schema versioning: tables exist but user_version is 0
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('CREATE TABLE games (id INTEGER PRIMARY KEY AUTOINCREMENT, steam_id INTEGER UNIQUE, '
+                     'name TEXT NOT NULL, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+        conn.execute("INSERT INTO games (steam_id, name) VALUES (730, 'Counter-Strike 2')")
+        conn.commit()
+        conn.close()
+        GameDataManager(db_path=legacy_path)
+        conn = sqlite3.connect(legacy_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 5
+        assert 'rawg_tags' in {row[1] for row in conn.execute('PRAGMA table_info(games)')}
+        assert conn.execute('SELECT name, change_seq FROM games').fetchall() == [('Counter-Strike 2', 1)]
+        conn.close()
+        print("✅ Unversioned databases upgrade in place")
+
+        with open(os.path.join(tmp, 'index.html'), 'w') as f:
+            f.write('<h1>GamePedia</h1>')
+        release = threading.Event()
+
+        class SlowProxy:
+            profiler = ProfilerService()
+
+            def __init__(self):
+                release.wait(5)
+
+        deferred = DeferredProxy(SlowProxy)
+        handler = functools.partial(create_server_handler(deferred), directory=tmp)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        deferred.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            start = time.monotonic()
+            page = requests.get(f"{base}/index.html", timeout=5)
+            assert page.status_code == 200 and 'GamePedia' in page.text
+            assert time.monotonic() - start < 2 and deferred.get(0) is None
+            print("✅ Static files are served while the proxy is still initializing")
+
+            # The connection closes once the handler returns, including its trace bookkeeping
+            start = time.monotonic()
+            with socket.create_connection(server.server_address, timeout=5) as client:
+                client.sendall(b"POST /api/no-such-route HTTP/1.0\r\nContent-Length: 2\r\n\r\n{}")
+                reply = b''
+                while chunk := client.recv(4096):
+                    reply += chunk
+            assert b' 404 ' in reply.split(b'\r\n', 1)[0] and time.monotonic() - start < 2, reply[:100]
+            assert deferred.get(0) is None
+            print("✅ POSTs that never need the proxy don't wait for it to record their trace")
+
+            threading.Timer(0.2, release.set).start()
+            assert isinstance(deferred.get(5), SlowProxy) and deferred.error is None
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+    print("✅ All deferred startup tests passed!")
+
+def test_health_and_supervision():
+    """Test health endpoints track startup and DB state, unix sockets serve, and crashed workers restart"""
+    print("\nTesting health endpoints and supervision...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        release = threading.Event()
+        deferred = DeferredProxy(lambda: release.wait(5) and EnhancedSteamAPIProxy())
+        handler = functools.partial(create_server_handler(deferred), directory=tmp)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        deferred.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            alive = requests.get(f"{base}/healthz", timeout=5)
+            ready = requests.get(f"{base}/readyz", timeout=5)
+            assert alive.status_code == 200 and alive.json()['status'] == 'starting'
+            assert ready.status_code == 503 and ready.headers['Cache-Control'] == 'no-store'
+            assert not wait_until_ready(base, timeout=0.2)
+            print("✅ Alive but not ready while the proxy initializes")
+
+            release.set()
+            assert wait_until_ready(base, timeout=10)
+            report = requests.get(f"{base}/readyz", timeout=5).json()
+            assert report['status'] == 'ok' and report['pid'] == os.getpid()
+            assert sorted(db['schema_version'] for db in report['databases'].values()) == [1, 5]
+            assert report['upstream']['open_breakers'] == [] and 'enhanced_results' in report['caches']
+
+            breaker = deferred.proxy.upstream.get_breaker('steam.player')
+            breaker.state = breaker.OPEN
+            breaker.opened_at = time.monotonic()
+            degraded = requests.get(f"{base}/readyz", timeout=5)
+            assert degraded.status_code == 200 and degraded.json()['upstream']['open_breakers'] == ['steam.player']
+
+            os.remove(deferred.proxy.game_data_manager.db_path)
+            unready = requests.get(f"{base}/readyz", timeout=5)
+            assert unready.status_code == 503 and unready.json()['status'] == 'unavailable'
+            assert requests.get(f"{base}/healthz", timeout=5).status_code == 200
+            print("✅ Open breakers degrade, a missing database fails readiness but not liveness")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        socket_path = os.path.join(tmp, 'gamepedia.sock')
+        unix_server = ThreadingUnixHTTPServer(socket_path, create_server_handler(deferred.proxy))
+        threading.Thread(target=unix_server.serve_forever, daemon=True).start()
+        try:
+            def unix_request(raw: bytes) -> bytes:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.connect(socket_path)
+                    client.sendall(raw)
+                    chunks = []
+                    while chunk := client.recv(65536):
+                        chunks.append(chunk)
+                return b''.join(chunks)
+
+            assert unix_request(b"GET /healthz HTTP/1.0\r\n\r\n").startswith(b"HTTP/1.0 200")
+            admin = unix_request(b"POST /admin/memory HTTP/1.0\r\nContent-Length: 2\r\n\r\n{}")
+            assert admin.startswith(b"HTTP/1.0 403"), "Unix-socket peers may be relayed traffic, not loopback admins"
+        finally:
+            unix_server.shutdown()
+            unix_server.server_close()
+        assert not os.path.exists(socket_path)
+        os.chdir(cwd)
+        print("✅ Unix socket serves health checks and keeps admin routes closed")
+
+    class FakeProcess:
+        def __init__(self, exit_codes):
+            self.exit_codes = exit_codes
+            self.returncode = None
+            self.terminated = False
+
+        def poll(self):
+            if self.returncode is None and self.exit_codes:
+                self.returncode = self.exit_codes.pop(0)
+            return self.returncode
+
+        def terminate(self):
+            self.terminated = True
+            self.returncode = -15
+
+        def wait(self, timeout=None):
+            return self.returncode
+
+    clock = FakeClock()
+    launched = []
+    # The first three launches crash immediately; the fourth stays up
+    outcomes = [[1], [1], [-9], []]
+    supervisor = ProcessSupervisor(['server'], workers=1, min_backoff=1.0, max_backoff=3.0, stable_after=60.0,
+                                   popen=lambda command, **kwargs: launched.append(FakeProcess(outcomes.pop(0))) or launched[-1],
+                                   clock=clock)
+    supervisor.start()
+    delays = []
+    while len(launched) < 4:
+        if supervisor.poll():
+            delays.append(supervisor.restart_at[0] - clock.now)
+        clock.now += 0.25
+    assert delays == [1.0, 2.0, 3.0], delays
+    assert supervisor.restarts == 3 and supervisor.processes[0] is launched[-1]
+    supervisor.stop()
+    assert launched[-1].terminated and supervisor.poll() == []
+    print("✅ Crashed workers restart with exponential backoff and stop on request")
+
+    print("✅ All health and supervision tests passed!")
+
+def test_worker_shared_state():
+    """Test workers agree on the key, count rate limits together, share the port and drain on shutdown"""
+    print("\nTesting multi-worker shared state...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            managers = [None] * 8
+            barrier = threading.Barrier(len(managers))
+
+            def start_worker(i):
+                barrier.wait()
+                managers[i] = SecurityManager()
+
+            threads = [threading.Thread(target=start_worker, args=(i,)) for i in range(len(managers))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len({manager.encryption_key for manager in managers}) == 1
+            assert not [name for name in os.listdir(tmp) if name.startswith('.security_key.')]
+            assert os.stat('.security_key').st_mode & 0o777 == 0o600
+            token = managers[0].encrypt_data('secret')
+            assert managers[-1].decrypt_data(token) == 'secret'
+            print("✅ Workers starting together share one encryption key")
+
+            conn = sqlite3.connect(managers[0].db_path)
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            conn.close()
+            for manager in managers[:2]:
+                manager.rate_limits['api_calls'] = {'max': 40, 'window': 60}
+            allowed = []
+
+            def hammer(manager):
+                for _ in range(15):
+                    allowed.append(manager.check_rate_limit('203.0.113.9', 'api_calls'))
+
+            threads = [threading.Thread(target=hammer, args=(managers[i % 2],)) for i in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(allowed) == 90 and allowed.count(True) == 40, allowed.count(True)
+            assert not managers[1].check_rate_limit('203.0.113.9', 'api_calls')
+            print("✅ Rate limits are counted exactly across workers sharing the database")
+
+            conn = sqlite3.connect(managers[0].db_path)
+            conn.execute("INSERT INTO rate_limits (ip_address, request_count, window_start) VALUES ('198.51.100.1', 1, 'garbage')")
+            conn.commit()
+            conn.close()
+            try:
+                managers[0].check_rate_limit('198.51.100.1', 'api_calls')
+                assert False, "A malformed row should raise"
+            except ValueError as e:
+                failure = e     # Keeps the failed call's frame alive, as a logged traceback would
+            assert managers[1].check_rate_limit('198.51.100.2', 'api_calls'), failure
+            print("✅ A failed rate-limit check releases its write lock")
+
+            conn = sqlite3.connect(managers[0].db_path)
+            conn.execute("INSERT INTO sessions (token, user_id, expires_at, ip_address, user_agent) VALUES (?, ?, ?, ?, ?)",
+                         ('tok', 'user', datetime.now() + timedelta(hours=1), '127.0.0.1', 'ua'))
+            conn.commit()
+            assert managers[1].validate_session_security('tok', '127.0.0.1', 'ua')
+            conn.execute("UPDATE sessions SET is_active = 0 WHERE token = 'tok'")
+            conn.commit()
+            conn.close()
+            assert not managers[2].validate_session_security('tok', '127.0.0.1', 'ua')
+            print("✅ A revoked session is rejected by every worker")
+        finally:
+            os.chdir(cwd)
+
+    saved = os.environ.get('GAMEPEDIA_WORKERS')
+    os.environ['GAMEPEDIA_WORKERS'] = '4'
+    try:
+        assert UpstreamClient().quota.daily_limit == 25000
+    finally:
+        if saved is None:
+            os.environ.pop('GAMEPEDIA_WORKERS')
+        else:
+            os.environ['GAMEPEDIA_WORKERS'] = saved
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(0.3)
+            body = str(os.getpid()).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    first = GamePediaHTTPServer(('127.0.0.1', 0), SlowHandler, bind_and_activate=False)
+    first.reuse_port = True
+    first.server_bind()
+    first.server_activate()
+    second = GamePediaHTTPServer(('127.0.0.1', first.server_address[1]), SlowHandler, bind_and_activate=False)
+    second.reuse_port = True
+    second.server_bind()
+    second.server_close()
+    print("✅ Workers can bind the same port with SO_REUSEPORT")
+
+    base = f"http://127.0.0.1:{first.server_address[1]}"
+    serving = threading.Thread(target=first.serve_forever)
+    serving.start()
+    results = []
+    in_flight = threading.Thread(target=lambda: results.append(requests.get(f"{base}/slow", timeout=5).status_code))
+    in_flight.start()
+    time.sleep(0.1)
+    first.shutdown()
+    serving.join()
+    # Accepted by the kernel after the accept loop stopped: still in the listen queue
+    queued = threading.Thread(target=lambda: results.append(requests.get(f"{base}/queued", timeout=5).status_code))
+    queued.start()
+    time.sleep(0.1)
+    assert first.drain(5) == 0
+    first.server_close()
+    in_flight.join()
+    queued.join()
+    assert results == [200, 200], results
+    print("✅ Shutdown drains in-flight and queued connections")
+
+    print("✅ All multi-worker tests passed!")
+
+def main():
+    """Run all tests"""
+    print("🎮 GamePedia Steam Proxy - Server Component Tests")
+    print("=" * 50)
+
+    try:
+        test_circuit_breaker_states()
+        test_upstream_client_serves_stale()
+        test_hedged_requests()
+        test_price_refresh_job()
+        test_price_history_rollups()
+        test_recommendation_engine()
+        test_steam_library_columns()
+        test_user_library_sync()
+        test_achievement_schema_cache()
+        test_player_summary_batcher()
+        test_enhanced_result_cache()
+        test_streaming_owned_games()
+        test_library_pagination()
+        test_bulk_game_details()
+        test_streamed_user_data()
+        test_admission_control()
+        test_metrics_registry()
+        test_request_tracing()
+        test_profiler_service()
+        test_standin_end_to_end()
+        test_upstream_cassette()
+        test_deferred_startup()
+        test_health_and_supervision()
+        test_worker_shared_state()
+
+        print("\n🎉 All proxy server tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -131,6 +131,44 @@ def show_demo_data():
     for game in recent_games[:3]:
         print(f"  - {game['name']}: {SteamStatsCalculator.format_playtime(game['playtime_forever'])}")
 
+def test_synthetic_library():
+    """Test the seeded generator produces consistent, realistically skewed libraries"""
+    print("\nTesting synthetic library generator...")
+    from synthetic_library import SyntheticLibrary, app_details, achievement_schema
+    from demo_mode import MockSteamAPI
+
+    library = SyntheticLibrary(5000, seed=3, now=1700000000)
+    again = SyntheticLibrary(5000, seed=3, now=1700000000)
+    assert library.games == again.games, "Same seed, same library"
+    assert library.games != SyntheticLibrary(5000, seed=4, now=1700000000).games
+    assert len({g['appid'] for g in library.games}) == 5000
+    print("✅ Libraries are deterministic per seed")
+
+    playtimes = sorted((g['playtime_forever'] for g in library.games), reverse=True)
+    never_played = sum(1 for p in playtimes if p == 0) / len(playtimes)
+    top_decile_share = sum(playtimes[:500]) / sum(playtimes)
+    assert 0.3 < never_played < 0.5, never_played
+    assert top_decile_share > 0.5, f"Playtime should be heavy-tailed, top 10% hold {top_decile_share:.0%}"
+    recent = library.recent_games()
+    assert 1 <= len(recent) <= 20 and all(g['playtime_2weeks'] <= g['playtime_forever'] for g in recent)
+    assert all(g['rtime_last_played'] >= 1700000000 - 14 * 86400 for g in recent)
+    print(f"✅ {never_played:.0%} never played, top 10% hold {top_decile_share:.0%} of playtime, {len(recent)} recent")
+
+    top = max(library.games, key=lambda g: g['playtime_forever'])
+    details = app_details(top['appid'])
+    achievements = library.player_achievements(top['appid'])['playerstats']['achievements']
+    schema = achievement_schema(top['appid'])['game']['availableGameStats']['achievements']
+    assert details['name'] == top['name'] and details['achievements']['total'] == len(achievements) == len(schema)
+    assert [a['apiname'] for a in achievements] == [a['name'] for a in schema]
+    print("✅ Achievements, schema and store appdetails agree")
+
+    mock_api = MockSteamAPI(library_size=2000, seed=1)
+    games = mock_api.get_owned_games("demo")['response']['games']
+    assert len(games) == 2000
+    assert SteamStatsCalculator.find_most_played_game(games)['playtime_forever'] == max(g['playtime_forever'] for g in games)
+    assert len(MockSteamAPI().get_owned_games("demo")['response']['games']) == 10, "Default demo data unchanged"
+    print("✅ MockSteamAPI serves synthetic libraries on request")
+
 def main():
     """Run all tests"""
     print("🎮 Steam Status Bar - Core Functionality Tests")
@@ -140,6 +178,7 @@ def main():
         test_steam_stats_calculator()
         test_steam_api_structure()
         test_achievement_counting()
+        test_synthetic_library()
         show_demo_data()
         
         print("\n🎉 All tests passed successfully!")